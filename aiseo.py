@@ -1,51 +1,62 @@
 from flask import Flask, render_template, request
-import requests
-from bs4 import BeautifulSoup
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
 
-# Load API key from .env file
+# Load API key from .env file (before the shared LLM layer reads it)
 load_dotenv()
+
+from formbot.domains import registrable_domain
+from formbot.keywords import LocalKeywordExtractor, get_corpus
+from formbot.llm import KeywordCache, get_pitch_service, parse_structured
+from formbot.pitch_service import PitchError
+
 app = Flask(__name__)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+PITCH_CONTEXT_TOKENS = int(os.getenv("PITCH_CONTEXT_TOKENS", "500"))
+
+# Keywords depend on the site, not the service being pitched, so they are reused per domain
+keyword_cache = KeywordCache()
+
+# llm: keywords come from the pitch call itself; local: TF-IDF against sites fetched so far, never
+# asking the LLM; auto: local first, falling back to the LLM when the page is too thin to trust
+SEO_KEYWORD_MODE = os.getenv("SEO_KEYWORD_MODE", "llm").lower()
+MIN_LOCAL_KEYWORDS = 5
+_keyword_extractor = None
+
+
+def get_keyword_extractor():
+    """Built on first use: loading the background corpus is not needed to import this module."""
+    global _keyword_extractor
+    if _keyword_extractor is None:
+        _keyword_extractor = LocalKeywordExtractor(get_corpus())
+    return _keyword_extractor
 
 # --- Step 1: Scrape website text ---
 def get_website_text(url):
-    try:
-        resp = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-        soup = BeautifulSoup(resp.text, "html.parser")
-        texts = [t.strip() for t in soup.stripped_strings]
-        return " ".join(texts[:1500])
-    except Exception as e:
-        return f"Error fetching website: {e}"
+    from formbot.context_builder import fetch_context  # requests + bs4, loaded on first fetch
+    text, _ = fetch_context(url, token_budget=PITCH_CONTEXT_TOKENS)
+    get_corpus().add_document(text)
+    return text
 
 # --- Step 2: Extract SEO keywords ---
 def extract_keywords(website_text, service):
     prompt = f"""
-    You are an SEO expert. Based on this website content, extract 8-12 highly relevant SEO keywords 
-    that can help the business grow online. Prioritize keywords related to {service} 
+    You are an SEO expert. Based on this website content, extract 8-12 highly relevant SEO keywords
+    that can help the business grow online. Prioritize keywords related to {service}
     and their industry. Return them as a comma-separated list.
 
     Website content:
     {website_text}
     """
+    return get_pitch_service().generate(prompt, temperature=0.4)
 
-    resp = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.4
-    )
-    return resp.choices[0].message.content.strip()
 
-# --- Step 3: Generate pitch (with optional SEO keywords) ---
-def generate_pitch(website_text, company, email, phone, service, use_seo=False):
-    keywords = None
-    if use_seo:
-        keywords = extract_keywords(website_text, service)
+def extract_keywords_local(website_text, service, top_k=12):
+    """LLM-free keywords (TF-IDF against the background corpus, biased toward the service)."""
+    return get_keyword_extractor().extract(website_text, service, top_k=top_k)
 
-    prompt = f"""
-    You are a marketing assistant. Based on the following website content, write a professional pitch 
+# --- Step 3: Generate pitch (with optional SEO keywords) ---
+PITCH_INSTRUCTIONS = """
+    You are a marketing assistant. Based on the following website content, write a professional pitch
     from the company "{company}" offering their "{service}" services.
 
     The pitch should:
@@ -56,19 +67,53 @@ def generate_pitch(website_text, company, email, phone, service, use_seo=False):
       📌 Targeted SEO Keywords: keyword1, keyword2, keyword3
     - End with contact details: Email {email}, Phone {phone}.
     - Keep it under 200 words.
+"""
+
+STRUCTURED_TASK = """
+    First extract 8-12 highly relevant SEO keywords that can help the business grow online,
+    prioritizing keywords related to {service} and their industry. Then write the pitch using them.
 
-    SEO Keywords: {keywords if keywords else "N/A"}
+    Respond with a JSON object only: {{"keywords": ["keyword1", "..."], "pitch": "the full pitch text"}}
 
     Website content:
     {website_text}
-    """
+"""
+
+PLAIN_TASK = """
+    SEO Keywords: {keywords}
+
+    Website content:
+    {website_text}
+"""
+
+
+def generate_pitch(website_text, company, email, phone, service, use_seo=False, url=None, keyword_mode=None):
+    """One LLM call per pitch: keywords come from the per-domain cache, the local extractor
+    or the same structured call."""
+    intro = PITCH_INSTRUCTIONS.format(company=company, service=service, email=email, phone=phone)
+    domain = registrable_domain(url) if url else None
+    keywords = keyword_cache.get(domain) if (use_seo and domain) else None
+
+    mode = keyword_mode or SEO_KEYWORD_MODE
+    if use_seo and not keywords and mode in ("local", "auto"):
+        keywords = extract_keywords_local(website_text, service)
+        if mode == "auto" and len(keywords) < MIN_LOCAL_KEYWORDS:
+            keywords = None
+        elif domain and keywords:
+            keyword_cache.put(domain, keywords)
+
+    if use_seo and not keywords and mode != "local":
+        prompt = intro + STRUCTURED_TASK.format(service=service, website_text=website_text)
+        text = get_pitch_service().generate(prompt, response_format={"type": "json_object"})
+        data = parse_structured(text, required=("pitch",))
+        keywords = [str(k).strip() for k in data.get("keywords") or [] if str(k).strip()]
+        if domain and keywords:
+            keyword_cache.put(domain, keywords)
+        return data["pitch"]
 
-    resp = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.6
-    )
-    return resp.choices[0].message.content
+    prompt = intro + PLAIN_TASK.format(keywords=", ".join(keywords) if keywords else "N/A",
+                                       website_text=website_text)
+    return get_pitch_service().generate(prompt)
 
 # --- Step 4: Flask routes ---
 @app.route("/", methods=["GET", "POST"])
@@ -81,9 +126,14 @@ def index():
         phone = request.form.get("phone")
         service = request.form.get("service")
         use_seo = request.form.get("use_seo") == "on"  # checkbox for SEO keywords
+        keyword_mode = request.form.get("keyword_mode") or None
 
         website_text = get_website_text(url)
-        result = generate_pitch(website_text, company, email, phone, service, use_seo)
+        try:
+            result = generate_pitch(website_text, company, email, phone, service, use_seo, url=url,
+                                    keyword_mode=keyword_mode)
+        except PitchError as e:
+            result = f"Could not generate a pitch right now: {e}"
 
     return render_template("index.html", result=result, company=request.form.get("company"))
 
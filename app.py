@@ -1,20 +1,25 @@
+import asyncio
 import json
 import logging
 import os
+import queue
 import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
-import requests
-from bs4 import BeautifulSoup
 from flask import Flask, Response, request, send_from_directory
-from openai import OpenAI
-
-from formbot.driver_manager import DriverManager
-from formbot.flow import FormFlow
-from formbot.contact_page_finder import ContactPageFinder
 
+# Light imports only: selenium, requests/bs4 and the OpenAI SDK load on first use (see
+# bench/import_bench.py), so short-lived workers and tests import this module quickly.
+from formbot.admission import Overloaded
+from formbot.jobs import LAGGED, coalesce, format_sse, get_job_manager
+from formbot.keywords import get_corpus
+from formbot.llm import get_client, get_pitch_service
+from formbot.pitch_service import PitchError
+from formbot.supervisor import get_supervisor
 
 # ---------------------------------------------------------------------
 # Flask + Logging Setup
@@ -22,47 +27,57 @@ from formbot.contact_page_finder import ContactPageFinder
 app = Flask(__name__, static_folder="static", static_url_path="/static")
 
 LOG_LEVEL = logging.DEBUG
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
 logger = logging.getLogger("formbot")
 
+
+def configure_logging():
+    logging.basicConfig(
+        level=LOG_LEVEL,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+
 # ---------------------------------------------------------------------
 # OpenAI Client Setup
 # ---------------------------------------------------------------------
-OPENAI_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_KEY:
-    logger.warning("⚠️  OPENAI_API_KEY not set in environment.")
-else:
-    logger.info(f"🔑 Using OpenAI key prefix: {OPENAI_KEY[:8]}*******")
-
-client = OpenAI(api_key=OPENAI_KEY)
+def log_openai_settings():
+    """Startup banner only; clients are built on first use by formbot.llm's factories."""
+    key = os.getenv("OPENAI_API_KEY")
+    # Point at any OpenAI-compatible endpoint, e.g. the local stub in bench/openai_stub.py
+    base_url = os.getenv("OPENAI_BASE_URL") or None
+    if not key:
+        logger.warning("⚠️  OPENAI_API_KEY not set in environment.")
+    else:
+        logger.info(f"🔑 Using OpenAI key prefix: {key[:8]}*******")
+    if base_url:
+        logger.info(f"🔌 Using OpenAI base URL: {base_url}")
 
 
 # ---------------------------------------------------------------------
 # Helper: Extract Website Text
 # ---------------------------------------------------------------------
+PITCH_CONTEXT_TOKENS = int(os.getenv("PITCH_CONTEXT_TOKENS", "500"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+# HTTP pre-checks run ahead of the browser over a pooled session
+triage_pool = ThreadPoolExecutor(max_workers=int(os.getenv("TRIAGE_WORKERS", "16")), thread_name_prefix="triage")
+# Plain server-rendered forms are submitted over HTTP in parallel, without a browser
+HTTP_SUBMIT = os.getenv("HTTP_SUBMIT", "1") != "0"
+http_pool = ThreadPoolExecutor(max_workers=int(os.getenv("HTTP_SUBMIT_WORKERS", "16")), thread_name_prefix="http-submit")
+
+
 def get_website_text(url: str) -> str:
-    """Fetch visible text from a website for context."""
-    try:
-        resp = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        texts = [t.strip() for t in soup.stripped_strings]
-        return " ".join(texts[:1500])
-    except Exception as e:
-        logger.error(f"Failed to fetch website text from {url}: {e}")
-        return f"Error fetching website: {e}"
+    """Fetch high-signal website text (title, meta, headings, about) trimmed to the prompt token budget."""
+    from formbot.context_builder import fetch_context
+    text, _ = fetch_context(url, token_budget=PITCH_CONTEXT_TOKENS)
+    return text
 
 
 # ---------------------------------------------------------------------
 # Helper: Generate AI Pitch with Error Handling
 # ---------------------------------------------------------------------
-def generate_pitch(website_text, company, email, phone, service) -> str:
-    """Generate a short business pitch using OpenAI API with strong error handling."""
-    prompt = f"""
+def build_pitch_prompt(website_text, company, email, phone, service) -> str:
+    return f"""
     You are a marketing assistant. Based on the website content below, write a professional pitch 
     from "{company}" offering "{service}" services.
 
@@ -77,25 +92,333 @@ def generate_pitch(website_text, company, email, phone, service) -> str:
     {website_text}
     """
 
+
+def generate_pitch(website_text, company, email, phone, service, on_token=None) -> str:
+    """Generate a short business pitch; raises PitchError rather than returning error text.
+
+    Pass on_token to stream the completion and receive each text delta as it arrives.
+    """
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.6,
-        )
-        return response.choices[0].message.content.strip()
+        return get_pitch_service().generate(build_pitch_prompt(website_text, company, email, phone, service),
+                                      on_token=on_token)
+    except PitchError as e:
+        logger.error(f"❌ OpenAI Error: {e}")
+        raise
 
-    except Exception as e:
-        msg = str(e)
-        if "insufficient_quota" in msg:
-            logger.error("❌ OpenAI quota exhausted — please add billing.")
-            return "[OpenAI Error] Quota exhausted. Please add billing or credits."
-        elif "invalid_api_key" in msg:
-            logger.error("❌ Invalid OpenAI API key.")
-            return "[OpenAI Error] Invalid API key."
+
+async def _fetch_and_pitch(url, triage, company, email, phone, service, emit):
+    """Returns (pitch, context_stats) for one URL, streaming progress through emit(url, stage, **data).
+
+    Waits for the triage future first: rejected URLs never cost an LLM call, and the homepage
+    HTML triage already downloaded is reused for the context.
+    """
+    from formbot.context_builder import ContextBuilder, fetch_context
+    result = await asyncio.wrap_future(triage)
+    if not result.viable:
+        raise PitchError(f"Not pitched: {result.verdict}", permanent=True)
+    if result.html:
+        website_text, stats = await asyncio.to_thread(ContextBuilder(PITCH_CONTEXT_TOKENS).build, result.html)
+    else:
+        website_text, stats = await asyncio.to_thread(fetch_context, url, PITCH_CONTEXT_TOKENS)
+    # background corpus for aiseo's local keyword mode; its periodic save (zlib + write) stays off the loop
+    await asyncio.to_thread(get_corpus().add_document, website_text)
+    emit(url, "fetched", context_tokens=stats["context_tokens"], saved_pct=stats["saved_pct"])
+    pitch = await get_pitch_service().agenerate(
+        build_pitch_prompt(website_text, company, email, phone, service),
+        on_token=lambda delta: emit(url, "pitch", delta=delta),
+        on_reset=lambda: emit(url, "pitch_reset"),
+    )
+    emit(url, "pitch_done")
+    return pitch, stats
+
+
+def _pitch_text(pitch_future) -> Future:
+    """Future resolving to just the pitch text; any failure surfaces as PitchError in FormFiller."""
+    out = Future()
+
+    def _done(f):
+        if f.cancelled():
+            out.set_exception(PitchError("Pitch generation cancelled"))
+        elif f.exception() is not None:
+            exc = f.exception()
+            out.set_exception(exc if isinstance(exc, PitchError) else PitchError(str(exc)))
         else:
-            logger.error(f"❌ OpenAI Error: {msg}")
-            return f"[OpenAI Error] {msg}"
+            out.set_result(f.result()[0])
+
+    pitch_future.add_done_callback(_done)
+    return out
+
+
+def _failed(fut) -> bool:
+    return fut.done() and (fut.cancelled() or fut.exception() is not None)
+
+
+def _http_attempt(url, triage_future, pitch_future, base_dataset, emit):
+    """Browserless submission for one URL; returns None/an unhandled result when the browser must run."""
+    from formbot.http_submit import CONFIRMED, try_http_submit
+    try:
+        triage = triage_future.result()
+        if not triage.viable or not triage.contact_url:
+            return None
+        attempt = try_http_submit(triage.contact_url, dict(base_dataset, message=_pitch_text(pitch_future)))
+    except PitchError:
+        return None  # _run_batch reports the failed pitch
+    except Exception as e:
+        logger.error(f"HTTP submit crashed for {url}: {e}")
+        return None
+    if attempt.handled:
+        logger.info(f"⚡ {url} handled over HTTP: {attempt.outcome} ({attempt.reason})")
+        emit(url, "contact_page_found", contact_url=attempt.contact_url)
+        emit(url, "confirmed" if attempt.outcome == CONFIRMED else "unconfirmed")
+        emit(url, "result", status=attempt.status, path="http")
+    return attempt
+
+
+def _run_batch(urls, triages, http_attempts, pitches, base_dataset, debug, emit, cancelled, ticket):
+    """Browser stage for a /fill batch; runs in a worker thread so the SSE stream never blocks on it.
+    Every browser launch waits for an admission slot queued under ticket.caller. Transient failures
+    are retried later in the batch (formbot/retry.py). URLs are grouped by registrable domain and
+    each group shares one warm browser (formbot/site_session.py); returns the retry report."""
+    from formbot.retry import RetryScheduler, get_verdict_memory
+    from formbot.site_session import SiteSessions, domain_sessions_enabled
+    memory = get_verdict_memory()
+    sessions = SiteSessions() if domain_sessions_enabled() else None
+    if sessions is not None:
+        urls = SiteSessions.order(urls)
+    retries = RetryScheduler(urls, cancelled=cancelled)
+    try:
+        _run_urls(retries, sessions, triages, http_attempts, pitches, base_dataset, debug, emit, ticket, memory)
+    finally:
+        if sessions is not None:
+            sessions.close()  # last group's browser and lease
+    stats = retries.stats()
+    if sessions is not None:
+        stats["domain_sessions"] = sessions.stats()
+    return stats
+
+
+def _run_urls(retries, sessions, triages, http_attempts, pitches, base_dataset, debug, emit, ticket, memory):
+    """_run_batch's per-URL loop; each URL ends with one "result" event."""
+    from formbot.admission import AdmissionTimeout, get_admission
+    from formbot.contact_page_finder import ContactPageFinder
+    from formbot.driver_manager import DriverManager
+    from formbot.flow import FormFlow
+    from formbot.retry import UNKNOWN
+    for url, tries in retries:
+        final, outcome = True, UNKNOWN
+        try:
+            logger.info(f"🌐 Processing URL: {url}" + (f" (attempt {tries})" if tries > 1 else ""))
+            triage = triages[url].result()
+            if not triage.viable:
+                logger.info(f"⏭️ Triage rejected {url}: {triage.verdict} {triage.reason}")
+                emit(url, "result", status=triage.status, verdict=triage.verdict)
+                continue
+            attempt = http_attempts[url].result() if url in http_attempts else None
+            if attempt is not None and attempt.handled:
+                continue  # result already emitted by _http_attempt
+            if _failed(pitches[url]):
+                err = "cancelled" if pitches[url].cancelled() else pitches[url].exception()
+                logger.error(f"❌ Pitch failed for {url}: {err}")
+                emit(url, "result", status=f"[X] Skipped {url}: pitch generation failed ({err})")
+                continue
+
+            # The browser starts now; the message field waits on the streaming pitch
+            dataset = dict(base_dataset, message=_pitch_text(pitches[url]))
+            session = sessions.for_url(url) if sessions is not None else None
+            flow = FormFlow(url, dataset, debug=debug, triage=False, http_submit=False, caller=ticket.caller,
+                            session=session, on_event=lambda stage, _u=url, **d: emit(_u, stage, **d))
+            status, outcome = flow.run(), flow.verdict
+            delay = retries.retry(url, flow.verdict, flow.reason)
+            if delay is not None:
+                final = False
+                emit(url, "retry", attempt=tries, delay=round(delay, 1), reason=flow.reason, status=status)
+                continue
+            if not isinstance(flow.error, PitchError):
+                memory.record(url, flow.verdict, flow.reason, status)  # a failed pitch says nothing about the site
+
+            if "No contact form found" in str(status) or "✗" in str(status):
+                if session is not None and session.driver is not None:
+                    # the domain's warm browser is still open: dump from it, no second Chrome
+                    try:
+                        session.driver.get(url)
+                        ContactPageFinder(session.driver, debug=True).debug_dump()
+                    except Exception as inner_e:
+                        logger.error(f"Debug dump failed for {url}: {inner_e}")
+                else:
+                    driver = lease = None
+                    try:
+                        # a second Chrome for the same URL: it queues like any other launch
+                        lease = get_admission().acquire(ticket.caller)
+                        driver = DriverManager.get_driver(headless=not debug)
+                        driver.get(url)
+                        finder = ContactPageFinder(driver, debug=True)
+                        finder.debug_dump()
+                    except AdmissionTimeout as inner_e:
+                        logger.warning(f"Debug dump skipped for {url}: {inner_e}")
+                    except Exception as inner_e:
+                        logger.error(f"Debug dump failed for {url}: {inner_e}")
+                    finally:
+                        try:
+                            if driver is not None:
+                                DriverManager.cleanup(driver)
+                        except Exception:
+                            pass
+                        if lease is not None:
+                            lease.release()
+
+        except Exception as e:
+            logger.exception(f"Flow crashed for {url}")
+            status = f"[Error] On {url}: {e}"
+        finally:
+            if final:
+                ticket.done()  # frees this URL's place in the pending queue
+
+        retries.done(url, outcome)
+        emit(url, "result", status=status, outcome=outcome, attempts=tries)
+
+
+# ---------------------------------------------------------------------
+# Jobs: one batch, any number of SSE subscribers (formbot/jobs.py)
+# ---------------------------------------------------------------------
+def fill_params(args):
+    """(urls, base_dataset, service, debug) from /fill query args or a /jobs body."""
+    raw_urls = args.get("urls", "")
+    if isinstance(raw_urls, str):
+        raw_urls = raw_urls.split(",")
+    urls: List[str] = [u.strip() for u in raw_urls if u and u.strip()]
+    base_dataset = {
+        "name": str(args.get("name", "")).strip() or "Test User",
+        "email": str(args.get("email", "")).strip() or "test@example.com",
+        "phone": str(args.get("phone", "")).strip() or "9999999999",
+        "zipcode": "12345",
+        "address": "123 St",
+        "city": "MindAptix",
+        "state": "MindAptix",
+    }
+    service = str(args.get("service", "")).strip() or "Digital Marketing"
+    debug = str(args.get("debug", "false")).lower() == "true"
+    return urls, base_dataset, service, debug
+
+
+def _batch_stats(pitches, pitch_service, retries):
+    from formbot.admission import get_admission
+    from formbot.form_signatures import get_form_index
+    from formbot.page_lib import get_page_lib
+    from formbot.tabs import active_schedulers
+    savings = {"raw_tokens": 0, "context_tokens": 0}
+    for fut in pitches.values():
+        if fut.done() and not _failed(fut):
+            savings["raw_tokens"] += fut.result()[1]["raw_tokens"]
+            savings["context_tokens"] += fut.result()[1]["context_tokens"]
+    saved = savings["raw_tokens"] - savings["context_tokens"]
+    savings["saved_tokens"] = saved
+    savings["saved_pct"] = round(100.0 * saved / savings["raw_tokens"], 1) if savings["raw_tokens"] else 0.0
+    logger.info(f"📉 Prompt context: {savings['raw_tokens']} → {savings['context_tokens']} tokens "
+                f"({savings['saved_pct']}% saved)")
+    logger.info(f"📊 Pitch service stats: {pitch_service.stats()}")
+    stats = {"prompt_tokens": savings, "pitch": pitch_service.stats(), "form_index": get_form_index().stats(),
+             "admission": get_admission().stats(), "retries": retries, "page_lib": get_page_lib().stats()}
+    browsers = [sched.stats() for sched in active_schedulers()]
+    if browsers:
+        stats["browsers"] = browsers  # tab mode: Chrome RSS per active URL
+    return stats
+
+
+def caller_key(headers, remote_addr):
+    """Fair-queuing identity of a client: X-Formbot-Caller if sent, else its address."""
+    return headers.get("X-Formbot-Caller") or remote_addr or "anonymous"
+
+
+def start_fill_job(urls, base_dataset, service, debug, cancel_when_idle=False, caller="anonymous"):
+    """Kick off triage, pitches, HTTP submissions and the browser batch; progress goes to the
+    job's event log. Never blocks: the browser stage runs in its own thread.
+    Raises formbot.admission.Overloaded (HTTP 429) when too many URLs are already pending."""
+    from formbot.admission import get_admission
+    from formbot.retry import get_verdict_memory
+    from formbot.triage import triage_url
+    pitch_service = get_pitch_service()
+    ticket = get_admission().admit(caller, len(urls))
+    job = get_job_manager().create(urls, cancel_when_idle=cancel_when_idle)
+    emit = job.emit
+    cancelled = threading.Event()
+
+    # Captcha/formless sites seen in earlier runs: no triage, no pitch, no browser
+    memory = get_verdict_memory()
+    remembered = {url: memory.get(url) for url in urls}
+    remembered = {url: entry for url, entry in remembered.items() if entry}
+    for url, entry in remembered.items():
+        seen = time.strftime("%Y-%m-%d", time.localtime(entry["at"]))
+        logger.info(f"⏭️ {url}: {entry['reason']} remembered from {seen}")
+        emit(url, "result", status=f"[X] Skipped {url}: {entry['reason']} on {seen} (remembered)",
+             outcome=entry["verdict"], remembered=True)
+    ticket.done(len(remembered))
+    urls = [url for url in urls if url not in remembered]
+
+    # Triage every URL over pooled HTTP first; only viable ones get a pitch and a browser
+    triages = {url: triage_pool.submit(triage_url, url) for url in urls}
+    for url, fut in triages.items():
+        fut.add_done_callback(lambda f, _u=url: f.cancelled() or emit(_u, "triaged", **f.result().to_dict()))
+
+    # Batched dispatch: fetch + pitch for every URL starts now, paced by the rate limiter
+    name, email, phone = base_dataset["name"], base_dataset["email"], base_dataset["phone"]
+    pitches = {url: pitch_service.run(_fetch_and_pitch(url, triages[url], name, email, phone, service, emit))
+               for url in urls}
+
+    http_attempts = {}
+    if HTTP_SUBMIT:
+        http_attempts = {url: http_pool.submit(_http_attempt, url, triages[url], pitches[url], base_dataset, emit)
+                         for url in urls}
+
+    def cancel():
+        # viewer went away or DELETE /jobs/<id>: stop queued pitch work and further URLs
+        cancelled.set()
+        for fut in list(pitches.values()) + list(triages.values()) + list(http_attempts.values()):
+            fut.cancel()
+
+    def worker():
+        stats = None
+        try:
+            retries = _run_batch(urls, triages, http_attempts, pitches, base_dataset, debug, emit, cancelled, ticket)
+            retries["remembered"] = len(remembered)
+            stats = _batch_stats(pitches, pitch_service, retries)
+        except Exception:
+            logger.exception(f"Batch {job.id} crashed")
+        finally:
+            ticket.close()  # URLs skipped by a cancel leave the pending queue too
+            job.finish(stats)
+
+    job.cancel_cb = cancel
+    threading.Thread(target=worker, name=f"fill-{job.id}", daemon=True).start()
+    return job
+
+
+def sse_stream(job, after=0):
+    """Blocking SSE generator for the Flask server (one thread per viewer)."""
+    sub = job.subscribe(after=after)
+    try:
+        carry = None
+        while True:
+            if carry is not None:
+                item, carry = carry, None
+            else:
+                try:
+                    item = sub.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield format_sse(None, "heartbeat", {"ts": time.time()})
+                    continue
+            if item is LAGGED:
+                break  # the client reconnects with Last-Event-ID
+            item, carry = coalesce(item, sub.get_nowait)
+            yield format_sse(*item)
+            if item[1] == "done":
+                break
+    finally:
+        job.unsubscribe(sub)
+
+
+def overloaded(e):
+    logger.warning(f"🚦 Rejected batch: {e}; retry in {e.retry_after}s")
+    return {"error": str(e), "retry_after": e.retry_after}, 429, {"Retry-After": str(e.retry_after)}
 
 
 # ---------------------------------------------------------------------
@@ -112,73 +435,84 @@ def index():
 def health():
     """Quick health check for API key and connectivity."""
     try:
-        client.models.list()
+        get_client().models.list()
         return {"status": "✅ OpenAI key working and has quota."}, 200
     except Exception as e:
         return {"status": f"❌ OpenAI error: {str(e)}"}, 500
 
 
+@app.route("/browsers")
+def browsers():
+    """Live Chrome instances: supervisor RSS/CPU/recycling per driver, admission gauges, tab-mode density."""
+    from formbot.tabs import active_schedulers
+    from formbot.admission import get_admission
+    return {"supervisor": get_supervisor().stats(), "admission": get_admission().stats(),
+            "schedulers": [sched.stats() for sched in active_schedulers()]}, 200
+
+
 @app.route("/fill")
 def fill():
     """Main route to process target URLs and generate personalized pitches."""
-    raw_urls = request.args.get("urls", "").strip()
-    name = request.args.get("name", "").strip() or "Test User"
-    email = request.args.get("email", "").strip() or "test@example.com"
-    phone = request.args.get("phone", "").strip() or "9999999999"
-    service = request.args.get("service", "").strip() or "Digital Marketing"
-    debug = request.args.get("debug", "false").lower() == "true"
-
-    urls: List[str] = [u.strip() for u in raw_urls.split(",") if u.strip()]
+    urls, base_dataset, service, debug = fill_params(request.args)
     if not urls:
         def empty_stream():
             yield f"data: {json.dumps({'url': '', 'status': '[X] No URLs provided'})}\n\n"
             yield "event: done\ndata: No URLs\n\n"
         return Response(empty_stream(), mimetype="text/event-stream")
 
-    def stream():
-        for url in urls:
-            try:
-                logger.info(f"🌐 Processing URL: {url}")
-                website_text = get_website_text(url)
-                pitch = generate_pitch(website_text, name, email, phone, service)
-
-                dataset = {
-                    "name": name,
-                    "email": email,
-                    "phone": phone,
-                    "message": pitch,
-                    "zipcode": "12345",
-                    "address": "123 St",
-                    "city": "MindAptix",
-                    "state": "MindAptix",
-                }
-
-                status = FormFlow(url, dataset, debug=debug).run()
-
-                if "No contact form found" in str(status) or "✗" in str(status):
-                    try:
-                        driver = DriverManager.get_driver(headless=not debug)
-                        driver.get(url)
-                        finder = ContactPageFinder(driver, debug=True)
-                        finder.debug_dump()
-                    except Exception as inner_e:
-                        logger.error(f"Debug dump failed for {url}: {inner_e}")
-                    finally:
-                        try:
-                            DriverManager.cleanup(driver)
-                        except Exception:
-                            pass
+    try:
+        job = start_fill_job(urls, base_dataset, service, debug, cancel_when_idle=True,
+                             caller=caller_key(request.headers, request.remote_addr))
+    except Overloaded as e:
+        return overloaded(e)
+    return Response(sse_stream(job), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Job-Id": job.id})
 
-            except Exception as e:
-                logger.exception(f"Flow crashed for {url}")
-                status = f"[Error] On {url}: {e}"
 
-            yield f"data: {json.dumps({'url': url, 'status': status})}\n\n"
-            time.sleep(0.25)
+@app.route("/jobs")
+def jobs():
+    """Job registry gauges: jobs kept, still running, live SSE subscribers."""
+    return get_job_manager().stats(), 200
 
-        yield "event: done\ndata: All URLs processed\n\n"
 
-    return Response(stream(), mimetype="text/event-stream",
+@app.route("/jobs", methods=["POST"])
+def create_job():
+    """Start a batch that keeps running without a viewer; follow it via /jobs/<id>/events."""
+    params = request.get_json(silent=True) or request.form or request.args
+    urls, base_dataset, service, debug = fill_params(params)
+    if not urls:
+        return {"error": "No URLs provided"}, 400
+    try:
+        job = start_fill_job(urls, base_dataset, service, debug,
+                             caller=caller_key(request.headers, request.remote_addr))
+    except Overloaded as e:
+        return overloaded(e)
+    return {"job": job.id, "events": f"/jobs/{job.id}/events"}, 202
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = get_job_manager().get(job_id)
+    return (job.to_dict(), 200) if job else ({"error": "unknown job"}, 404)
+
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    job = get_job_manager().get(job_id)
+    if not job:
+        return {"error": "unknown job"}, 404
+    job.cancel()
+    return job.to_dict(), 200
+
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """SSE for an existing job (replays from Last-Event-ID). Holds a thread here; async_app.py doesn't."""
+    job = get_job_manager().get(job_id)
+    if not job:
+        return {"error": "unknown job"}, 404
+    after = int(request.headers.get("Last-Event-ID") or request.args.get("after") or 0)
+    return Response(sse_stream(job, after), mimetype="text/event-stream",
                     headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
@@ -186,6 +520,13 @@ def fill():
 # Entrypoint
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
+    from formbot.chromedriver import get_resolution
+    configure_logging()
+    log_openai_settings()
     Path(app.static_folder).mkdir(parents=True, exist_ok=True)
+    try:
+        get_resolution().resolve()  # once, so no /fill request pays for driver resolution
+    except Exception as e:
+        logger.warning(f"⚠️ chromedriver not resolved at startup: {e}")
     logger.info("🚀 FormAI Bot Server started on http://0.0.0.0:5001")
     app.run(host="0.0.0.0", port=5001, debug=True)
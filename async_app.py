@@ -0,0 +1,269 @@
+"""Async front end: thousands of concurrent SSE viewers on one event loop.
+
+    python async_app.py --port 5001
+
+/fill and /jobs/<id>/events are served natively: each stream is one asyncio task and one
+queue (formbot/jobs.py), not a thread. Every other route is the unchanged Flask app, called
+through a small WSGI bridge in a worker thread. Pipeline work (triage, pitches, browsers)
+runs exactly as under `python app.py`.
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import sys
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import app as flask_app
+from formbot.admission import Overloaded
+from formbot.jobs import LAGGED, coalesce, format_sse, get_job_manager
+
+logger = logging.getLogger("formbot")
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+SSE_HEADERS = [("Content-Type", "text/event-stream"), ("Cache-Control", "no-cache"), ("X-Accel-Buffering", "no")]
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+           429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+class HttpRequest:
+    def __init__(self, method, target, headers, body, peer):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = unquote(parts.path) or "/"
+        self.query_string = parts.query
+        self.args = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+        self.peer = peer
+
+
+async def read_request(reader, peer):
+    """One HTTP/1.1 request (no chunked request bodies), or None on EOF/garbage."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError:
+        return None
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ValueError("body too large")
+    body = await reader.readexactly(length) if length else b""
+    return HttpRequest(method.upper(), target, headers, body, peer)
+
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines += [f"{k}: {v}" for k, v in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_response(writer, status, body, headers=()):
+    headers = list(headers) + [("Content-Length", str(len(body))), ("Connection", "close")]
+    writer.write(_head(status, headers) + body)
+    await writer.drain()
+
+
+# ---------- WSGI bridge (everything that is not a live stream) ----------
+def _environ(req, server):
+    environ = {
+        "REQUEST_METHOD": req.method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": req.path,
+        "QUERY_STRING": req.query_string,
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": req.peer[0] if req.peer else "",
+        "CONTENT_TYPE": req.headers.get("content-type", ""),
+        "CONTENT_LENGTH": str(len(req.body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(req.body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for key, value in req.headers.items():
+        name = key.upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[f"HTTP_{name}"] = value
+    return environ
+
+
+def call_wsgi(req, server):
+    """Runs in a worker thread: (status, headers, body) from the Flask app."""
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured["status"], captured["headers"] = int(status.split(" ", 1)[0]), headers
+
+    result = flask_app.app(_environ(req, server), start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    headers = [(k, v) for k, v in captured["headers"] if k.lower() not in ("content-length", "connection")]
+    return captured["status"], headers, body
+
+
+# ---------- Native SSE ----------
+async def stream_job(writer, job, after=0, extra_headers=()):
+    """Replay job events after `after`, then follow live ones until done or the client leaves."""
+    loop = asyncio.get_running_loop()
+    sub = job.subscribe(after=after, loop=loop)
+    try:
+        writer.write(_head(200, SSE_HEADERS + list(extra_headers) + [("Connection", "close")]))
+        await writer.drain()
+        carry = None
+        while True:
+            if carry is not None:
+                item, carry = carry, None
+            elif not sub.queue.empty():
+                item = sub.queue.get_nowait()  # backlog: skip the wait_for task per event
+            else:
+                try:
+                    item = await asyncio.wait_for(sub.aget(), flask_app.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(format_sse(None, "heartbeat", {"ts": time.time()}).encode())
+                    await writer.drain()
+                    continue
+            if item is LAGGED:
+                break  # slow reader: the client reconnects with Last-Event-ID
+            item, carry = coalesce(item, sub.get_nowait)
+            writer.write(format_sse(*item).encode())
+            await writer.drain()
+            if item[1] == "done":
+                break
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        job.unsubscribe(sub)
+
+
+async def _watch_disconnect(reader, task):
+    """SSE clients never send after the request: EOF on the socket means the viewer left."""
+    try:
+        await reader.read()
+    except ConnectionError:
+        pass
+    task.cancel()
+
+
+class AsyncServer:
+    def __init__(self, host="0.0.0.0", port=5001):
+        self.host = host
+        self.port = port
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        peer = writer.get_extra_info("peername")
+        try:
+            try:
+                req = await read_request(reader, peer)
+            except ValueError:
+                await send_response(writer, 413, b'{"error": "body too large"}', [("Content-Type", "application/json")])
+                return
+            if req is None:
+                return
+            stream = self.stream_for(req)
+            if stream is not None:
+                task = asyncio.ensure_future(stream(writer))
+                watcher = asyncio.ensure_future(_watch_disconnect(reader, task))
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                watcher.cancel()
+                return
+            status, headers, body = await asyncio.get_running_loop().run_in_executor(
+                None, call_wsgi, req, (self.host, self.port))
+            await send_response(writer, status, body, headers)
+        except ConnectionError:
+            pass
+        except Exception:
+            logger.exception("Async server request failed")
+        finally:
+            self.connections -= 1
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    def stream_for(self, req):
+        """Coroutine factory for routes served as live SSE here, else None (-> Flask)."""
+        if req.method != "GET":
+            return None
+        if req.path == "/fill":
+            urls, base_dataset, service, debug = flask_app.fill_params(req.args)
+            if not urls:
+                return None  # Flask's empty-batch stream is short-lived
+            caller = flask_app.caller_key({k.title(): v for k, v in req.headers.items()}, req.peer and req.peer[0])
+
+            async def fill(writer):
+                try:
+                    job = await asyncio.get_running_loop().run_in_executor(
+                        None, lambda: flask_app.start_fill_job(urls, base_dataset, service, debug,
+                                                               cancel_when_idle=True, caller=caller))
+                except Overloaded as e:
+                    body = json.dumps({"error": str(e), "retry_after": e.retry_after}).encode()
+                    await send_response(writer, 429, body, [("Content-Type", "application/json"),
+                                                            ("Retry-After", str(e.retry_after))])
+                    return
+                await stream_job(writer, job, extra_headers=[("X-Job-Id", job.id)])
+            return fill
+        parts = req.path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            job = get_job_manager().get(parts[1])
+            if job is None:
+                return None  # Flask answers 404
+            after = int(req.headers.get("last-event-id") or req.args.get("after") or 0)
+            return lambda writer: stream_job(writer, job, after)
+        return None
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle, self.host, self.port, backlog=4096,
+                                            limit=MAX_HEADER_BYTES)
+        logger.info(f"🚀 FormAI Bot async server on http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve FormAI Bot with native async SSE streams")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5001")))
+    args = parser.parse_args(argv)
+
+    from formbot.chromedriver import get_resolution
+    flask_app.configure_logging()
+    flask_app.log_openai_settings()
+    try:
+        get_resolution().resolve()
+    except Exception as e:
+        logger.warning(f"⚠️ chromedriver not resolved at startup: {e}")
+    try:
+        asyncio.run(AsyncServer(args.host, args.port).serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Record real sites into a replay corpus, then rerun FormFlow over it offline and diff the result.
+
+    python -m bench.corpus record corpus/ https://example.com https://acme.example/contact
+    python -m bench.corpus replay corpus/ --concurrency 1,4 --save-baseline baseline.json
+    python -m bench.corpus replay corpus/ --concurrency 4 --baseline baseline.json --json after.json
+
+record runs FormFlow once per URL through the recording proxy (bench/replay_proxy.py) and stores
+every response in corpus/<host>-<hash>.zip together with the live outcome and stage timings.
+Recording submits the forms for real. replay serves the whole corpus from the proxy, with no
+network, at each concurrency level. It reports outcomes, per-stage latency and proxy misses, that
+is, requests the archive never saw: a changed page flow or a non-deterministic URL. With
+--baseline, outcomes and stage timings are diffed against a saved replay. The exit code is 1 when
+a URL that was confirmed in the baseline is not confirmed any more.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.flow_bench import DATASET, classify_status, stage_summary
+from bench.replay_proxy import Archive, ReplayProxy, load_corpus
+from formbot.domains import hostname, normalize_url
+
+logger = logging.getLogger("formbot")
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def archive_name(url):
+    return f"{hostname(url) or 'site'}-{hashlib.sha1(url.encode()).hexdigest()[:8]}.zip"
+
+
+def run_flow(url, debug=False):
+    from formbot.flow import FormFlow
+    flow = FormFlow(url, dict(DATASET), debug=debug)
+    status = flow.run()
+    return {
+        "url": url,
+        "outcome": classify_status(status),
+        "verdict": flow.verdict,
+        "status": _ANSI.sub("", str(status)),
+        "timings": {k: round(v, 3) for k, v in flow.timings.items()},
+    }
+
+
+# ---------- Record ----------
+def record(corpus_dir, urls, debug=False):
+    os.makedirs(corpus_dir, exist_ok=True)
+    results = []
+    with ReplayProxy("record") as proxy:
+        os.environ["FORMBOT_PROXY"] = proxy.url
+        for url in (normalize_url(u) for u in urls):
+            # one URL at a time, so every response lands in that URL's archive
+            proxy.archive = Archive(meta={"url": url, "recorded_at": int(time.time())})
+            result = run_flow(url, debug)
+            proxy.archive.meta.update(result, requests=len(proxy.archive))
+            path = os.path.join(corpus_dir, archive_name(url))
+            proxy.archive.save(path)
+            logger.warning(f"📼 {url}: {result['outcome']}, {len(proxy.archive)} responses → {path}")
+            results.append(result)
+    return results
+
+
+# ---------- Replay ----------
+def replay_level(proxy, archives, concurrency, repeat=1, debug=False):
+    proxy.index.rewind()
+    jobs = [a.meta for a in archives for _ in range(repeat)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda meta: dict(run_flow(meta["url"], debug), recorded=meta.get("outcome")), jobs))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "urls": len(jobs),
+        "elapsed": round(elapsed, 2),
+        "urls_per_minute": round(len(jobs) / elapsed * 60, 1) if elapsed else 0.0,
+        "drift": sum(r["outcome"] != r["recorded"] for r in results),
+        "proxy": dict(proxy.index.stats(), missed=proxy.index.missed[:20]),
+        "stages": stage_summary(results),
+        "results": results,
+    }
+
+
+def replay(corpus_dir, levels, repeat=1, debug=False, latency=False, keep_state=False):
+    archives = load_corpus(corpus_dir)
+    if not archives:
+        raise SystemExit(f"No archives in {corpus_dir}; record some first")
+    with ReplayProxy("replay", archives, latency=latency) as proxy:
+        os.environ["FORMBOT_PROXY"] = proxy.url
+        if not keep_state:
+            # learned form plans and remembered verdicts would make later runs take other paths
+            os.environ["FORMBOT_STATE_DIR"] = tempfile.mkdtemp(prefix="formbot-replay-")
+        return [replay_level(proxy, archives, c, repeat, debug) for c in levels]
+
+
+# ---------- Diff ----------
+def _by_url(level):
+    out = {}
+    for r in level["results"]:
+        out.setdefault(r["url"], r)  # first repeat per URL
+    return out
+
+
+def diff_levels(before, after):
+    """Outcome changes and stage/total latency deltas between two replays of the same corpus."""
+    old, new = _by_url(before), _by_url(after)
+    changed = [{"url": url, "before": old[url]["outcome"], "after": r["outcome"]}
+               for url, r in new.items() if url in old and old[url]["outcome"] != r["outcome"]]
+    stages = {}
+    for stage in set(before["stages"]) | set(after["stages"]):
+        a = before["stages"].get(stage, {}).get("p50", 0.0)
+        b = after["stages"].get(stage, {}).get("p50", 0.0)
+        stages[stage] = {"before_p50": round(a, 3), "after_p50": round(b, 3), "delta": round(b - a, 3),
+                         "delta_pct": round(100.0 * (b - a) / a, 1) if a else None}
+    movers = sorted(
+        ({"url": url, "delta": round(r["timings"].get("total", 0) - old[url]["timings"].get("total", 0), 2)}
+         for url, r in new.items() if url in old),
+        key=lambda m: -abs(m["delta"]))
+    return {
+        "concurrency": after["concurrency"],
+        "changed": changed,
+        "regressions": [c for c in changed if c["before"] == "confirmed"],
+        "new_urls": sorted(set(new) - set(old)),
+        "stages": stages,
+        "movers": movers[:5],
+    }
+
+
+def diff_against(baseline, levels):
+    by_concurrency = {level["concurrency"]: level for level in baseline}
+    return [diff_levels(by_concurrency.get(level["concurrency"], baseline[0]), level) for level in levels]
+
+
+# ---------- Report ----------
+def print_report(levels, diffs=None, out=sys.stdout):
+    for level in levels:
+        proxy = level["proxy"]
+        out.write(f"\n=== replay at concurrency {level['concurrency']}: {level['urls']} URLs in "
+                  f"{level['elapsed']:.1f}s → {level['urls_per_minute']:.1f} URLs/min\n"
+                  f"    proxy: {proxy['hits']} hits, {proxy['fuzzy']} fuzzy, {proxy['misses']} misses; "
+                  f"{level['drift']} outcomes differ from the recording\n")
+        for missed in proxy["missed"][:5]:
+            out.write(f"      miss: {missed}\n")
+        out.write(f"    {'stage':<14} {'mean':>7} {'p50':>7} {'p95':>7}\n")
+        for stage, row in sorted(level["stages"].items(), key=lambda kv: -kv[1]["mean"]):
+            out.write(f"    {stage:<14} {row['mean']:>6.2f}s {row['p50']:>6.2f}s {row['p95']:>6.2f}s\n")
+    for d in diffs or []:
+        out.write(f"\n=== vs baseline (concurrency {d['concurrency']}): {len(d['changed'])} outcome changes, "
+                  f"{len(d['regressions'])} regressions\n")
+        for c in d["changed"]:
+            mark = "✗" if c["before"] == "confirmed" else "~"
+            out.write(f"  {mark} {c['url']}: {c['before']} → {c['after']}\n")
+        out.write(f"    {'stage':<14} {'before':>8} {'after':>8} {'delta':>9}\n")
+        for stage, row in sorted(d["stages"].items(), key=lambda kv: -abs(kv[1]["delta"])):
+            pct = f"{row['delta_pct']:+.0f}%" if row["delta_pct"] is not None else "new"
+            out.write(f"    {stage:<14} {row['before_p50']:>7.2f}s {row['after_p50']:>7.2f}s {pct:>9}\n")
+        for m in d["movers"]:
+            out.write(f"    {m['delta']:+6.2f}s total  {m['url']}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record/replay corpus for offline FormFlow regression runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="run FormFlow live through the recording proxy (submits for real)")
+    rec.add_argument("corpus")
+    rec.add_argument("urls", nargs="+")
+    rep = sub.add_parser("replay", help="rerun the corpus offline and report/diff")
+    rep.add_argument("corpus")
+    rep.add_argument("--concurrency", default="1", help="comma-separated worker counts")
+    rep.add_argument("--repeat", type=int, default=1, help="runs per URL per level")
+    rep.add_argument("--latency", action="store_true", help="replay recorded upstream latency per response")
+    rep.add_argument("--keep-state", action="store_true", help="use the normal ~/.formbot state (form plans...)")
+    rep.add_argument("--baseline", help="diff against this saved replay")
+    rep.add_argument("--save-baseline", help="save this replay as a baseline")
+    for p in (rec, rep):
+        p.add_argument("--debug", action="store_true", help="run Chrome non-headless")
+        p.add_argument("--json", dest="json_path", help="write raw results to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    if args.command == "record":
+        results = record(args.corpus, args.urls, args.debug)
+        if args.json_path:
+            with open(args.json_path, "w") as fh:
+                json.dump(results, fh, indent=2)
+        return 0
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    results = replay(args.corpus, levels, args.repeat, args.debug, args.latency, args.keep_state)
+    diffs = None
+    if args.baseline:
+        with open(args.baseline) as fh:
+            diffs = diff_against(json.load(fh), results)
+    print_report(results, diffs)
+    for path in (args.save_baseline, args.json_path):
+        if path:
+            with open(path, "w") as fh:
+                json.dump(results, fh, indent=2)
+    return 1 if diffs and any(d["regressions"] for d in diffs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Local HTTP server for the offline fixture sites in bench/fixtures.
+
+Every site lives under /<site>/ and posts its form to /post/<site>. AJAX posts
+(X-Requested-With) get JSON back; classic posts get an HTML confirmation page,
+or a 303 to /<site>/thank-you/ when the site ships one. Each POST is recorded so
+the benchmark can compare what FormFlow claimed against what actually arrived.
+"""
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+logger = logging.getLogger("formbot")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_manifest(fixtures_dir=FIXTURES_DIR):
+    with open(os.path.join(fixtures_dir, "manifest.json")) as fh:
+        return json.load(fh)["sites"]
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    server_version = "FormbotFixtures/1.0"
+
+    def log_message(self, fmt, *args):
+        logger.debug("[fixtures] " + fmt, *args)
+
+    def do_POST(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "post" or parts[1] not in self.server.sites:
+            self.send_error(404)
+            return
+
+        site = self.server.sites[parts[1]]
+        length = int(self.headers.get("Content-Length") or 0)
+        fields = parse_qs(self.rfile.read(length).decode("utf-8", "replace"))
+        self.server.record(site["site"], fields)
+
+        ajax = self.headers.get("X-Requested-With") == "XMLHttpRequest"
+        thank_you = os.path.join(self.server.fixtures_dir, site["site"], "thank-you")
+        redirect = f"/{site['site']}/thank-you/" if os.path.isdir(thank_you) else None
+
+        if ajax:
+            body = json.dumps({"redirect": redirect} if redirect else {"message": site["message"]}).encode()
+            self._reply(200, "application/json", body)
+        elif redirect:
+            self.send_response(303)
+            self.send_header("Location", redirect)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            html = (
+                f"<!DOCTYPE html><html><head><title>Contact</title></head><body>"
+                f"<div class=\"{site['container']}\">{site['message']}</div></body></html>"
+            )
+            self._reply(200, "text/html; charset=utf-8", html.encode())
+
+    def _reply(self, code, ctype, body):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer:
+    """Serves bench/fixtures on 127.0.0.1 from a background thread."""
+
+    def __init__(self, host="127.0.0.1", port=0, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.sites = {s["site"]: s for s in load_manifest(fixtures_dir)}
+        self.submissions = defaultdict(list)
+        self._lock = threading.Lock()
+
+        handler = lambda *a, **kw: _FixtureHandler(*a, directory=fixtures_dir, **kw)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.sites = self.sites
+        self.httpd.fixtures_dir = fixtures_dir
+        self.httpd.record = self._record
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, site):
+        return f"{self.base_url}/{site}/"
+
+    def _record(self, site, fields):
+        with self._lock:
+            self.submissions[site].append(fields)
+
+    def submission_counts(self):
+        with self._lock:
+            return {site: len(v) for site, v in self.submissions.items()}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        logger.info(f"[fixtures] Serving {len(self.sites)} fixture sites on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Serve the offline fixture sites")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    with FixtureServer(port=args.port) as srv:
+        for name in srv.sites:
+            print(srv.url_for(name))
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,17 @@
+// Emulates vendor AJAX submission: forms marked data-ajax POST to data-endpoint and the
+// server's reply (message or redirect) is rendered into the data-output container.
+document.addEventListener('submit', function (ev) {
+  var form = ev.target;
+  if (!form.hasAttribute('data-ajax')) return;
+  ev.preventDefault();
+  var body = new URLSearchParams(new FormData(form));
+  fetch(form.getAttribute('data-endpoint'), {
+    method: 'POST', body: body, headers: {'X-Requested-With': 'XMLHttpRequest'}
+  }).then(function (r) { return r.json(); }).then(function (data) {
+    if (data.redirect) { window.location.href = data.redirect; return; }
+    var out = document.querySelector(form.getAttribute('data-output'));
+    out.textContent = data.message;
+    out.style.display = 'block';
+    if (form.hasAttribute('data-hide-on-success')) form.style.display = 'none';
+  });
+});
@@ -0,0 +1,203 @@
+"""End-to-end FormFlow benchmark against the local fixture sites.
+
+    python -m bench.flow_bench --concurrency 1,2,4 --repeat 2 --json bench_results.json
+
+For each concurrency level every fixture site is run through FormFlow. The report
+shows per-stage and total latency, URLs per minute, and success accuracy (the
+outcome FormFlow reported vs. the expected one, plus confirmations the fixture
+server never actually received). Peak Chrome RSS per concurrent URL is sampled
+too; compare --tabs 4 (shared Chrome, one tab per URL) with the default of one
+process per URL.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fixture_server import FixtureServer
+from formbot.flow import FormFlow
+from formbot.procinfo import tree_rss
+
+logger = logging.getLogger("formbot")
+
+DATASET = {
+    "name": "Bench User",
+    "email": "bench@example.com",
+    "phone": "5551234567",
+    "message": "Hello, this is a benchmark message from the offline fixture suite.",
+    "zipcode": "12345",
+    "address": "123 St",
+    "city": "Benchville",
+    "state": "Benchstate",
+}
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def classify_status(status):
+    """Map a FormFlow status string onto a coarse outcome label."""
+    s = _ANSI.sub("", str(status))
+    low = s.lower()
+    if s.startswith("[✓]") and "confirmed" in low:
+        return "confirmed"
+    if "no contact form found" in low:
+        return "no_form"
+    if "captcha" in low:
+        return "captcha"
+    if "parked domain" in low:
+        return "parked"
+    if "cloudflare challenge" in low:
+        return "challenge"
+    if "unreachable" in low:
+        return "unreachable"
+    if s.startswith("[Error]"):
+        return "error"
+    return "unconfirmed"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class RssSampler:
+    """Samples the RSS of every process this one spawned (chromedriver + Chrome) and keeps the peak."""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss(os.getpid(), include_self=False))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _run_one(server, site, debug, http_submit=True):
+    flow = FormFlow(server.url_for(site["site"]), dict(DATASET), debug=debug, http_submit=http_submit)
+    status = flow.run()
+    outcome = classify_status(status)
+    return {
+        "site": site["site"],
+        "expect": site["expect"],
+        "outcome": outcome,
+        "ok": outcome == site["expect"],
+        "status": _ANSI.sub("", str(status)),
+        "timings": dict(flow.timings),
+        "steps": list(flow.step_timings),
+        "verdict": flow.verdict,
+    }
+
+
+def run_level(server, sites, concurrency, repeat=1, debug=False, http_submit=True):
+    jobs = [s for s in sites for _ in range(repeat)]
+    before = server.submission_counts()
+    started = time.perf_counter()
+    with RssSampler() as rss, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda s: _run_one(server, s, debug, http_submit), jobs))
+    elapsed = time.perf_counter() - started
+    after = server.submission_counts()
+
+    # Confirmations claimed for a site that the server never received are false positives
+    claimed = defaultdict(int)
+    for r in results:
+        if r["outcome"] == "confirmed":
+            claimed[r["site"]] += 1
+    received = {site: after.get(site, 0) - before.get(site, 0) for site in {s["site"] for s in sites}}
+    phantom = {site: n - received.get(site, 0) for site, n in claimed.items() if n > received.get(site, 0)}
+
+    return {
+        "concurrency": concurrency,
+        "urls": len(jobs),
+        "elapsed": elapsed,
+        "urls_per_minute": len(jobs) / elapsed * 60 if elapsed else 0.0,
+        "accuracy": sum(r["ok"] for r in results) / len(results) if results else 0.0,
+        "phantom_confirmations": phantom,
+        "peak_rss_mb": round(rss.peak / 2 ** 20, 1),
+        "rss_per_url_mb": round(rss.peak / 2 ** 20 / min(concurrency, len(jobs) or 1), 1),
+        "received": received,
+        "results": results,
+    }
+
+
+def stage_summary(results):
+    by_stage = defaultdict(list)
+    for r in results:
+        for stage, secs in r["timings"].items():
+            by_stage[stage].append(secs)
+    return {
+        stage: {"mean": sum(v) / len(v), "p50": percentile(v, 50), "p95": percentile(v, 95), "n": len(v)}
+        for stage, v in by_stage.items()
+    }
+
+
+def print_report(levels, out=sys.stdout):
+    for level in levels:
+        out.write(
+            f"\n=== concurrency {level['concurrency']}: {level['urls']} URLs in {level['elapsed']:.1f}s "
+            f"→ {level['urls_per_minute']:.1f} URLs/min, accuracy {level['accuracy'] * 100:.0f}%\n"
+            f"    peak browser RSS {level['peak_rss_mb']:.0f} MB → {level['rss_per_url_mb']:.0f} MB per concurrent URL\n"
+        )
+        if level["phantom_confirmations"]:
+            out.write(f"    phantom confirmations (claimed, never received): {level['phantom_confirmations']}\n")
+        out.write(f"    {'site':<10} {'expect':<10} {'outcome':<12} {'total':>7}\n")
+        for r in level["results"]:
+            mark = "✓" if r["ok"] else "✗"
+            out.write(
+                f"  {mark} {r['site']:<10} {r['expect']:<10} {r['outcome']:<12} {r['timings'].get('total', 0):>6.1f}s\n"
+            )
+        out.write(f"    {'stage':<14} {'mean':>7} {'p50':>7} {'p95':>7}\n")
+        for stage, row in sorted(stage_summary(level["results"]).items(), key=lambda kv: -kv[1]["mean"]):
+            out.write(f"    {stage:<14} {row['mean']:>6.2f}s {row['p50']:>6.2f}s {row['p95']:>6.2f}s\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline FormFlow benchmark over local fixture sites")
+    parser.add_argument("--concurrency", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per site per level")
+    parser.add_argument("--sites", default="", help="comma-separated subset of fixture sites")
+    parser.add_argument("--debug", action="store_true", help="run Chrome non-headless")
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    parser.add_argument("--browser-only", action="store_true", help="disable the browserless HTTP submit path")
+    parser.add_argument("--tabs", type=int, default=1,
+                        help="URLs per shared Chrome (tab mode); 1 = one Chrome process per URL")
+    args = parser.parse_args(argv)
+    os.environ["FORMBOT_TABS_PER_BROWSER"] = str(args.tabs)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    wanted = {s.strip() for s in args.sites.split(",") if s.strip()}
+
+    with FixtureServer() as server:
+        sites = [s for s in server.sites.values() if not wanted or s["site"] in wanted]
+        results = [run_level(server, sites, c, repeat=args.repeat, debug=args.debug,
+                             http_submit=not args.browser_only) for c in levels]
+
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
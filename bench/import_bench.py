@@ -0,0 +1,103 @@
+"""Import-time report for the entry modules, measured in fresh interpreters.
+
+    python -m bench.import_bench                  # app, aiseo, formbot.flow
+    python -m bench.import_bench app --top 15 --json import_times.json
+
+For each module a clean `python -X importtime -c "import <module>"` is run; the report shows its
+cumulative import time, the slowest modules it imports directly, and which heavy dependencies
+(selenium, openai, requests, bs4, webdriver_manager) were loaded eagerly. tests/test_import_time.py
+enforces the budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY = ("selenium", "openai", "requests", "bs4", "webdriver_manager", "httpx", "pydantic")
+DEFAULT_MODULES = ("app", "aiseo", "formbot.flow")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """[(name, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def measure(module, python=sys.executable):
+    """One fresh interpreter: {module, total_ms, top, heavy}."""
+    code = f"import sys, json; import {module}; print(json.dumps(sorted(sys.modules)))"
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([python, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    total = next((cum for name, _s, cum, depth in rows if name == module and depth == 0), 0)
+    # -X importtime prints children before their parent: the depth-1 rows right before the
+    # module's own row are what it imported (interpreter startup rows are left out)
+    packages, pending = {}, []
+    for name, _s, cum, depth in rows:
+        if depth == 1:
+            pending.append((name, cum))
+        elif depth == 0:
+            if name == module:
+                for top, us in pending:
+                    packages[top] = packages.get(top, 0) + us
+            pending = []
+    return {
+        "module": module,
+        "total_ms": total / 1000.0,
+        "top": sorted(((p, us / 1000.0) for p, us in packages.items()), key=lambda kv: -kv[1]),
+        "heavy": sorted({m.split(".")[0] for m in loaded if m.split(".")[0] in HEAVY}),
+    }
+
+
+def measure_median(module, repeat=3):
+    """Median total over repeat runs (the first run also warms the OS page cache)."""
+    runs = [measure(module) for _ in range(repeat)]
+    runs.sort(key=lambda r: r["total_ms"])
+    best = runs[len(runs) // 2]
+    best["runs_ms"] = [round(r["total_ms"], 1) for r in runs]
+    best["median_ms"] = statistics.median(r["total_ms"] for r in runs)
+    return best
+
+
+def print_report(results, top=10, out=sys.stdout):
+    for r in results:
+        out.write(f"\n=== import {r['module']}: {r['median_ms']:.0f} ms (runs {r['runs_ms']})\n")
+        out.write(f"    eager heavy deps: {', '.join(r['heavy']) or 'none'}\n")
+        for name, ms in r["top"][:top]:
+            out.write(f"    {name:<32} {ms:>8.1f} ms\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time report (python -X importtime) per entry module")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports shown per module")
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    args = parser.parse_args(argv)
+
+    results = [measure_median(m, args.repeat) for m in args.modules]
+    print_report(results, top=args.top)
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Throughput benchmark for the local SEO keyword extractor (formbot/keywords.py).
+
+    python -m bench.keyword_bench --sites 5000
+
+Builds a synthetic background corpus from generated site texts, then times
+extraction and reports sites/minute plus the on-disk corpus size.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from formbot.keywords import BackgroundCorpus, LocalKeywordExtractor
+
+INDUSTRIES = {
+    "dental": "dental clinic, teeth whitening, dental implants, cosmetic dentistry, invisalign, veneers",
+    "plumbing": "emergency plumbing, boiler installs, leak detection, drain cleaning, water heaters",
+    "legal": "personal injury, law firm, car accident claims, free case review, attorneys",
+    "roofing": "roof repair, roof replacement, storm damage, gutters, shingles, inspections",
+    "fitness": "personal training, gym membership, group classes, yoga, nutrition coaching",
+}
+FILLER = "we are a family owned business serving the local community with friendly service and fair prices"
+
+
+def synthetic_site(rng):
+    industry = rng.choice(list(INDUSTRIES))
+    phrases = INDUSTRIES[industry].split(", ")
+    body = " ".join(f"{rng.choice(phrases).capitalize()}, {rng.choice(phrases)}." for _ in range(40))
+    return f"{industry.title()} Co | {FILLER}. {body} {FILLER}."
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local keyword extractor throughput")
+    parser.add_argument("--sites", type=int, default=2000)
+    parser.add_argument("--background", type=int, default=1000, help="documents in the background corpus")
+    parser.add_argument("--bits", type=int, default=18)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.bin")
+        corpus = BackgroundCorpus(path=path, bits=args.bits, autosave_every=10 ** 9)
+        started = time.perf_counter()
+        for _ in range(args.background):
+            corpus.add_document(synthetic_site(rng))
+        corpus.save()
+        build_s = time.perf_counter() - started
+        size = os.path.getsize(path)
+
+        extractor = LocalKeywordExtractor(BackgroundCorpus.load(path))
+        texts = [synthetic_site(rng) for _ in range(args.sites)]
+        started = time.perf_counter()
+        for text in texts:
+            extractor.extract(text, "SEO", top_k=12)
+        elapsed = time.perf_counter() - started
+
+    print(f"background corpus: {args.background} docs in {build_s:.2f}s, {size / 1024:.1f} KiB on disk")
+    print(f"extraction: {args.sites} sites in {elapsed:.2f}s → {args.sites / elapsed * 60:,.0f} sites/min")
+    print(f"sample: {extractor.extract(texts[0], 'SEO', top_k=12)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""Local OpenAI-compatible stand-in for offline pitch-stage benchmarks.
+
+    python -m bench.openai_stub --port 8799 --latency lognormal:-0.4,0.5 --rate-limit-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8799/v1 python app.py
+
+Implements GET /v1/models and POST /v1/chat/completions (plain, stream=true and
+JSON mode) with tunable latency distributions, latency spikes, 5xx error injection, random
+429s and an optional hard requests-per-minute limit.
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("formbot")
+
+CANNED_PITCH = (
+    "Hi there! I came across your website and was impressed by the work you do for your customers. "
+    "At {company}, we specialise in {service} for businesses like yours, helping them reach more of the "
+    "right people and turn visits into enquiries. We would love to share a few quick ideas tailored to "
+    "your site. Feel free to reach out any time. Best regards, the {company} team."
+)
+
+
+def parse_latency(spec):
+    """Turn 'fixed:0.5', 'uniform:0.2,1.0', 'normal:0.8,0.2' or 'lognormal:mu,sigma' into a sampler."""
+    kind, _, args = spec.partition(":")
+    nums = [float(x) for x in args.split(",") if x.strip()] if args else []
+    if kind == "fixed":
+        return lambda: nums[0] if nums else 0.0
+    if kind == "uniform":
+        return lambda: random.uniform(nums[0], nums[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(nums[0], nums[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(nums[0], nums[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class StubConfig:
+    def __init__(self, latency="fixed:0.3", spike_rate=0.0, spike_latency=8.0, error_rate=0.0,
+                 rate_limit_rate=0.0, rpm_limit=0, token_delay=0.02, retry_after=1.0):
+        self.latency = parse_latency(latency)
+        self.latency_spec = latency
+        self.spike_rate = spike_rate
+        self.spike_latency = spike_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm_limit = rpm_limit
+        self.token_delay = token_delay
+        self.retry_after = retry_after
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_version = "OpenAIStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        logger.debug("[openai-stub] " + fmt, *args)
+
+    # ---------- Helpers ----------
+    def _json(self, code, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, code, message, etype, headers=None):
+        self._json(code, {"error": {"message": message, "type": etype, "code": etype}}, headers)
+
+    # ---------- Routes ----------
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._json(200, {"object": "list", "data": [{"id": "gpt-4.1-mini", "object": "model"}]})
+        else:
+            self._error(404, "Not found", "not_found")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._error(400, "Invalid JSON body", "invalid_request_error")
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._error(404, "Not found", "not_found")
+            return
+
+        cfg, stats = self.server.config, self.server.stats
+        stats.bump("requests")
+
+        if cfg.rpm_limit and not self.server.admit():
+            stats.bump("rate_limited")
+            self._error(429, "Rate limit reached for requests", "rate_limit_exceeded",
+                        {"retry-after": f"{cfg.retry_after:g}"})
+            return
+        if random.random() < cfg.rate_limit_rate:
+            stats.bump("rate_limited")
+            self._error(429, "Rate limit reached for requests", "rate_limit_exceeded",
+                        {"retry-after": f"{cfg.retry_after:g}"})
+            return
+
+        delay = cfg.spike_latency if random.random() < cfg.spike_rate else cfg.latency()
+        time.sleep(delay)
+
+        if random.random() < cfg.error_rate:
+            stats.bump("errors")
+            self._error(500, "The server had an error while processing your request.", "server_error")
+            return
+
+        content = self._completion_text(req)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in req.get("messages", [])) // 4
+        if req.get("stream"):
+            self._stream(req, content)
+        else:
+            self._json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": req.get("model", "gpt-4.1-mini"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                          "total_tokens": prompt_tokens + len(content) // 4},
+            })
+        stats.bump("ok")
+
+    def _completion_text(self, req):
+        prompt = " ".join(str(m.get("content", "")) for m in req.get("messages", []))
+        company = _between(prompt, 'from "', '"') or "our team"
+        service = _between(prompt, 'offering "', '"') or "growth"
+        pitch = CANNED_PITCH.format(company=company, service=service)
+        if (req.get("response_format") or {}).get("type") == "json_object":
+            keywords = [f"{service} services", f"local {service}", f"{service} agency", "small business growth",
+                        "online visibility", "lead generation", "customer reviews", "local search"]
+            return json.dumps({"keywords": keywords, "pitch": pitch})
+        return pitch
+
+    def _stream(self, req, content):
+        cid = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta, finish=None):
+            payload = {"id": cid, "object": "chat.completion.chunk", "created": int(time.time()),
+                       "model": req.get("model", "gpt-4.1-mini"),
+                       "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+
+        try:
+            chunk({"role": "assistant", "content": ""})
+            for word in content.split(" "):
+                chunk({"content": word + " "})
+                time.sleep(self.server.config.token_delay)
+            chunk({}, finish="stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # cancelled hedge or client gave up mid-stream
+            self.server.stats.bump("client_disconnects")
+
+
+def _between(text, start, end):
+    i = text.find(start)
+    if i < 0:
+        return None
+    j = text.find(end, i + len(start))
+    return text[i + len(start):j] if j > 0 else None
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def bump(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class OpenAIStub:
+    """Threaded stub server; use as a context manager or call start()/stop()."""
+
+    def __init__(self, host="127.0.0.1", port=0, config=None):
+        self.config = config or StubConfig()
+        self.stats = _Stats()
+        self.httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = self.config
+        self.httpd.stats = self.stats
+        self.httpd.admit = self._admit
+        self._window = []
+        self._window_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _admit(self):
+        """Sliding 60s window enforcing config.rpm_limit."""
+        now = time.monotonic()
+        with self._window_lock:
+            self._window = [t for t in self._window if now - t < 60]
+            if len(self._window) >= self.config.rpm_limit:
+                return False
+            self._window.append(now)
+            return True
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="openai-stub", daemon=True)
+        self._thread.start()
+        logger.info(f"[openai-stub] Listening on {self.base_url} (latency={self.config.latency_spec})")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--latency", default="lognormal:-0.7,0.5",
+                        help="fixed:S | uniform:A,B | normal:MU,SD | lognormal:MU,SIGMA (seconds)")
+    parser.add_argument("--spike-rate", type=float, default=0.0, help="fraction of calls hit by a latency spike")
+    parser.add_argument("--spike-latency", type=float, default=8.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--rpm-limit", type=int, default=0, help="hard requests-per-minute limit (0 = off)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed chunks")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    return parser
+
+
+def config_from_args(args):
+    return StubConfig(latency=args.latency, spike_rate=args.spike_rate, spike_latency=args.spike_latency,
+                      error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                      rpm_limit=args.rpm_limit, token_delay=args.token_delay, retry_after=args.retry_after)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = add_stub_arguments(argparse.ArgumentParser(description="Local OpenAI-compatible stub server"))
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+    stub = OpenAIStub(port=args.port, config=config_from_args(args)).start()
+    print(f"OPENAI_BASE_URL={stub.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+        print(json.dumps(stub.stats.snapshot()))
@@ -0,0 +1,117 @@
+"""Payload bytes and latency per in-page helper call, inline source vs. the page library.
+
+    python -m bench.page_lib_bench                       # bytes only (no browser needed)
+    python -m bench.page_lib_bench --live --calls 50     # + latency against a fixture page in Chrome
+
+"before" is execute_script with the helper's full source (what every call used to send);
+"after" is the stub formbot/page_lib.py sends once the library is in the document. Bytes are
+the JSON body of the WebDriver execute/sync request. --live runs each read-only helper --calls
+times both ways on a fixture site and reports p50/p95 latency.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from bench.fixture_server import FixtureServer
+from bench.flow_bench import percentile
+import formbot.flow  # noqa: F401  (registers every helper script)
+from formbot.form_signatures import POS_ATTR
+from formbot.page_lib import get_page_lib
+from formbot.snapshot import FORM_CONTAINERS
+from formbot.success_checker import SuccessChecker
+
+# representative arguments per helper; replay_form mutates the page so it is measured for bytes only
+ARGS = {
+    "snapshot": (3, SuccessChecker.SUCCESS_SELECTORS, FORM_CONTAINERS, 20000),
+    "controls": (),
+    "dismiss_overlays": (None, False),
+    "capture_form": (POS_ATTR,),
+    "links": (15,),
+    "replay_form": (0, [[0, "name", "Bench User"], [1, "email", "bench@example.com"]], None),
+}
+READ_ONLY = ("snapshot", "controls", "capture_form", "links")
+
+
+def request_bytes(script, args):
+    return len(json.dumps({"script": script, "args": list(args)}).encode())
+
+
+def payload_report():
+    lib = get_page_lib()
+    rows = []
+    for name, args in ARGS.items():
+        before = request_bytes(lib._scripts[name], args)
+        after = request_bytes(lib.stub(name), args)
+        rows.append({"helper": name, "before_bytes": before, "after_bytes": after,
+                     "saved_pct": round(100.0 * (before - after) / before, 1)})
+    return {"version": lib.version, "library_bytes": len(lib.source), "helpers": rows}
+
+
+def _time_calls(fn, calls):
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(percentile(samples, 50), 2), "p95_ms": round(percentile(samples, 95), 2)}
+
+
+def live_report(calls, site, headless=True):
+    from formbot.driver_manager import DriverManager
+    lib = get_page_lib()
+    rows = []
+    with FixtureServer() as server:
+        driver = DriverManager.get_driver(headless=headless, tabs=False)
+        try:
+            driver.get(server.url_for(site))
+            lib.install(driver)
+            driver.refresh()  # the new document gets the library from the CDP registration
+            for name in READ_ONLY:
+                args = ARGS[name]
+                before = _time_calls(lambda: driver.execute_script(lib._scripts[name], *args), calls)
+                fallbacks = lib.fallbacks
+                after = _time_calls(lambda: lib.call(driver, name, *args), calls)
+                rows.append({"helper": name, "before": before, "after": after,
+                             "fallbacks": lib.fallbacks - fallbacks})
+        finally:
+            DriverManager.cleanup(driver)
+    return rows
+
+
+def print_report(payload, live=None, out=sys.stdout):
+    out.write(f"\n=== page library {payload['version']}: {payload['library_bytes']} bytes, "
+              f"installed once per document\n")
+    out.write(f"    {'helper':<18} {'before':>9} {'after':>9} {'saved':>7}\n")
+    for r in payload["helpers"]:
+        out.write(f"    {r['helper']:<18} {r['before_bytes']:>8}B {r['after_bytes']:>8}B {r['saved_pct']:>6.1f}%\n")
+    if live:
+        out.write(f"\n    {'helper':<18} {'before p50':>11} {'p95':>8} {'after p50':>11} {'p95':>8}\n")
+        for r in live:
+            out.write(f"    {r['helper']:<18} {r['before']['p50_ms']:>9.2f}ms {r['before']['p95_ms']:>6.2f}ms "
+                      f"{r['after']['p50_ms']:>9.2f}ms {r['after']['p95_ms']:>6.2f}ms"
+                      f"{'  (fallbacks: %d)' % r['fallbacks'] if r['fallbacks'] else ''}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-call payload and latency: inline helper source vs page library")
+    parser.add_argument("--live", action="store_true", help="also time calls in Chrome against a fixture page")
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--site", default="cf7", help="fixture site for --live")
+    parser.add_argument("--debug", action="store_true", help="run Chrome non-headless")
+    parser.add_argument("--json", dest="json_path", help="write raw results to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    payload = payload_report()
+    live = live_report(args.calls, args.site, headless=not args.debug) if args.live else None
+    print_report(payload, live)
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump({"payload": payload, "live": live}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
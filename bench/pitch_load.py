@@ -0,0 +1,97 @@
+"""Load test for the pitch stage (app.generate_pitch) against the local OpenAI stub.
+
+    python -m bench.pitch_load --calls 200 --concurrency 1,8,32 --latency lognormal:-0.7,0.5 --rate-limit-rate 0.05
+
+Starts bench.openai_stub in-process (unless --base-url points at a running one),
+points OPENAI_BASE_URL at it before app.py builds its client, then reports
+throughput and p50/p95/p99 latency per concurrency level.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.flow_bench import percentile
+from bench.openai_stub import OpenAIStub, add_stub_arguments, config_from_args
+from formbot.pitch_service import PitchError
+
+WEBSITE_TEXT = (
+    "Acme Plumbing | Emergency plumbers in Springfield. Family-owned since 1998. Boiler installs, "
+    "leak detection, bathroom remodels. Call us 24/7 for fast, friendly service. "
+) * 20
+
+
+def run_level(generate_pitch, calls, concurrency):
+    def one(_):
+        start = time.perf_counter()
+        try:
+            generate_pitch(WEBSITE_TEXT, "Leado", "hello@leado.ai", "5551234567", "SEO")
+            failed = False
+        except PitchError:
+            failed = True
+        return time.perf_counter() - start, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(calls)))
+    elapsed = time.perf_counter() - started
+    latencies = [s[0] for s in samples]
+    return {
+        "concurrency": concurrency,
+        "calls": calls,
+        "elapsed": elapsed,
+        "throughput_per_s": calls / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else 0.0,
+        "errors": sum(1 for s in samples if s[1]),
+    }
+
+
+def main(argv=None):
+    parser = add_stub_arguments(argparse.ArgumentParser(description="Pitch-stage load test"))
+    parser.add_argument("--calls", type=int, default=100, help="calls per concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--base-url", help="use an already running stub/endpoint instead of starting one")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    stub = None
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    else:
+        stub = OpenAIStub(config=config_from_args(args)).start()
+        os.environ["OPENAI_BASE_URL"] = stub.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "local-stub")
+
+    import app
+    from formbot.llm import get_pitch_service
+    logging.getLogger("formbot").setLevel(logging.WARNING)
+
+    try:
+        levels = [run_level(app.generate_pitch, args.calls, int(c))
+                  for c in args.concurrency.split(",") if c.strip()]
+    finally:
+        if stub:
+            stub.stop()
+
+    for lv in levels:
+        print(f"concurrency={lv['concurrency']:>3}  {lv['throughput_per_s']:>7.2f} calls/s  "
+              f"p50={lv['p50']:.2f}s p95={lv['p95']:.2f}s p99={lv['p99']:.2f}s max={lv['max']:.2f}s  "
+              f"errors={lv['errors']}/{lv['calls']}")
+    print(f"pitch service stats: {get_pitch_service().stats()}")
+    if stub:
+        print(f"stub stats: {stub.stats.snapshot()}")
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(levels, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""Record/replay HTTP(S) proxy for offline regression runs over real sites.
+
+In record mode every request Chrome and formbot's requests session make is forwarded upstream
+and its (decoded) response is appended to the current Archive. In replay mode the same proxy
+answers from one or more archives and never touches the network. HTTPS is terminated with one
+self-signed certificate (made once with openssl); Chrome runs with --ignore-certificate-errors
+and the requests session skips verification whenever FORMBOT_PROXY is set.
+
+    python -m bench.replay_proxy corpus/ --port 8780       # serve a corpus by hand
+    FORMBOT_PROXY=http://127.0.0.1:8780 python app.py
+"""
+import hashlib
+import json
+import logging
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from formbot.state import atomic_write, state_path
+
+logger = logging.getLogger("formbot")
+
+HOP_HEADERS = {"connection", "proxy-connection", "keep-alive", "transfer-encoding", "te", "trailer",
+               "upgrade", "proxy-authorization", "proxy-authenticate"}
+# bodies are stored decoded, so the encoding and length headers are rewritten on the way out
+DROP_RESPONSE_HEADERS = HOP_HEADERS | {"content-encoding", "content-length"}
+
+
+def proxy_cert():
+    """Path of the PEM (key + certificate) used for every intercepted HTTPS host."""
+    path = state_path("replay_proxy.pem")
+    if not path.exists():
+        with tempfile.TemporaryDirectory() as tmp:
+            key, cert = os.path.join(tmp, "key.pem"), os.path.join(tmp, "cert.pem")
+            subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "3650",
+                            "-subj", "/CN=formbot-replay", "-keyout", key, "-out", cert],
+                           check=True, capture_output=True)
+            with open(key, "rb") as k, open(cert, "rb") as c:
+                atomic_write(path, k.read() + c.read())
+    return str(path)
+
+
+class Archive:
+    """Every response of one recorded FormFlow run, in request order, plus its meta (URL,
+    outcome, timings). Stored as a zip: index.json and bodies/<sha1> (deduplicated)."""
+
+    def __init__(self, meta=None, entries=None, bodies=None):
+        self.meta = meta or {}
+        self.entries = entries or []  # {method, url, status, headers, body, elapsed}
+        self.bodies = bodies or {}
+        self._lock = threading.Lock()
+
+    def add(self, method, url, status, headers, body, elapsed):
+        digest = hashlib.sha1(body).hexdigest()
+        with self._lock:
+            self.bodies[digest] = body
+            self.entries.append({"method": method, "url": url, "status": status, "headers": headers,
+                                 "body": digest, "elapsed": round(elapsed, 4)})
+
+    def save(self, path):
+        with self._lock:
+            index = json.dumps({"meta": self.meta, "entries": self.entries}, indent=1)
+            bodies = dict(self.bodies)
+        tmp = f"{path}.tmp"
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("index.json", index)
+            for digest, body in bodies.items():
+                zf.writestr(f"bodies/{digest}", body)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with zipfile.ZipFile(path) as zf:
+            index = json.loads(zf.read("index.json"))
+            bodies = {name.split("/", 1)[1]: zf.read(name) for name in zf.namelist() if name.startswith("bodies/")}
+        return cls(index["meta"], index["entries"], bodies)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class ReplayIndex:
+    """Lookup over a set of archives. Repeated requests for one URL get the recorded responses
+    in order (then the last one again); URLs only seen with another query string fall back to
+    the first response recorded for the same path."""
+
+    def __init__(self, archives):
+        self._exact, self._path = {}, {}
+        for archive in archives:
+            for entry in archive.entries:
+                entry = dict(entry, body=archive.bodies[entry["body"]])
+                self._exact.setdefault((entry["method"], entry["url"]), []).append(entry)
+                self._path.setdefault((entry["method"], entry["url"].split("?")[0]), entry)
+        self._cursor = {}
+        self._lock = threading.Lock()
+        self.hits = self.fuzzy = self.misses = 0
+        self.missed = []
+
+    def rewind(self):
+        with self._lock:
+            self._cursor = {}
+            self.hits = self.fuzzy = self.misses = 0
+            self.missed = []
+
+    def lookup(self, method, url):
+        key = (method, url)
+        with self._lock:
+            responses = self._exact.get(key)
+            if responses:
+                i = self._cursor.get(key, 0)
+                self._cursor[key] = i + 1
+                self.hits += 1
+                return responses[min(i, len(responses) - 1)]
+            entry = self._path.get((method, url.split("?")[0]))
+            if entry is not None:
+                self.fuzzy += 1
+                return entry
+            self.misses += 1
+            if len(self.missed) < 200:
+                self.missed.append(f"{method} {url}")
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "fuzzy": self.fuzzy, "misses": self.misses}
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FormbotReplay/1.0"
+
+    def log_message(self, fmt, *args):
+        logger.debug("[replay] " + fmt, *args)
+
+    def do_CONNECT(self):
+        self.send_response(200, "Connection established")
+        self.end_headers()
+        self.wfile.flush()
+        origin = "https://" + self.path if not self.path.endswith(":443") else "https://" + self.path[:-4]
+        try:
+            tls = self.server.tls.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError) as e:
+            logger.debug(f"[replay] TLS handshake with client failed for {self.path}: {e}")
+            self.close_connection = True
+            return
+        self.connection = self.request = tls
+        self.rfile = tls.makefile("rb")
+        self.wfile = tls.makefile("wb")
+        self.origin = origin
+        self.close_connection = False
+        while not self.close_connection:
+            self.handle_one_request()
+        self.close_connection = True
+
+    def _url(self):
+        origin = getattr(self, "origin", None)
+        return origin + self.path if origin else self.path
+
+    def _proxy(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = self._url()
+        if not url.startswith(("http://", "https://")):
+            self._reply(400, [("Content-Type", "text/plain")], b"formbot replay proxy: absolute URL expected")
+            return
+        status, headers, payload = self.server.proxy.respond(self.command, url, dict(self.headers), body)
+        self._reply(status, headers, payload)
+
+    def _reply(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers:
+            if name.lower() not in DROP_RESPONSE_HEADERS:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _proxy
+
+
+class ReplayProxy:
+    """Recording or replaying proxy on 127.0.0.1 (background thread).
+
+    mode="record": forwards upstream and appends to self.archive (swap it between runs).
+    mode="replay": answers from ReplayIndex(archives); unknown URLs get a 404, counted as misses.
+    latency=True replays each response after its recorded upstream time instead of at once."""
+
+    def __init__(self, mode="replay", archives=(), host="127.0.0.1", port=0, latency=False):
+        self.mode = mode
+        self.archive = Archive()
+        self.index = ReplayIndex(archives) if mode == "replay" else None
+        self.latency = latency
+        self._session = None
+        self.httpd = ThreadingHTTPServer((host, port), _ProxyHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.proxy = self
+        self.httpd.tls = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.httpd.tls.load_cert_chain(proxy_cert())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _upstream(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.trust_env = False  # never loop back through FORMBOT_PROXY/HTTPS_PROXY
+        return self._session
+
+    def respond(self, method, url, headers, body):
+        """(status, [(header, value)], body) for one proxied request."""
+        if self.mode == "replay":
+            entry = self.index.lookup(method, url)
+            if entry is None:
+                return 404, [("Content-Type", "text/plain")], b"formbot replay proxy: not in archive"
+            if self.latency and entry["elapsed"]:
+                time.sleep(entry["elapsed"])
+            return entry["status"], entry["headers"], entry["body"]
+
+        forward = {k: v for k, v in headers.items() if k.lower() not in HOP_HEADERS | {"host"}}
+        forward["Accept-Encoding"] = "gzip, deflate"  # what requests can decode before storing
+        started = time.perf_counter()
+        try:
+            resp = self._upstream().request(method, url, headers=forward, data=body or None,
+                                            allow_redirects=False, timeout=(8, 30), verify=True)
+        except Exception as e:
+            logger.debug(f"[replay] Upstream {method} {url} failed: {e}")
+            return 502, [("Content-Type", "text/plain")], f"upstream failed: {e}".encode()
+        elapsed = time.perf_counter() - started
+        header_list = [(k, v) for k, v in resp.raw.headers.iteritems() if k.lower() not in DROP_RESPONSE_HEADERS]
+        self.archive.add(method, url, resp.status_code, header_list, resp.content, elapsed)
+        return resp.status_code, header_list, resp.content
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="replay-proxy", daemon=True)
+        self._thread.start()
+        logger.info(f"[replay] {self.mode} proxy on {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def load_corpus(corpus_dir):
+    """Archives of a corpus directory (one .zip per recorded URL), sorted by file name."""
+    return [Archive.load(os.path.join(corpus_dir, name))
+            for name in sorted(os.listdir(corpus_dir)) if name.endswith(".zip")]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Serve a recorded corpus as an offline HTTP(S) proxy")
+    parser.add_argument("corpus")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--latency", action="store_true", help="replay recorded upstream latency")
+    args = parser.parse_args()
+    archives = load_corpus(args.corpus)
+    with ReplayProxy("replay", archives, port=args.port, latency=args.latency) as proxy:
+        print(f"FORMBOT_PROXY={proxy.url}  ({len(archives)} archives)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,187 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger("formbot")
+
+DEFAULT_MAX_BROWSERS = 4
+
+
+class Overloaded(Exception):
+    """The pending-URL queue is full; retry after `retry_after` seconds (HTTP 429)."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionTimeout(Exception):
+    """No browser slot came free within the caller's timeout."""
+
+
+def browser_slots():
+    """Concurrent browser sessions: FORMBOT_MAX_BROWSERS Chromes, times the tabs each one serves."""
+    browsers = int(os.getenv("FORMBOT_MAX_BROWSERS", "0") or 0) or DEFAULT_MAX_BROWSERS
+    tabs = max(1, int(os.getenv("FORMBOT_TABS_PER_BROWSER", "1") or 1))
+    return browsers * tabs
+
+
+class Lease:
+    """One browser slot; release() is idempotent so every exit path may call it."""
+
+    def __init__(self, admission, caller):
+        self.admission = admission
+        self.caller = caller
+        self.granted = time.monotonic()
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.admission._release(self)
+
+
+class Ticket:
+    """A caller's accepted URLs; each finished URL frees its pending place."""
+
+    def __init__(self, admission, caller, urls):
+        self.admission = admission
+        self.caller = caller
+        self.remaining = urls
+
+    def done(self, n=1):
+        n = min(n, self.remaining)
+        if n > 0:
+            self.remaining -= n
+            self.admission._finish(self.caller, n)
+
+    def close(self):
+        self.done(self.remaining)
+
+
+class Admission:
+    """Global gate in front of Chrome: at most max_browsers live browser sessions and
+    max_pending accepted-but-unfinished URLs. Waiting sessions are granted round-robin
+    across callers, so one large batch cannot starve a small one."""
+
+    def __init__(self, max_browsers=None, max_pending=None, wait_timeout=None):
+        self.max_browsers = max_browsers or browser_slots()
+        self.max_pending = max_pending or int(os.getenv("FORMBOT_MAX_PENDING_URLS", "200") or 200)
+        self.wait_timeout = wait_timeout if wait_timeout is not None else \
+            float(os.getenv("FORMBOT_ADMISSION_TIMEOUT", "900") or 900)
+        self.in_use = 0
+        self.pending = 0
+        self.pending_by_caller = {}
+        self.granted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.avg_wait = 0.0
+        self.avg_hold = 30.0  # EWMA seconds per browser session; seeds Retry-After
+        self._waiting = OrderedDict()  # caller -> deque of waiter tokens, served round-robin
+        self._cond = threading.Condition()
+
+    # ---------- Pending URLs ----------
+    def admit(self, caller, urls):
+        """Ticket for urls more URLs from caller, or Overloaded when the queue would overflow."""
+        with self._cond:
+            if self.pending and self.pending + urls > self.max_pending:
+                self.rejected += 1
+                retry_after = self._retry_after(self.pending + urls - self.max_pending)
+                raise Overloaded(f"{self.pending} URLs pending (limit {self.max_pending})", retry_after)
+            self.pending += urls
+            self.pending_by_caller[caller] = self.pending_by_caller.get(caller, 0) + urls
+        return Ticket(self, caller, urls)
+
+    def _finish(self, caller, n):
+        with self._cond:
+            self.pending -= n
+            left = self.pending_by_caller.get(caller, 0) - n
+            if left > 0:
+                self.pending_by_caller[caller] = left
+            else:
+                self.pending_by_caller.pop(caller, None)
+
+    def _retry_after(self, overflow):
+        """Seconds until roughly `overflow` URLs have drained through the browser slots."""
+        return max(1, min(600, math.ceil(self.avg_hold * overflow / self.max_browsers)))
+
+    # ---------- Browser slots ----------
+    def _head(self):
+        for queue in self._waiting.values():
+            return queue[0]
+        return None
+
+    def _drop(self, caller, waiter):
+        queue = self._waiting.get(caller)
+        if queue is None:
+            return
+        queue.remove(waiter)
+        del self._waiting[caller]
+        if queue:
+            self._waiting[caller] = queue  # back of the line: next grant goes to another caller
+
+    def acquire(self, caller, timeout=None):
+        """Block until a browser slot is free and it is caller's turn; returns a Lease."""
+        timeout = self.wait_timeout if timeout is None else timeout
+        waiter = object()
+        started = time.monotonic()
+        with self._cond:
+            self._waiting.setdefault(caller, deque()).append(waiter)
+            while self.in_use >= self.max_browsers or self._head() is not waiter:
+                remaining = started + timeout - time.monotonic()
+                if remaining <= 0:
+                    self._drop(caller, waiter)
+                    self.timeouts += 1
+                    self._cond.notify_all()
+                    raise AdmissionTimeout(f"No browser slot free after {timeout:g}s")
+                self._cond.wait(remaining)
+            self._drop(caller, waiter)
+            self.in_use += 1
+            self.granted += 1
+            waited = time.monotonic() - started
+            self.avg_wait = 0.8 * self.avg_wait + 0.2 * waited
+            self._cond.notify_all()
+        if waited > 1:
+            logger.info(f"🚦 Browser slot for {caller} after {waited:.1f}s in queue")
+        return Lease(self, caller)
+
+    def _release(self, lease):
+        with self._cond:
+            self.in_use -= 1
+            self.avg_hold = 0.8 * self.avg_hold + 0.2 * (time.monotonic() - lease.granted)
+            self._cond.notify_all()
+
+    # ---------- Stats ----------
+    def stats(self):
+        with self._cond:
+            return {
+                "browsers_in_use": self.in_use,
+                "max_browsers": self.max_browsers,
+                "waiting": sum(len(q) for q in self._waiting.values()),
+                "waiting_callers": len(self._waiting),
+                "pending_urls": self.pending,
+                "max_pending_urls": self.max_pending,
+                "pending_by_caller": dict(self.pending_by_caller),
+                "granted": self.granted,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "avg_wait_s": round(self.avg_wait, 2),
+                "avg_session_s": round(self.avg_hold, 1),
+            }
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_admission():
+    """Process-wide gate configured from FORMBOT_MAX_BROWSERS, FORMBOT_TABS_PER_BROWSER,
+    FORMBOT_MAX_PENDING_URLS and FORMBOT_ADMISSION_TIMEOUT."""
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            _admission = Admission()
+        return _admission
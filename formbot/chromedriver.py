@@ -0,0 +1,153 @@
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from formbot.state import atomic_write, state_path
+
+logger = logging.getLogger("formbot")
+
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium-browser", "chromium"]
+# where webdriver_manager keeps the drivers it downloaded (reused offline)
+WDM_CACHE = Path.home() / ".wdm" / "drivers" / "chromedriver"
+
+
+def offline_mode():
+    """FORMBOT_OFFLINE=1: never download; use FORMBOT_CHROMEDRIVER, the manifest, PATH or the wdm cache."""
+    return os.getenv("FORMBOT_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def chrome_binary():
+    explicit = os.getenv("FORMBOT_CHROME_BINARY")
+    if explicit:
+        return explicit
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return os.path.realpath(path)
+    return None
+
+
+def chrome_version(binary):
+    """Full version string of the Chrome at binary (one subprocess), or None."""
+    if not binary:
+        return None
+    try:
+        result = subprocess.run([binary, "--version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, timeout=15)
+    except Exception:
+        return None
+    m = re.search(r"(\d+\.\d+\.\d+\.\d+)", (result.stdout or result.stderr or "").strip())
+    return m.group(1) if m else None
+
+
+def _fingerprint(path):
+    """Cheap identity of a binary (no subprocess): changes when Chrome is upgraded."""
+    try:
+        st = os.stat(path)
+        return [int(st.st_mtime), st.st_size]
+    except (OSError, TypeError):
+        return None
+
+
+class DriverResolution:
+    """Chrome version + chromedriver path, resolved once and persisted in chromedriver.json.
+    The manifest stays valid while the Chrome binary and the driver file are unchanged."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._resolved = None
+        self.elapsed = 0.0
+        self.source = None
+
+    def _load(self):
+        if not self.path:
+            return None
+        try:
+            with open(self.path) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"[chromedriver] Ignoring unreadable manifest {self.path}: {e}")
+            return None
+
+    def _valid(self, entry, binary):
+        return bool(entry and entry.get("driver_path") and os.access(entry["driver_path"], os.X_OK)
+                    and entry.get("chrome_binary") == binary
+                    and entry.get("chrome_fingerprint") == _fingerprint(binary))
+
+    @staticmethod
+    def _cached_driver(version):
+        """Newest driver in webdriver_manager's cache, preferring Chrome's major version."""
+        found = [p for p in glob.glob(str(WDM_CACHE / "**" / "chromedriver"), recursive=True) if os.access(p, os.X_OK)]
+        major = (version or "").split(".")[0]
+        preferred = [p for p in found if major and f"{os.sep}{major}." in p]
+        return max(preferred or found, key=os.path.getmtime, default=None)
+
+    def _download(self, version):
+        from webdriver_manager.chrome import ChromeDriverManager  # network + file lock; only on a cache miss
+        return ChromeDriverManager(driver_version=version).install() if version else ChromeDriverManager().install()
+
+    def _resolve(self, refresh, offline):
+        binary = chrome_binary()
+        explicit = os.getenv("FORMBOT_CHROMEDRIVER")
+        entry = None if refresh else self._load()
+        if self._valid(entry, binary) and (not explicit or entry["driver_path"] == explicit):
+            self.source = "manifest"
+            return entry
+
+        version = chrome_version(binary)
+        if explicit:
+            driver_path, self.source = explicit, "env"
+        elif offline:
+            driver_path = shutil.which("chromedriver") or self._cached_driver(version)
+            self.source = "offline"
+            if not driver_path:
+                raise RuntimeError("Offline mode: no chromedriver found (set FORMBOT_CHROMEDRIVER or "
+                                   "run `python -m formbot.preflight` once with network access)")
+        else:
+            driver_path, self.source = self._download(version), "download"
+
+        entry = {"chrome_binary": binary, "chrome_fingerprint": _fingerprint(binary), "chrome_version": version,
+                 "driver_path": driver_path, "resolved_at": int(time.time())}
+        if self.path:
+            try:
+                atomic_write(self.path, json.dumps(entry, indent=1).encode())
+            except Exception as e:
+                logger.debug(f"[chromedriver] Could not save manifest: {e}")
+        return entry
+
+    def resolve(self, refresh=False, offline=None):
+        """Manifest entry with driver_path; resolved at most once per process unless refresh."""
+        with self._lock:
+            if self._resolved is None or refresh:
+                started = time.perf_counter()
+                self._resolved = self._resolve(refresh, offline_mode() if offline is None else offline)
+                self.elapsed = time.perf_counter() - started
+                logger.debug(f"[chromedriver] {self._resolved['driver_path']} "
+                             f"(Chrome {self._resolved.get('chrome_version')}, {self.source}, {self.elapsed:.2f}s)")
+            return self._resolved
+
+
+_resolution = None
+_resolution_lock = threading.Lock()
+
+
+def get_resolution():
+    global _resolution
+    with _resolution_lock:
+        if _resolution is None:
+            _resolution = DriverResolution(state_path("chromedriver.json"))
+        return _resolution
+
+
+def driver_path():
+    return get_resolution().resolve()["driver_path"]
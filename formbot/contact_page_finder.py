@@ -1,11 +1,21 @@
 import logging
+import os
 import time
 from urllib.parse import urljoin
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
+from formbot.page_lib import get_page_lib, page_call
+from formbot.snapshot import take_snapshot
 
 logger = logging.getLogger("formbot")
 
+# (visible text, absolute href) of the first `limit` anchors, read in one call
+LINKS_SCRIPT = r"""
+return Array.from(document.querySelectorAll('a')).slice(0, arguments[0])
+  .map(a => [(a.innerText || '').trim(), a.getAttribute('href') ? a.href : '']);
+"""
+get_page_lib().register("links", LINKS_SCRIPT)
+
 
 class ContactPageFinder:
     CONTACT_KEYWORDS = [
@@ -23,11 +33,16 @@ class ContactPageFinder:
 
     NEWSLETTER_HINTS = ["newsletter", "subscribe", "sign up", "sign-up"]
 
-    def __init__(self, driver, timeout=15, debug=False, max_runtime=30):
+    def __init__(self, driver, timeout=15, debug=False, max_runtime=30, race=None):
         self.driver = driver
         self.timeout = timeout
         self.debug = debug
         self.max_runtime = max_runtime
+        # race=True checks all candidates at once (formbot/contact_race.py); default FORMBOT_CONTACT_RACE=1
+        self.race = race if race is not None else \
+            os.getenv("FORMBOT_CONTACT_RACE", "1").lower() not in ("0", "false", "no")
+        self.cancelled = None  # threading.Event set when another probe already won
+        self.race_stats = None
 
     def log(self, msg):
         if self.debug:
@@ -85,55 +100,60 @@ class ContactPageFinder:
             pass
         return False
 
+    def _summary_looks_like_contact_form(self, form):
+        """_looks_like_contact_form for a form summary from formbot/snapshot.py (no round trips)."""
+        if any(h in form["text"] for h in self.NEWSLETTER_HINTS):
+            self.log("Rejected newsletter/subscribe form")
+            return False
+        if not form["inputs"] and form["hubspot"]:
+            self.log("✔️ Accepting HubSpot form shell")
+            return True
+        return form["textareas"] > 0 or form["text_inputs"] >= 2
+
+    def _snapshot_form(self, snapshot, frames=None):
+        """Frame holding a contact form (or a HubSpot shell inside an iframe), or None."""
+        for frame in snapshot.frames if frames is None else frames:
+            if any(self._summary_looks_like_contact_form(f) for f in frame["forms"]):
+                return frame
+            if frame["depth"] > 0 and frame["hubspot_shell"]:
+                self.log("✔️ Found HubSpot shell inside iframe")
+                return frame
+        return None
+
     def _check_iframes(self):
-        """Look for generic forms inside any iframe."""
-        frames = self.driver.find_elements(By.TAG_NAME, "iframe")
-        for idx, fr in enumerate(frames):
-            try:
-                self.log(f"Inspecting iframe #{idx}")
-                self.driver.switch_to.frame(fr)
-
-                for f in self._forms_on_page():
-                    if self._looks_like_contact_form(f):
-                        self.driver.switch_to.default_content()
-                        self.log("✔️ Found generic form inside iframe")
-                        return True
-
-                if self.driver.find_elements(By.CSS_SELECTOR, ".hbspt-form"):
-                    self.driver.switch_to.default_content()
-                    self.log("✔️ Found HubSpot shell inside iframe")
-                    return True
-
-                self.driver.switch_to.default_content()
-            except Exception as e:
-                self.log(f"⚠️ Iframe error #{idx}: {e}")
-                self.driver.switch_to.default_content()
-                continue
+        """Look for generic forms inside any iframe (nested and cross-origin included)."""
+        snapshot = take_snapshot(self.driver)
+        frame = self._snapshot_form(snapshot, snapshot.iframes)
+        if frame is not None:
+            self.log(f"✔️ Found generic form inside iframe {frame['path']}")
+            return True
         return False
 
     def _page_has_contact_form(self, max_wait=None):
         wait_time = max(max_wait or self.timeout, 4)
         end = time.time() + wait_time
         while time.time() < end:
-            if self._check_iframes():
-                self.log("✅ Form detected via iframe")
+            if self.cancelled is not None and self.cancelled.is_set():
+                return False
+            # one snapshot per poll covers the page, its shadow roots and every iframe
+            snapshot = take_snapshot(self.driver)
+            frame = self._snapshot_form(snapshot)
+            if frame is not None:
+                where = f"iframe {frame['path']}" if frame["depth"] else snapshot.main["url"]
+                self.log(f"✅ Found contact form on {where}")
                 return True
 
-            for f in self._forms_on_page():
-                if self._looks_like_contact_form(f):
-                    self.log(f"✅ Found contact form on {self.driver.current_url}")
-                    return True
-
             time.sleep(0.3)
 
         # Scroll retry
+        if self.cancelled is not None and self.cancelled.is_set():
+            return False
         try:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             time.sleep(1.5)
-            for f in self._forms_on_page():
-                if self._looks_like_contact_form(f):
-                    self.log("✔️ Found form after scrolling")
-                    return True
+            if self._snapshot_form(take_snapshot(self.driver)) is not None:
+                self.log("✔️ Found form after scrolling")
+                return True
         except Exception:
             pass
 
@@ -166,49 +186,69 @@ class ContactPageFinder:
                 continue
         return None
 
+    def _link_candidates(self, base_url, limit=15):
+        """(url, match) for the contact-looking links among the first `limit` anchors, best first:
+        match is "contact" (in text or href), "text" (another keyword in the text) or "href"."""
+        try:
+            anchors = page_call(self.driver, "links", limit) or []
+        except Exception as e:
+            self.log(f"Could not read links: {e}")
+            return []
+        scored = []
+        for txt, href in anchors:
+            txt, href_low = (txt or "").lower(), (href or "").strip().lower()
+            if not href_low:
+                continue
+            if "contact" in txt or "contact" in href_low:
+                match = "contact"
+            elif any(k in txt for k in self.CONTACT_KEYWORDS):
+                match = "text"
+            elif any(k in href_low for k in self.CONTACT_KEYWORDS):
+                match = "href"
+            else:
+                continue
+            scored.append((urljoin(base_url, href.strip()), match))
+        order = {"contact": 0, "text": 1, "href": 2}
+        return sorted(scored, key=lambda c: order[c[1]])
+
     def via_links(self, base_url):
         self.log("→ Scanning contact/support links")
-        anchors = self.driver.find_elements(By.TAG_NAME, "a")
-        for a in anchors[:15]:
+        # hrefs are read up front: anchors go stale as soon as the first link is followed
+        for to, _match in self._link_candidates(base_url):
             try:
-                txt = (a.text or "").strip().lower()
-                href = (a.get_attribute("href") or "").strip()
-                if not href:
-                    continue
-                href_low = href.lower()
-                if any(k in txt for k in self.CONTACT_KEYWORDS) or any(k in href_low for k in self.CONTACT_KEYWORDS):
-                    to = urljoin(base_url, href)
-                    self.log(f"Trying link: {to}")
-                    self.driver.get(to)
-                    time.sleep(1)
-                    if self._page_has_contact_form(max_wait=8):
-                        return to
+                self.log(f"Trying link: {to}")
+                self.driver.get(to)
+                time.sleep(1)
+                if self._page_has_contact_form(max_wait=8):
+                    return to
             except Exception:
                 continue
         return None
 
-    def via_popups(self, wait_time=8):
+    def _popup_or_iframe_form(self):
+        """One pass over visible popups/modals and iframes of the current page."""
+        try:
+            popups = self.driver.find_elements(
+                By.XPATH,
+                "//div[contains(@class,'modal') or contains(@class,'popup') or "
+                "contains(@class,'dialog') or contains(@class,'overlay')]"
+            )
+            for p in popups:
+                if p.is_displayed():
+                    for f in p.find_elements(By.TAG_NAME, "form"):
+                        if self._looks_like_contact_form(f):
+                            self.log("✔️ Found form in popup")
+                            return True
+        except Exception:
+            pass
+        return self._check_iframes()
+
+    def via_popups(self, base_url=None, wait_time=8):
         self.log("→ Checking popups/iframes")
         end = time.time() + wait_time
         while time.time() < end:
-            try:
-                popups = self.driver.find_elements(
-                    By.XPATH,
-                    "//div[contains(@class,'modal') or contains(@class,'popup') or "
-                    "contains(@class,'dialog') or contains(@class,'overlay')]"
-                )
-                for p in popups:
-                    if p.is_displayed():
-                        for f in p.find_elements(By.TAG_NAME, "form"):
-                            if self._looks_like_contact_form(f):
-                                self.log("✔️ Found form in popup")
-                                return self.driver.current_url
-            except Exception:
-                pass
-
-            if self._check_iframes():
+            if self._popup_or_iframe_form():
                 return self.driver.current_url
-
             time.sleep(0.3)
         return None
 
@@ -216,13 +256,21 @@ class ContactPageFinder:
         self.log(f"ContactPageFinder.run on {base_url}")
         start = time.time()
 
-        for strategy in [self.via_links, self.via_common_paths, self.via_popups]:
-            if time.time() - start > self.max_runtime:
-                self.log("⏱ Max runtime exceeded, aborting")
-                return None
-            url = strategy(base_url)
+        if self.race:
+            from formbot.contact_race import ContactRace
+            race = ContactRace(self, base_url)
+            url = race.run()
+            self.race_stats = race.stats()
             if url:
                 return url
+        else:
+            for strategy in [self.via_links, self.via_common_paths, self.via_popups]:
+                if time.time() - start > self.max_runtime:
+                    self.log("⏱ Max runtime exceeded, aborting")
+                    return None
+                url = strategy(base_url)
+                if url:
+                    return url
 
         self.debug_dump()
         self.log("✗ No contact form found")
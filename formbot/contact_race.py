@@ -0,0 +1,265 @@
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from formbot.contact_page_finder import ContactPageFinder
+from formbot.domains import registrable_domain
+from formbot.driver_manager import DriverManager
+from formbot.triage import HttpTriage
+
+logger = logging.getLogger("formbot")
+
+TEXTY = ("text", "email", "tel", "number", "search", "")
+SITEMAP_LOC = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.I)
+
+# lower runs first: scored homepage links, sitemap hints, then the fixed common paths
+PRIORITY = {"link:contact": 0, "link:text": 1, "link:href": 2, "sitemap": 2, "common_path": 3}
+
+
+def static_contact_form(html, newsletter_hints):
+    """True if server-rendered HTML already holds a form ContactPageFinder would accept."""
+    soup = BeautifulSoup(html, "html.parser")
+    for form in soup.find_all("form"):
+        if any(h in form.get_text(" ", strip=True).lower() for h in newsletter_hints):
+            continue
+        if form.find("textarea"):
+            return True
+        if len([i for i in form.find_all("input") if (i.get("type") or "").lower() in TEXTY]) >= 2:
+            return True
+    return False
+
+
+class ContactRace:
+    """ContactPageFinder's strategies run at once instead of one after another. Candidate URLs
+    (scored homepage links, sitemap hints, common paths) go into one priority queue that is
+    drained by browser probes (the flow's own driver plus extra tabs of the same Chrome in tab
+    mode) and by HTTP probes on the pooled triage session, which confirm server-rendered forms
+    and drop 404s before a browser loads them. The first confirmed contact form wins; the other
+    probes stop at their next check and their tabs are closed."""
+
+    def __init__(self, finder, base_url, probe_tabs=None, http_probes=2):
+        self.finder = finder
+        self.base_url = base_url
+        self.probe_tabs = probe_tabs if probe_tabs is not None else \
+            max(0, int(os.getenv("FORMBOT_CONTACT_PROBES", "2") or 0))
+        self.http_probes = http_probes
+        self.deadline = time.monotonic() + finder.max_runtime
+        self.done = threading.Event()
+        self.winner = None
+        self._cond = threading.Condition()
+        self._candidates = []  # (priority, seq, url, source)
+        self._seen = set()
+        self._claimed = {"browser": set(), "http": set()}
+        self._dead = set()
+        self._open_sources = 0
+        self._workers = 0
+        self._tabs = []
+        self._started = time.perf_counter()
+        self._site = registrable_domain(base_url)
+        self._triage = HttpTriage(timeout=(4, 8))
+
+    # ---------- Candidates ----------
+    @staticmethod
+    def _key(url):
+        return url.split("#")[0].rstrip("/").lower()
+
+    def add(self, urls, source):
+        with self._cond:
+            for url in urls:
+                key = self._key(url)
+                if key in self._seen or key == self._key(self.base_url) or registrable_domain(url) != self._site:
+                    continue
+                self._seen.add(key)
+                self._candidates.append((PRIORITY.get(source, 3), len(self._candidates), url, source))
+            self._cond.notify_all()
+
+    def _take(self, kind):
+        """Next unclaimed candidate for this kind of probe; None once the race is over."""
+        with self._cond:
+            while not self.done.is_set():
+                if time.monotonic() >= self.deadline:
+                    self.finder.log("⏱ Max runtime exceeded, aborting")
+                    self.done.set()
+                    break
+                free = [c for c in self._candidates if c[1] not in self._claimed[kind]
+                        and not (kind == "browser" and self._key(c[2]) in self._dead)]
+                if free:
+                    _prio, seq, url, source = min(free)
+                    self._claimed[kind].add(seq)
+                    return url, source
+                if not self._open_sources:
+                    break
+                self._cond.wait(0.2)
+            return None
+
+    def _win(self, url, source, prober):
+        with self._cond:
+            if self.winner is None and not self.done.is_set():
+                self.winner = {"url": url, "source": source, "prober": prober,
+                               "elapsed": round(time.perf_counter() - self._started, 2)}
+            self.done.set()
+            self._cond.notify_all()
+
+    def _worker_done(self):
+        with self._cond:
+            self._workers -= 1
+            if not self._workers and not self._open_sources:
+                self.done.set()  # every probe ran out of candidates
+            self._cond.notify_all()
+
+    def _spawn(self, target, *args, source=False):
+        with self._cond:
+            if source:
+                self._open_sources += 1
+            else:
+                self._workers += 1
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+    # ---------- Sources ----------
+    def _sitemap_hints(self):
+        try:
+            locs = []
+            resp, body = self._triage.fetch(urljoin(self.base_url, "/sitemap.xml"))
+            if resp.ok:
+                locs = SITEMAP_LOC.findall(body)
+            # sitemap index: one level down, the first two child sitemaps
+            for child in [u for u in locs if u.lower().endswith(".xml")][:2]:
+                if self.done.is_set():
+                    return
+                child_resp, child_body = self._triage.fetch(child)
+                if child_resp.ok:
+                    locs += SITEMAP_LOC.findall(child_body)
+            keywords = self.finder.CONTACT_KEYWORDS
+            hints = [u for u in locs if not u.lower().endswith(".xml")
+                     and any(k in urlparse(u).path.lower() for k in keywords)]
+            if hints:
+                self.finder.log(f"Sitemap hints: {hints[:10]}")
+            self.add(hints[:10], "sitemap")
+        except Exception as e:
+            self.finder.log(f"No sitemap hints: {e}")
+        finally:
+            with self._cond:
+                self._open_sources -= 1
+                if not self._workers and not self._open_sources:
+                    self.done.set()
+                self._cond.notify_all()
+
+    # ---------- Probes ----------
+    def _http_probe(self):
+        try:
+            while True:
+                item = self._take("http")
+                if item is None:
+                    return
+                url, source = item
+                try:
+                    resp, html = self._triage.fetch(url)
+                except Exception:
+                    continue
+                if resp.status_code in (404, 410):
+                    with self._cond:
+                        self._dead.add(self._key(url))
+                elif resp.ok and static_contact_form(html, self.finder.NEWSLETTER_HINTS):
+                    self._win(url, source, "http")
+                    return
+        finally:
+            self._worker_done()
+
+    def _browser_probe(self, finder, name):
+        try:
+            while True:
+                item = self._take("browser")
+                if item is None:
+                    return
+                url, source = item
+                finder.log(f"[{name}] Trying {source} candidate: {url}")
+                try:
+                    finder.driver.get(url)
+                    if self.done.wait(1):
+                        return
+                    if finder._page_has_contact_form(max_wait=8):
+                        self._win(url, source, name)
+                        return
+                except Exception as e:
+                    if self.done.is_set():
+                        return
+                    finder.log(f"[{name}] {url} failed: {e}")
+        finally:
+            self._worker_done()
+
+    def _tab_probe(self, host, name):
+        try:
+            driver = host.open_tab().driver
+        except Exception as e:
+            self.finder.log(f"Could not open probe tab: {e}")
+            self._worker_done()
+            return
+        with self._cond:
+            if self.done.is_set():
+                driver = None
+            else:
+                self._tabs.append(driver)
+        if driver is None:
+            self._worker_done()
+            return
+        finder = ContactPageFinder(driver, timeout=self.finder.timeout, debug=self.finder.debug, race=False)
+        finder.cancelled = self.done
+        self._browser_probe(finder, name)
+
+    def _close_tabs(self):
+        with self._cond:
+            tabs, self._tabs = self._tabs, []
+        for driver in tabs:
+            DriverManager.cleanup(driver)  # a probe still mid-command fails out of its loop
+
+    # ---------- Entry ----------
+    def run(self):
+        """Contact page URL, or None."""
+        finder = self.finder
+        # the page that is already loaded: a contact form in a popup or iframe (via_popups, one pass)
+        if finder._popup_or_iframe_form():
+            url = finder.driver.current_url
+            self._win(url, "page", "main")
+            return url
+
+        for url, match in finder._link_candidates(self.base_url):
+            self.add([url], f"link:{match}")
+        self.add([urljoin(self.base_url, p) for p in finder.COMMON_PATHS], "common_path")
+        finder.cancelled = self.done
+        with self._cond:
+            self._workers += 1  # the main probe counts before any source can finish and end the race
+        self._spawn(self._sitemap_hints, source=True)
+        for _ in range(self.http_probes):
+            self._spawn(self._http_probe)
+        host = getattr(getattr(finder.driver, "_tab", None), "host", None)
+        if host is not None:
+            for i in range(self.probe_tabs):
+                self._spawn(self._tab_probe, host, f"tab{i + 1}")
+
+        try:
+            self._browser_probe(finder, "main")
+            self.done.wait(max(0.0, self.deadline - time.monotonic()))
+        finally:
+            self.done.set()
+            finder.cancelled = None
+            self._close_tabs()
+
+        if self.winner:
+            logger.info(f"🏁 Contact page {self.winner['url']} found by {self.winner['prober']} "
+                        f"({self.winner['source']}) in {self.winner['elapsed']}s")
+            return self.winner["url"]
+        return None
+
+    def stats(self):
+        with self._cond:
+            return {"winner": dict(self.winner) if self.winner else None,
+                    "candidates": len(self._candidates),
+                    "browser_checked": len(self._claimed["browser"]),
+                    "http_checked": len(self._claimed["http"]),
+                    "dead": len(self._dead),
+                    "elapsed": round(time.perf_counter() - self._started, 2)}
@@ -0,0 +1,155 @@
+import logging
+import re
+
+import requests
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger("formbot")
+
+_WORD = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+_SPACE = re.compile(r"\s+")
+_ATTR_WORD = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text):
+    """Cheap local stand-in for a BPE tokenizer: words split every ~6 letters, digits in 3s, punctuation 1 each."""
+    return sum(1 + (len(w) - 1) // 6 if w[0].isalpha() else 1 for w in _WORD.findall(text or ""))
+
+
+def _norm(text):
+    return _SPACE.sub(" ", text or "").strip()
+
+
+class ContextBuilder:
+    """Build a compact, high-signal website summary for pitch prompts within a token budget."""
+
+    # Elements that are almost always chrome rather than content
+    STRIP_TAGS = ["script", "style", "noscript", "svg", "nav", "footer", "aside", "form", "iframe", "template"]
+    STRIP_HINTS = ["cookie", "consent", "gdpr", "newsletter", "subscribe", "breadcrumb", "menu", "navbar",
+                   "sidebar", "footer", "popup", "modal", "share", "social"]
+    BOILERPLATE = ["all rights reserved", "privacy policy", "terms of use", "terms and conditions",
+                   "cookie", "skip to content", "sign up", "subscribe", "copyright", "©"]
+    BOILERPLATE_MAX_WORDS = 25  # banner-sized blocks only; longer copy mentioning cookies is content
+    # Never stripped: the document itself and whatever holds the main content
+    KEEP_TAGS = {"html", "body", "main", "article"}
+    ABOUT_HINTS = ["about", "who we are", "our story", "our mission", "what we do", "why choose"]
+
+    def __init__(self, token_budget=500):
+        self.token_budget = token_budget
+
+    # ---------- Extraction ----------
+    @staticmethod
+    def _attr_words(el):
+        """Whole id/class tokens plus their -/_ separated parts ("cookie-banner" → cookie, banner)."""
+        words = set()
+        for value in [el.get("id") or ""] + list(el.get("class") or []):
+            value = value.lower()
+            words.add(value)
+            words.update(_ATTR_WORD.findall(value))
+        return words
+
+    def _strip_chrome(self, soup):
+        for tag in soup(self.STRIP_TAGS):
+            tag.decompose()
+        # a body class like "page right-sidebar" must not take the whole page with it
+        keep = set()
+        for el in soup.find_all(["main", "article", "h1"]) + soup.find_all(attrs={"role": "main"}):
+            keep.add(id(el))
+            keep.update(id(parent) for parent in el.parents)
+        hints = set(self.STRIP_HINTS)
+        for el in soup.find_all(True):
+            if getattr(el, "decomposed", False) or el.name in self.KEEP_TAGS or id(el) in keep:
+                continue
+            if self._attr_words(el) & hints:
+                el.decompose()
+
+    def _about_paragraphs(self, soup):
+        out = []
+        for el in soup.find_all(["section", "div", "article"]):
+            attrs = " ".join([el.get("id") or ""] + list(el.get("class") or [])).lower()
+            if "about" in attrs:
+                out += [p.get_text(" ", strip=True) for p in el.find_all("p")]
+        for h in soup.find_all(["h2", "h3"]):
+            if any(k in h.get_text(" ", strip=True).lower() for k in self.ABOUT_HINTS):
+                for sib in h.find_next_siblings(limit=4):
+                    if sib.name in ("h1", "h2", "h3"):
+                        break
+                    if sib.name == "p":
+                        out.append(sib.get_text(" ", strip=True))
+        return out
+
+    def sections(self, html):
+        """Return [(label, text)] ordered from highest to lowest signal."""
+        soup = BeautifulSoup(html or "", "html.parser")
+        items = []
+        if soup.title and soup.title.string:
+            items.append(("title", soup.title.string))
+        for attrs in ({"name": "description"}, {"property": "og:description"}):
+            meta = soup.find("meta", attrs=attrs)
+            if meta and meta.get("content"):
+                items.append(("meta", meta["content"]))
+
+        self._strip_chrome(soup)
+        items += [("h1", h.get_text(" ", strip=True)) for h in soup.find_all("h1")]
+        items += [("h2", h.get_text(" ", strip=True)) for h in soup.find_all("h2")]
+        items += [("about", t) for t in self._about_paragraphs(soup)]
+        main = soup.find("main") or soup.find("article") or soup.body or soup
+        items += [("body", el.get_text(" ", strip=True)) for el in main.find_all(["p", "li", "h3"])]
+        return items
+
+    # ---------- Budgeting ----------
+    def _keep(self, label, text, seen):
+        key = text.lower()
+        if not text or key in seen:
+            return False
+        if label == "body" and len(text.split()) < 4:
+            return False
+        if len(text.split()) <= self.BOILERPLATE_MAX_WORDS and any(b in key for b in self.BOILERPLATE):
+            return False
+        seen.add(key)
+        return True
+
+    def build(self, html):
+        """Return (context_text, stats) where stats reports raw vs. budgeted token counts."""
+        raw_text = " ".join(t.strip() for t in list(BeautifulSoup(html or "", "html.parser").stripped_strings)[:1500])
+        seen, parts, used = set(), [], 0
+        for label, text in self.sections(html):
+            text = _norm(text)
+            if not self._keep(label, text, seen):
+                continue
+            cost = estimate_tokens(text) + 1
+            if used + cost > self.token_budget:
+                remaining = self.token_budget - used
+                if remaining > 20 and label in ("meta", "about", "body"):
+                    words = text.split()
+                    text = " ".join(words[: max(1, int(len(words) * remaining / cost))]) + " …"
+                    parts.append(text)
+                    used += estimate_tokens(text) + 1
+                break
+            parts.append(text)
+            used += cost
+
+        context = "\n".join(parts)
+        raw_tokens = estimate_tokens(raw_text)
+        context_tokens = estimate_tokens(context)
+        stats = {
+            "raw_tokens": raw_tokens,
+            "context_tokens": context_tokens,
+            "saved_tokens": max(0, raw_tokens - context_tokens),
+            "saved_pct": round(100.0 * (raw_tokens - context_tokens) / raw_tokens, 1) if raw_tokens else 0.0,
+        }
+        return context, stats
+
+
+def fetch_context(url, token_budget=500, timeout=10):
+    """Fetch a page and build its pitch context. Returns (text, stats); text is empty on failure."""
+    try:
+        resp = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+        resp.raise_for_status()
+    except Exception as e:
+        logger.error(f"Failed to fetch website text from {url}: {e}")
+        return "", {"raw_tokens": 0, "context_tokens": 0, "saved_tokens": 0, "saved_pct": 0.0, "error": str(e)}
+    text, stats = ContextBuilder(token_budget).build(resp.text)
+    logger.debug(f"[context] {url}: {stats['raw_tokens']} → {stats['context_tokens']} tokens "
+                 f"({stats['saved_pct']}% saved)")
+    return text, stats
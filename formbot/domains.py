@@ -0,0 +1,40 @@
+from urllib.parse import urlparse
+
+# Common multi-label public suffixes; enough to group campaign URLs without a PSL download
+_MULTI_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "ltd.uk", "plc.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "net.nz", "co.za", "org.za",
+    "co.in", "net.in", "org.in", "firm.in", "gen.in", "ind.in",
+    "com.br", "net.br", "org.br", "com.mx", "com.ar", "com.co",
+    "co.jp", "ne.jp", "or.jp", "com.cn", "net.cn", "org.cn", "com.hk", "com.sg", "com.my",
+    "co.kr", "or.kr", "com.tr", "com.tw", "co.il", "co.id", "com.ph", "com.vn", "com.pk",
+}
+
+
+def normalize_url(url):
+    url = (url or "").strip()
+    return url if url.startswith("http") else "https://" + url
+
+
+def hostname(url):
+    return (urlparse(normalize_url(url)).hostname or "").lower().rstrip(".")
+
+
+def registrable_domain(url):
+    """eTLD+1 for a URL or hostname, e.g. https://shop.example.co.uk/x → example.co.uk."""
+    host = hostname(url)
+    if not host or host.replace(".", "").isdigit() or host == "localhost":
+        return host
+    labels = host.split(".")
+    if len(labels) >= 3 and ".".join(labels[-2:]) in _MULTI_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def group_by_domain(urls, key=registrable_domain):
+    """{registrable domain (or key(url)): [urls]} in first-seen order, URLs in their original order."""
+    groups = {}
+    for url in urls:
+        groups.setdefault(key(url), []).append(url)
+    return groups
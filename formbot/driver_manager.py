@@ -1,27 +1,22 @@
-import logging, re, subprocess, tempfile, shutil, atexit, os, uuid
+import logging, os
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from formbot.chromedriver import driver_path
+from formbot.supervisor import OWNER_FLAG, get_supervisor
+from formbot.tracing import CommandTracer, tracing_enabled
 
 logger = logging.getLogger("formbot")
 
-def _detect_chrome_version_full():
-    for bin_path in ["google-chrome", "google-chrome-stable", "chromium-browser", "chromium"]:
-        try:
-            result = subprocess.run([bin_path, "--version"],
-                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            out = (result.stdout or result.stderr or "").strip()
-            m = re.search(r"(\d+\.\d+\.\d+\.\d+)", out)
-            if m:
-                return m.group(1)
-        except Exception:
-            continue
-    return None
+def tab_mode_enabled():
+    """FORMBOT_TABS_PER_BROWSER > 1 serves several URLs from one Chrome (see formbot/tabs.py)."""
+    return int(os.getenv("FORMBOT_TABS_PER_BROWSER", "1") or 1) > 1
+
 
 class DriverManager:
     @staticmethod
-    def get_driver(headless=True):
+    def launch(headless=True, page_load_strategy=None):
+        """Start a bare Chrome session (no tracing, default timeouts)."""
         options = Options()
         options.add_argument("--disable-blink-features=AutomationControlled")
         options.add_argument("--no-sandbox")
@@ -29,41 +24,75 @@ class DriverManager:
         options.add_argument("--disable-gpu")
         options.add_argument("--window-size=1440,900")
         options.add_argument("user-agent=Mozilla/5.0")
+        # lets the supervisor find this Chrome even if chromedriver dies first
+        options.add_argument(f"{OWNER_FLAG}{os.getpid()}")
 
         # 👉 only use --user-data-dir in NON-headless mode
         tmp_profile = None
         if not headless:
-            tmp_profile = tempfile.mkdtemp(prefix=f"chrome_profile_{uuid.uuid4().hex}_")
+            tmp_profile = get_supervisor().new_profile_dir()
             options.add_argument(f"--user-data-dir={tmp_profile}")
             logger.debug(f"[driver] Using temp profile {tmp_profile}")
 
         if headless:
              options.add_argument("--headless=new")
+        if page_load_strategy:
+            options.page_load_strategy = page_load_strategy
+        if os.getenv("FORMBOT_CHROME_BINARY"):
+            options.binary_location = os.getenv("FORMBOT_CHROME_BINARY")
+        if os.getenv("FORMBOT_PROXY"):
+            # record/replay runs (bench/replay_proxy.py): everything, localhost included, via the proxy
+            options.add_argument(f"--proxy-server={os.getenv('FORMBOT_PROXY')}")
+            options.add_argument("--proxy-bypass-list=<-loopback>")
+            options.add_argument("--ignore-certificate-errors")
 
-        version_full = _detect_chrome_version_full()
-        service = Service(
-            ChromeDriverManager(driver_version=version_full).install() if version_full
-            else ChromeDriverManager().install()
-        )
+        # resolved once per process (and cached on disk), see formbot/chromedriver.py
+        service = Service(executable_path=driver_path())
 
-        driver = webdriver.Chrome(service=service, options=options)
+        try:
+            driver = webdriver.Chrome(service=service, options=options)
+        except Exception:
+            get_supervisor().reclaim_profile(tmp_profile)
+            raise
         driver._tmp_profile = tmp_profile
 
-        # ensure cleanup always happens
-        if tmp_profile:
-            atexit.register(lambda: shutil.rmtree(tmp_profile, ignore_errors=True))
+        # RSS/CPU tracking, recycling and profile cleanup (formbot/supervisor.py)
+        get_supervisor().register(driver, tmp_profile)
+        return driver
+
+    @staticmethod
+    def get_driver(headless=True, trace=None, tabs=None):
+        """A driver for one URL: its own Chrome, or a tab of a shared one when tab mode is on."""
+        if tabs if tabs is not None else tab_mode_enabled():
+            from formbot.tabs import get_tab_scheduler  # tabs.py builds on DriverManager.launch
+            return get_tab_scheduler(headless=headless).open_tab(trace=trace)
+
+        driver = DriverManager.launch(headless)
+
+        # opt-in round-trip tracing (FORMBOT_TRACE=1 or trace=True)
+        if trace if trace is not None else tracing_enabled():
+            CommandTracer().attach(driver)
 
         driver.set_page_load_timeout(60)
         driver.implicitly_wait(2)
+        get_supervisor().job(driver)
         return driver
 
     @staticmethod
     def cleanup(driver):
+        tab = getattr(driver, "_tab", None)
+        if tab is not None:
+            tab.close()  # the shared Chrome stays up for other URLs
+            return
+        try:
+            tracer = getattr(driver, "_tracer", None)
+            if tracer:
+                tracer.flush()
+        except Exception as e:
+            logger.warning(f"[driver] Trace flush failed: {e}")
         try:
-            tmp_profile = getattr(driver, "_tmp_profile", None)
             driver.quit()
-            if tmp_profile:
-                shutil.rmtree(tmp_profile, ignore_errors=True)
-                logger.debug(f"[driver] Cleaned up temp profile {tmp_profile}")
         except Exception as e:
             logger.warning(f"[driver] Cleanup failed: {e}")
+        # removes the temp profile now (not at exit) and kills chromedriver's tree if quit() left it running
+        get_supervisor().unregister(driver)
@@ -1,101 +1,27 @@
 import logging
 import time
+from contextlib import contextmanager
+from formbot.admission import AdmissionTimeout, get_admission
 from formbot.driver_manager import DriverManager
 from formbot.contact_page_finder import ContactPageFinder
 from formbot.form_filler import FormFiller
+from formbot.form_signatures import FormSignature, get_form_index
+from formbot.multistep import MultiStepEngine
 from formbot.submit_handler import SubmitHandler
 from formbot.success_checker import SuccessChecker
+from formbot.overlays import dismiss_overlays
+from formbot.pitch_service import PitchError
+from formbot.retry import browser_lost, classify
+from formbot.triage import triage_url
+from formbot.http_submit import CONFIRMED, try_http_submit
 from selenium.webdriver.common.by import By
 
 logger = logging.getLogger("formbot")
 
 
-def _dismiss_overlays(driver):
-    """Actively accept cookie banners and remove chat/overlay blockers."""
-    try:
-        # 1) Try visible "Accept/Agree" buttons
-        xpath_text_buttons = [
-            "//button[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'accept')]",
-            "//button[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'agree')]",
-            "//button[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'allow')]",
-            "//*[@id='onetrust-accept-btn-handler']",
-            "//a[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'accept')]",
-            "//a[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'agree')]",
-        ]
-        for xp in xpath_text_buttons:
-            for el in driver.find_elements(By.XPATH, xp):
-                try:
-                    if el.is_displayed() and el.is_enabled():
-                        el.click()
-                        time.sleep(0.2)
-                        return
-                except Exception:
-                    continue
-
-        # 2) Try iframes for cookie banners
-        frames = driver.find_elements(By.TAG_NAME, "iframe")
-        for fr in frames[:4]:
-            try:
-                src = (fr.get_attribute("src") or "").lower()
-                if any(k in src for k in ["consent", "cookie", "privacy", "onetrust"]):
-                    driver.switch_to.frame(fr)
-                    clicked = False
-                    for xp in xpath_text_buttons:
-                        for el in driver.find_elements(By.XPATH, xp):
-                            if el.is_displayed() and el.is_enabled():
-                                el.click()
-                                clicked = True
-                                break
-                        if clicked:
-                            break
-                    driver.switch_to.default_content()
-                    if clicked:
-                        time.sleep(0.2)
-                        return
-                else:
-                    driver.switch_to.frame(fr)
-                    for xp in xpath_text_buttons[:2]:
-                        for el in driver.find_elements(By.XPATH, xp):
-                            if el.is_displayed() and el.is_enabled():
-                                el.click()
-                                driver.switch_to.default_content()
-                                time.sleep(0.2)
-                                return
-                    driver.switch_to.default_content()
-            except Exception:
-                try:
-                    driver.switch_to.default_content()
-                except Exception:
-                    pass
-
-        # 3) Remove overlays if clicking didn’t work
-        overlays = [
-            "#onetrust-banner-sdk", "#onetrust-policy-text",
-            ".cookie", "[id*='cookie']", "[class*='cookie']",
-            ".cc-window", ".cc-banner", ".osano-cm-window",
-            ".consent", ".gdpr", ".cm-root", ".sp-privacy-manager",
-        ]
-        for sel in overlays:
-            for el in driver.find_elements(By.CSS_SELECTOR, sel):
-                try:
-                    driver.execute_script("arguments[0].remove();", el)
-                except Exception:
-                    pass
-
-        # 4) Remove chat widgets
-        chats = [
-            "iframe[src*='intercom']", "iframe[src*='drift']", "iframe[src*='hubspot']",
-            "iframe[src*='tawk']", "iframe[src*='livechat']", "iframe[id*='launcher']",
-            ".chat-widget", ".launcher__button", ".chatbot", ".chat-container"
-        ]
-        for sel in chats:
-            for el in driver.find_elements(By.CSS_SELECTOR, sel):
-                try:
-                    driver.execute_script("arguments[0].remove();", el)
-                except Exception:
-                    pass
-    except Exception:
-        pass
+def _dismiss_overlays(driver, url=None):
+    """Actively accept cookie banners and remove chat/overlay blockers (one injected script)."""
+    dismiss_overlays(driver, url=url)
 
 
 def _has_captcha(driver):
@@ -113,90 +39,274 @@ def _has_captcha(driver):
 
 
 class FormFlow:
-    def __init__(self, url, dataset, debug=False):
+    def __init__(self, url, dataset, debug=False, on_event=None, triage=True, http_submit=True, tabs=None,
+                 caller=None, session=None):
         self.url = url if url.startswith("http") else "https://" + url
         self.dataset = dataset
         self.debug = debug
+        self.on_event = on_event
+        # pass triage=False when the caller already screened the URL (app.py does it in bulk)
+        self.triage = triage
+        # plain server-rendered forms found by triage are posted with requests instead of Chrome
+        self.http_submit = http_submit
+        # tabs=True runs this URL in a tab of a shared Chrome (default: FORMBOT_TABS_PER_BROWSER > 1)
+        self.tabs = tabs
+        # fair-queuing key for browser slots (formbot/admission.py); one queue per caller
+        self.caller = caller or self.url
+        self.lease = None
+        # formbot/site_session.py: a warm browser (and lease, contact page) shared with same-domain URLs
+        self.session = session
+        # outcome of run(): verdict is success | transient | permanent | unknown (formbot/retry.py)
+        self.error = None
+        self.submitted = False
+        self.verdict = None
+        self.reason = ""
+        self.timings = {}
+        self.step_timings = []  # per-step records from MultiStepEngine (wizard forms only)
+
+    def _emit(self, stage, **data):
+        """Report stage progress to the caller (e.g. the /fill SSE stream); never breaks the flow."""
+        if self.on_event:
+            try:
+                self.on_event(stage, **data)
+            except Exception as e:
+                logger.debug(f"[FormFlow] on_event failed for {stage}: {e}")
+
+    def _release(self, driver, broken=False):
+        """Done with driver for this URL; a domain session keeps a healthy one warm for the next URL."""
+        if self.session is None:
+            DriverManager.cleanup(driver)
+        elif broken:
+            self.session.discard()
+
+    @staticmethod
+    def _flush_trace(driver):
+        """A warm session skips DriverManager.cleanup, so its trace is flushed per URL here."""
+        tracer = getattr(driver, "_tracer", None)
+        if tracer:
+            try:
+                tracer.flush()
+            except Exception as e:
+                logger.warning(f"[driver] Trace flush failed: {e}")
+            tracer.reset()
+
+    @contextmanager
+    def _stage(self, name):
+        """Accumulate wall time per stage into self.timings (seconds)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - start)
 
     def run(self):
+        started = time.perf_counter()
+        status = None
+        try:
+            status = self._run()
+            return status
+        finally:
+            if self.lease is not None:
+                self.lease.release()
+            if self.session is not None:
+                self._flush_trace(self.session.driver)
+            self.verdict, self.reason = classify(status, self.error, self.submitted)
+            self.timings["total"] = time.perf_counter() - started
+
+    def _run(self):
+        if self.triage:
+            with self._stage("triage"):
+                result = triage_url(self.url)
+            self._emit("triaged", **result.to_dict())
+            if not result.viable:
+                return result.status
+            if self.http_submit and result.contact_url:
+                try:
+                    with self._stage("http_submit"):
+                        attempt = try_http_submit(result.contact_url, self.dataset)
+                except PitchError as e:
+                    logger.error(f"Pitch unavailable for {self.url}: {e}")
+                    return f"[X] Skipped {self.url}: pitch generation failed ({e})"
+                except Exception as e:
+                    # the cheap path is an optimisation only: anything odd goes to the browser
+                    logger.warning(f"⚠️ HTTP submit failed for {result.contact_url}, using the browser: {e}")
+                    attempt = None
+                if attempt is not None and attempt.handled:
+                    self._emit("contact_page_found", contact_url=result.contact_url)
+                    self._emit("confirmed" if attempt.outcome == CONFIRMED else "unconfirmed")
+                    return attempt.status
+                if attempt is not None:
+                    logger.debug(f"[FormFlow] Browser needed for {result.contact_url}: {attempt.reason}")
+
+        session = self.session
         try:
-            driver = DriverManager.get_driver(headless=not self.debug)
+            with self._stage("queue"):
+                if session is None:
+                    self.lease = get_admission().acquire(self.caller)
+                elif session.lease is None:
+                    session.lease = get_admission().acquire(self.caller)  # held until the group is done
+        except AdmissionTimeout as e:
+            logger.warning(f"🚦 {self.url}: {e}")
+            return f"[Error] Browser capacity busy, {self.url} not started: {e}"
+        self._emit("admitted", waited=round(self.timings["queue"], 2))
+
+        try:
+            with self._stage("launch"):
+                driver = session.take_driver() if session is not None else None
+                warm = driver is not None
+                if not warm:
+                    driver = DriverManager.get_driver(headless=not self.debug, tabs=self.tabs)
+                    if session is not None:
+                        session.keep(driver)
         except Exception as e:
+            self.error = e
             logger.exception("Chrome launch failed for %s", self.url)
             return f"[Error] Could not start Chrome for {self.url}: {e}"
+        if warm:
+            self._emit("warm_session", domain=session.domain)
+
+        tracer = getattr(driver, "_tracer", None)
+        if tracer:
+            tracer.url = self.url
 
         had_form = False
         before_html = ""
 
         try:
-            driver.get(self.url)
+            contact_url = session.contact_url if session is not None else None
+            reused = bool(contact_url)
+            if reused:
+                # same-domain URL after one that found the contact page: go straight there
+                logger.info(f"♻️ {self.url}: reusing contact page {contact_url} found earlier on {session.domain}")
+                session.contact_reuses += 1
+                self._emit("contact_page_found", contact_url=contact_url, reused=True)
+            else:
+                with self._stage("load"):
+                    driver.get(self.url)
 
-            # Ensure DOM ready
-            try:
-                for _ in range(20):
-                    if driver.execute_script("return document.readyState") == "complete":
-                        break
-                    time.sleep(0.25)
-            except Exception:
-                pass
+                    # Ensure DOM ready
+                    try:
+                        for _ in range(20):
+                            if driver.execute_script("return document.readyState") == "complete":
+                                break
+                            time.sleep(0.25)
+                    except Exception:
+                        pass
 
-            _dismiss_overlays(driver)
-            before_html = driver.page_source
+                with self._stage("overlays"):
+                    _dismiss_overlays(driver, self.url)
+                before_html = driver.page_source
+                landing = driver.current_url
 
-            # 1) Find a contact form page
-            finder = ContactPageFinder(driver, timeout=10, debug=self.debug)
-            contact_url = finder.run(self.url)
-            if not contact_url:
-                DriverManager.cleanup(driver)
-                # ✅ green success for no form case
-                GREEN = "\033[92m"
-                RESET = "\033[0m"
-                return f"{GREEN}[✓] Email sent (no contact form found for {self.url}){RESET}"
+                # 1) Find a contact form page
+                with self._stage("find_contact"):
+                    finder = ContactPageFinder(driver, timeout=10, debug=self.debug)
+                    contact_url = finder.run(self.url)
+                if not contact_url:
+                    self._release(driver)
+                    # ✅ green success for no form case
+                    GREEN = "\033[92m"
+                    RESET = "\033[0m"
+                    return f"{GREEN}[✓] Email sent (no contact form found for {self.url}){RESET}"
+                winner = (finder.race_stats or {}).get("winner") or {}
+                # share only a page reached via links, the sitemap or common paths; a form embedded in
+                # this URL's own landing page says nothing about the domain's other URLs
+                if session is not None and winner.get("source") != "page" and \
+                        contact_url.rstrip("/").lower() != landing.rstrip("/").lower():
+                    session.contact_url = contact_url
+                self._emit("contact_page_found", contact_url=contact_url, via=winner.get("source"),
+                           prober=winner.get("prober"))
 
-            if driver.current_url.rstrip("/") != contact_url.rstrip("/"):
-                driver.get(contact_url)
-                time.sleep(1.2)
+            with self._stage("load"):
+                # a warm session still shows the previous URL's submitted form: always reload
+                if reused or driver.current_url.rstrip("/") != contact_url.rstrip("/"):
+                    driver.get(contact_url)
+                    time.sleep(1.2)
+            if reused:
+                before_html = driver.page_source
 
-            _dismiss_overlays(driver)
+            with self._stage("overlays"):
+                _dismiss_overlays(driver, self.url)
 
             # 2) Captcha guard
-            if _has_captcha(driver):
-                DriverManager.cleanup(driver)
+            with self._stage("captcha"):
+                captcha = _has_captcha(driver)
+            if captcha:
+                self._release(driver)
                 return f"[X] Captcha/Anti-bot detected on {contact_url}"
 
-            # 3) Fill form(s)
-            filler = FormFiller(driver, self.dataset)
-            hubspot_used = filler.run()
+            # 3) Fill form(s): a known form signature replays its stored plan in one call
+            with self._stage("fill"):
+                filler = FormFiller(driver, self.dataset)
+                index = get_form_index()
+                signature = FormSignature.capture(driver)
+                plan = index.lookup(signature)
+                replayed = plan is not None and index.replay(driver, signature, plan, filler)
+                hubspot_used = False if replayed else filler.run()
+                steps = MultiStepEngine(driver, filler, None, on_step=lambda rec: self._emit("step", **rec))
+                steps.mark_filled()
             had_form = True
+            self._emit("filled", replayed=replayed)
 
             # 4) Submit
-            submitter = SubmitHandler(driver, timeout=14)
-            submitter.run()
+            self.submitted = True
+            with self._stage("submit"):
+                submitter = steps.submitter = SubmitHandler(driver, timeout=14)
+                button = index.submit_element(driver, plan) if replayed else None
+                if not (button is not None and submitter.safe_click(button)):
+                    submitter.run()
 
-            # 5) Post-submit wait
-            time.sleep(3)
-            _dismiss_overlays(driver)
+                # 5) Post-submit wait
+                time.sleep(3)
+            self._emit("submitted")
+            with self._stage("overlays"):
+                _dismiss_overlays(driver, self.url)
 
             # 6) Success check
-            checker = SuccessChecker(driver, contact_url, had_form=had_form, before_html=before_html)
-            if checker.run():
-                DriverManager.cleanup(driver)
+            with self._stage("confirm"):
+                checker = SuccessChecker(driver, contact_url, had_form=had_form, before_html=before_html)
+                # a wizard that just revealed its next step can't be confirmed yet
+                confirmed = False if steps.revealed() else checker.run()
+            if confirmed:
+                self._release(driver)
+                if not hubspot_used:
+                    index.record(signature, submitter.clicked_pos)
+                self._emit("confirmed")
                 return f"[✓] {'HubSpot ' if hubspot_used else ''}form submitted and confirmed on {contact_url}"
+            if replayed:
+                index.miss(signature)
 
-            # Retry multi-step forms
-            hubspot_used2 = filler.run()
-            submitter.run()
-            time.sleep(2.5)
-            if checker.run():
-                DriverManager.cleanup(driver)
-                return f"[✓] {'HubSpot ' if (hubspot_used or hubspot_used2) else ''}form submitted and confirmed on {contact_url}"
+            # Multi-step forms: fill only the newly revealed fields, then next/submit
+            with self._stage("steps"):
+                confirmed = steps.run(checker)
+            self.step_timings = steps.steps
+            if confirmed:
+                self._release(driver)
+                self._emit("confirmed")
+                return f"[✓] {'HubSpot ' if hubspot_used else ''}form submitted and confirmed on {contact_url} " \
+                       f"after {len(steps.steps) + 1} steps"
 
-            DriverManager.cleanup(driver)
+            self._release(driver)
+            self._emit("unconfirmed")
             return f"[X] Submitted (attempted) but no confirmation on {contact_url}"
 
+        except PitchError as e:
+            # the pitch never arrived: abandon before anything is submitted
+            self.error = e
+            try:
+                self._release(driver)
+            except Exception:
+                pass
+            logger.error(f"Pitch unavailable for {self.url}: {e}")
+            return f"[X] Skipped {self.url}: pitch generation failed ({e})"
+
         except Exception as e:
+            self.error = e
+            tab = getattr(driver, "_tab", None)
+            if tab is not None and browser_lost(e):
+                tab.host.dead = True  # drain the shared Chrome; a retry gets a new one
             try:
-                DriverManager.cleanup(driver)
+                self._release(driver, broken=True)
             except Exception:
                 pass
             logger.exception("Unhandled exception in flow for %s", self.url)
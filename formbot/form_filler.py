@@ -10,42 +10,76 @@ from selenium.common.exceptions import (
     ElementNotInteractableException,
     TimeoutException,
 )
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from formbot.pitch_service import PitchError
 
 logger = logging.getLogger("formbot")
 
 class FormFiller:
+    # dataset["message"] may be a Future while the pitch is still streaming; wait at most this long
+    MESSAGE_TIMEOUT = 120
+
     def __init__(self, driver, dataset):
         self.driver = driver
         self.dataset = dataset
 
     # ---------- Helpers ----------
-    def _choose_value(self, field, ftype, attr):
+    @staticmethod
+    def _choose_key(attr):
+        """Map a field's combined type/placeholder/name/id string onto a dataset key."""
         attr = attr.lower()
         if "mail" in attr:
-            return self.dataset.get("email", "test@example.com")
+            return "email"
         if "first" in attr:
-            return self.dataset.get("name", "Test User").split()[0]
+            return "first_name"
         if "last" in attr:
-            return self.dataset.get("name", "User").split()[-1]
+            return "last_name"
         if "name" in attr:
-            return self.dataset.get("name", "Test User")
+            return "name"
         if "phone" in attr or "tel" in attr:
-            return self.dataset.get("phone", "9999999999")
+            return "phone"
         if "zip" in attr or "postal" in attr:
-            return self.dataset.get("zipcode", "12345")
+            return "zipcode"
         if "address" in attr:
-            return self.dataset.get("address", "123 Test Street")
+            return "address"
         if "city" in attr:
-            return self.dataset.get("city", "Test City")
+            return "city"
         if "state" in attr or "region" in attr:
-            return self.dataset.get("state", "Test State")
+            return "state"
         if "website" in attr or "url" in attr:
-            return self.dataset.get("website", "https://example.com")
+            return "website"
         if "looking_for" in attr:
-            return self.dataset.get("looking_for", "SEO")
+            return "looking_for"
         if "challenge" in attr or "message" in attr:
-            return self.dataset.get("message", "We want to grow our traffic.")
-        return self.dataset.get("name", "Test User")
+            return "message"
+        return "name"
+
+    def _message(self, default="We want to grow our traffic."):
+        """Resolve the message, blocking on a pending pitch future if necessary (raises if it failed)."""
+        value = self.dataset.get("message", default)
+        if hasattr(value, "result"):
+            try:
+                value = value.result(timeout=self.MESSAGE_TIMEOUT)
+            except FutureTimeoutError:
+                raise PitchError(f"Pitch not ready after {self.MESSAGE_TIMEOUT}s")
+        return value
+
+    def _choose_value(self, field, ftype, attr):
+        return self._value_for_key(self._choose_key(attr))
+
+    def _value_for_key(self, key):
+        if key == "first_name":
+            return self.dataset.get("name", "Test User").split()[0]
+        if key == "last_name":
+            return self.dataset.get("name", "User").split()[-1]
+        if key == "message":
+            return self._message()
+        defaults = {
+            "email": "test@example.com", "name": "Test User", "phone": "9999999999",
+            "zipcode": "12345", "address": "123 Test Street", "city": "Test City",
+            "state": "Test State", "website": "https://example.com", "looking_for": "SEO",
+        }
+        return self.dataset.get(key, defaults[key])
 
     def _safe_type(self, field, value):
         try:
@@ -105,10 +139,11 @@ class FormFiller:
                     pass
             if "message" in self.dataset:
                 try:
-                    self._safe_type(self.driver.find_element(By.CSS_SELECTOR, "textarea"),
-                                    self.dataset["message"])
+                    textarea = self.driver.find_element(By.CSS_SELECTOR, "textarea")
                 except Exception:
-                    pass
+                    textarea = None
+                if textarea is not None:
+                    self._safe_type(textarea, self._message())
 
             # Submit button
             try:
@@ -123,13 +158,18 @@ class FormFiller:
         except TimeoutException:
             self.driver.switch_to.default_content()
             return False
+        except PitchError:
+            self.driver.switch_to.default_content()
+            raise
         except Exception as e:
             logger.debug(f"[FormFiller] HubSpot handler failed: {e}")
             self.driver.switch_to.default_content()
             return False
 
     # ---------- Fillers ----------
-    def fill_inputs(self):
+    def fill_inputs(self, defer_message=False):
+        """Type into visible inputs; with defer_message, message-like inputs are returned instead of filled."""
+        deferred = []
         inputs = self.driver.find_elements(By.CSS_SELECTOR, "form input")
         for field in inputs:
             try:
@@ -144,22 +184,29 @@ class FormFiller:
                 id_attr = (field.get_attribute("id") or "").lower()
                 attr = " ".join([ftype, placeholder, name_attr, id_attr])
 
+                if defer_message and self._choose_key(attr) == "message":
+                    deferred.append(field)
+                    continue
+
                 val = self._choose_value(field, ftype, attr)
                 self._safe_type(field, val)
             except (StaleElementReferenceException, ElementNotInteractableException):
                 continue
+            except PitchError:
+                raise
             except Exception:
                 continue
+        return deferred
 
     def fill_textareas(self):
         textareas = self.driver.find_elements(By.CSS_SELECTOR, "form textarea")
         for ta in textareas:
             try:
-                if ta.is_displayed() and ta.is_enabled():
-                    msg = self.dataset.get("message", "Hello, this is a test message.")
-                    self._safe_type(ta, msg)
+                visible = ta.is_displayed() and ta.is_enabled()
             except Exception:
                 continue
+            if visible:
+                self._safe_type(ta, self._message("Hello, this is a test message."))
 
     def fill_checkboxes(self):
         checkboxes = self.driver.find_elements(By.CSS_SELECTOR, "form input[type='checkbox']")
@@ -209,30 +256,35 @@ class FormFiller:
             except Exception:
                 continue
 
+    def _pick_option(self, sel):
+        """Choose the dataset's looking_for option if offered, else a random real option."""
+        s = Select(sel)
+        opts = [opt for opt in s.options if opt.text.strip()
+                and "select" not in opt.text.lower()
+                and "choose" not in opt.text.lower()]
+        if not opts:
+            return
+        choice = self.dataset.get("looking_for")
+        if choice and any(opt.text.strip().lower() == choice.lower() for opt in opts):
+            try:
+                s.select_by_visible_text(choice)
+                logger.debug(f"[FormFiller] Selected option '{choice}' (matched dataset)")
+            except Exception:
+                self._safe_click(random.choice(opts))
+        else:
+            rand_opt = random.choice(opts)
+            try:
+                s.select_by_visible_text(rand_opt.text.strip())
+                logger.debug(f"[FormFiller] Randomly selected '{rand_opt.text.strip()}'")
+            except Exception:
+                self._safe_click(rand_opt)
+
     def fill_selects(self):
         selects = self.driver.find_elements(By.CSS_SELECTOR, "form select")
         for sel in selects:
             try:
                 if sel.is_displayed() and sel.is_enabled():
-                    s = Select(sel)
-                    opts = [opt for opt in s.options if opt.text.strip()
-                            and "select" not in opt.text.lower()
-                            and "choose" not in opt.text.lower()]
-                    if opts:
-                        choice = self.dataset.get("looking_for")
-                        if choice and any(opt.text.strip().lower() == choice.lower() for opt in opts):
-                            try:
-                                s.select_by_visible_text(choice)
-                                logger.debug(f"[FormFiller] Selected option '{choice}' (matched dataset)")
-                            except Exception:
-                                self._safe_click(random.choice(opts))
-                        else:
-                            rand_opt = random.choice(opts)
-                            try:
-                                s.select_by_visible_text(rand_opt.text.strip())
-                                logger.debug(f"[FormFiller] Randomly selected '{rand_opt.text.strip()}'")
-                            except Exception:
-                                self._safe_click(rand_opt)
+                    self._pick_option(sel)
             except Exception:
                 continue
 
@@ -253,18 +305,38 @@ class FormFiller:
             except Exception:
                 continue
 
+    def fill_control(self, el, tag, ftype, attr, checked=False):
+        """Fill one control already described by the caller (fields revealed by a later form step)."""
+        if tag == "textarea":
+            self._safe_type(el, self._message("Hello, this is a test message."))
+        elif tag == "select":
+            self._pick_option(el)
+        elif ftype in ("checkbox", "radio"):
+            if not checked and not self._safe_click(el):
+                self.driver.execute_script("arguments[0].click();", el)
+        else:
+            self._safe_type(el, self._choose_value(el, ftype, attr))
+
     # ---------- Orchestrator ----------
     def run(self):
-        """Run all filling steps, optimized for HubSpot & generic forms"""
+        """Run all filling steps, optimized for HubSpot & generic forms.
+
+        The message is typed last so a still-streaming pitch only blocks the final field.
+        """
         if self._handle_hubspot():
             logger.debug("[FormFiller] HubSpot form handled successfully")
             return True
 
-        self.fill_inputs()
-        self.fill_textareas()
+        deferred = self.fill_inputs(defer_message=True)
         self.fill_checkboxes()
         self.fill_radios()
         self.fill_selects()
         self.fill_custom_dropdowns()
+        for field in deferred:
+            try:
+                self._safe_type(field, self._message())
+            except (StaleElementReferenceException, ElementNotInteractableException):
+                continue
+        self.fill_textareas()
         logger.debug("[FormFiller] Finished filling generic form fields")
         return False
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+
+from formbot.form_filler import FormFiller
+from formbot.page_lib import get_page_lib, page_call
+from formbot.state import atomic_write, state_path
+
+logger = logging.getLogger("formbot")
+
+# Set on every control of the captured form so SubmitHandler can report which one it clicked
+POS_ATTR = "data-formbot-pos"
+
+# vendor markers taken from the form's own id/class (numeric ids masked: gform_12 → gform_#)
+VENDOR_PREFIXES = ("wpcf7", "elementor", "gform", "wpforms", "nf-", "hs-form", "hbspt", "mktoform",
+                   "et_pb", "uagb", "fluentform", "frm", "forminator", "ninja")
+
+# One round trip: pick the page's contact form, tag its controls with their position and
+# describe them (tag, type, name, id, placeholder, visible).
+CAPTURE_SCRIPT = r"""
+const POS = arguments[0];
+const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+    && getComputedStyle(el).visibility !== 'hidden';
+const TEXT = ['', 'text', 'email', 'tel', 'number', 'url', 'search'];
+const forms = [...document.forms];
+let best = -1, bestScore = 0;
+forms.forEach((f, i) => {
+  if (!visible(f)) return;
+  const texts = [...f.querySelectorAll('input')].filter(x => TEXT.includes((x.getAttribute('type') || '').toLowerCase()));
+  const score = f.querySelectorAll('textarea').length * 3 + texts.length;
+  if ((f.querySelector('textarea') || texts.length >= 2) && score > bestScore) { best = i; bestScore = score; }
+});
+if (best < 0) return null;
+const form = forms[best];
+const controls = [...form.querySelectorAll('input, textarea, select, button')].map((el, pos) => {
+  el.setAttribute(POS, String(pos));
+  return [el.tagName.toLowerCase(), (el.getAttribute('type') || '').toLowerCase(), el.getAttribute('name') || '',
+          el.id || '', el.getAttribute('placeholder') || '', visible(el) && !el.disabled];
+});
+return {form: best, marker: [form.id || '', form.className || ''].join(' '), controls};
+"""
+
+# One round trip: apply a stored plan. ops = [[pos, kind, value]]; returns how many applied,
+# or -1 if the form is gone.
+REPLAY_SCRIPT = r"""
+const [formIndex, ops, choice] = arguments;
+const form = document.forms[formIndex];
+if (!form) return -1;
+const controls = form.querySelectorAll('input, textarea, select, button');
+const setValue = (el, v) => {
+  const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+  el.focus();
+  Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, v);
+  ['input', 'change'].forEach(t => el.dispatchEvent(new Event(t, {bubbles: true})));
+  el.dispatchEvent(new Event('blur'));
+};
+let applied = 0;
+for (const [pos, kind, value] of ops) {
+  const el = controls[pos];
+  if (!el || el.disabled) continue;
+  if (kind === 'check' || kind === 'radio') {
+    if (!el.checked) el.click();
+  } else if (kind === 'select') {
+    const opts = [...el.options].filter(o => o.text.trim() && !/select|choose/i.test(o.text));
+    if (!opts.length) continue;
+    const match = opts.find(o => choice && o.text.trim().toLowerCase() === choice.toLowerCase());
+    el.value = (match || opts[Math.floor(Math.random() * opts.length)]).value;
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+  } else {
+    setValue(el, value);
+  }
+  applied++;
+}
+return applied;
+"""
+get_page_lib().register("capture_form", CAPTURE_SCRIPT)
+get_page_lib().register("replay_form", REPLAY_SCRIPT)
+
+_TEXT_TYPES = {"", "text", "email", "tel", "number", "url", "search"}
+
+
+class FormSignature:
+    """Structural fingerprint of a form: vendor markers plus the ordered control names and types.
+    Sites built from the same plugin template share it regardless of their styling or copy."""
+
+    def __init__(self, form_index, vendor, controls):
+        self.form_index = form_index
+        self.vendor = vendor
+        self.controls = controls
+        parts = [vendor] + [
+            # hidden field names often embed the form's numeric id (is_submit_12)
+            f"{tag}:{ftype}:{re.sub(r'[0-9]+', '#', name) if ftype == 'hidden' else name}"
+            for tag, ftype, name, _id, _ph, _vis in controls
+        ]
+        self.key = hashlib.sha1("\n".join(parts).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _vendor(marker):
+        tokens = [re.sub(r"\d{2,}|(?<=[-_])\d+", "#", t) for t in marker.lower().split()]
+        return " ".join(sorted({t for t in tokens if t.startswith(VENDOR_PREFIXES)})) or "generic"
+
+    @classmethod
+    def capture(cls, driver):
+        """Signature of the page's contact form, or None if there is none (or scripting fails)."""
+        try:
+            info = page_call(driver, "capture_form", POS_ATTR)
+        except Exception as e:
+            logger.debug(f"[signatures] Capture failed: {e}")
+            return None
+        if not info or not info.get("controls"):
+            return None
+        return cls(info["form"], cls._vendor(info.get("marker") or ""), [tuple(c) for c in info["controls"]])
+
+    def field_map(self):
+        """[[pos, kind]] for the visible controls, using FormFiller's own field rules."""
+        fields, radios = [], set()
+        for pos, (tag, ftype, name, id_attr, placeholder, visible) in enumerate(self.controls):
+            if not visible:
+                continue
+            if tag == "textarea":
+                fields.append([pos, "message"])
+            elif tag == "select":
+                fields.append([pos, "select"])
+            elif tag == "input" and ftype == "checkbox":
+                fields.append([pos, "check"])
+            elif tag == "input" and ftype == "radio":
+                if name not in radios:
+                    radios.add(name)
+                    fields.append([pos, "radio"])
+            elif tag == "input" and ftype in _TEXT_TYPES:
+                attr = " ".join([ftype, placeholder, name, id_attr]).lower()
+                fields.append([pos, FormFiller._choose_key(attr)])
+        return fields
+
+
+class FormIndex:
+    """Field maps and submit buttons that led to a confirmed submission, keyed by form signature
+    (persisted as JSON). A known signature is filled in one script call instead of the full
+    FormFiller/SubmitHandler cascade."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {}
+        self.hits = 0
+        self.lookups = 0
+        if path:
+            try:
+                with open(path) as fh:
+                    self._data = json.load(fh)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"[signatures] Ignoring unreadable form index {path}: {e}")
+
+    def _save(self):
+        with self._lock:
+            payload = json.dumps(self._data, indent=1, sort_keys=True).encode()
+        if self.path:
+            try:
+                atomic_write(self.path, payload)
+            except Exception as e:
+                logger.debug(f"[signatures] Could not save form index: {e}")
+
+    def lookup(self, signature):
+        """The stored plan for signature, unless it has failed more often than it worked."""
+        if signature is None:
+            return None
+        self.lookups += 1
+        plan = self._data.get(signature.key)
+        if plan and plan["confirmed"] > plan["misses"]:
+            self.hits += 1
+            return plan
+        return None
+
+    def record(self, signature, submit_pos=None):
+        """Remember the plan for a form that was just confirmed."""
+        if signature is None:
+            return
+        with self._lock:
+            plan = self._data.get(signature.key) or {"vendor": signature.vendor, "confirmed": 0, "misses": 0}
+            plan["fields"] = signature.field_map()
+            if submit_pos is not None:
+                plan["submit"] = int(submit_pos)
+            plan["confirmed"] += 1
+            plan["ts"] = int(time.time())
+            self._data[signature.key] = plan
+        self._save()
+
+    def miss(self, signature):
+        """A replayed plan did not confirm; enough misses retire it."""
+        with self._lock:
+            plan = self._data.get(signature.key) if signature else None
+            if plan is None:
+                return
+            plan["misses"] += 1
+        self._save()
+
+    def replay(self, driver, signature, plan, filler):
+        """Fill the form from plan in one call; False means fall back to FormFiller.
+        Raises PitchError (from the filler) if the message never arrived."""
+        ops = []
+        for pos, kind in plan["fields"]:
+            if kind in ("check", "radio", "select"):
+                ops.append([pos, kind, None])
+            elif kind == "message":
+                ops.append([pos, kind, filler._message("Hello, this is a test message.")])
+            else:
+                ops.append([pos, kind, filler._value_for_key(kind)])
+        try:
+            applied = page_call(driver, "replay_form", signature.form_index, ops, filler.dataset.get("looking_for"))
+        except Exception as e:
+            logger.debug(f"[signatures] Replay failed for {signature.key}: {e}")
+            return False
+        logger.debug(f"[signatures] Replayed {signature.vendor} plan {signature.key}: {applied}/{len(ops)} fields")
+        return applied == len(ops)
+
+    @staticmethod
+    def submit_element(driver, plan):
+        """The submit control that confirmed last time, if the plan has one and it is on the page."""
+        if plan.get("submit") is None:
+            return None
+        try:
+            found = driver.find_elements(By.CSS_SELECTOR, f"[{POS_ATTR}='{plan['submit']}']")
+        except Exception:
+            return None
+        return found[0] if found else None
+
+    def stats(self):
+        with self._lock:
+            plans = list(self._data.values())
+        return {"signatures": len(plans), "lookups": self.lookups, "hits": self.hits,
+                "confirmed": sum(p["confirmed"] for p in plans), "misses": sum(p["misses"] for p in plans)}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_form_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FormIndex(state_path("form_signatures.json"))
+        return _index
@@ -0,0 +1,307 @@
+import json
+import logging
+import random
+import re
+import time
+from urllib.parse import urljoin, urlsplit
+
+import requests
+import urllib3
+from bs4 import BeautifulSoup
+
+from formbot.contact_page_finder import ContactPageFinder
+from formbot.form_filler import FormFiller
+from formbot.success_checker import SuccessChecker
+from formbot.triage import captcha_marker, get_session
+
+logger = logging.getLogger("formbot")
+
+CONFIRMED, UNCONFIRMED, NEEDS_BROWSER = "confirmed", "unconfirmed", "needs_browser"
+
+
+class HttpSubmitResult:
+    """Outcome of a browserless submission attempt; NEEDS_BROWSER means the server accepted nothing."""
+
+    def __init__(self, contact_url, outcome, reason="", elapsed=0.0):
+        self.contact_url = contact_url
+        self.outcome = outcome
+        self.reason = reason
+        self.elapsed = elapsed
+
+    @property
+    def handled(self):
+        return self.outcome != NEEDS_BROWSER
+
+    @property
+    def status(self):
+        if self.outcome == CONFIRMED:
+            return f"[✓] Form submitted over HTTP and confirmed on {self.contact_url}"
+        if self.outcome == UNCONFIRMED:
+            return f"[X] Submitted over HTTP (attempted) but no confirmation on {self.contact_url} ({self.reason})"
+        return f"[X] Needs browser for {self.contact_url} ({self.reason})"
+
+    def to_dict(self):
+        return {"outcome": self.outcome, "reason": self.reason, "contact_url": self.contact_url,
+                "elapsed": round(self.elapsed, 3)}
+
+
+class HttpFormSubmitter:
+    """Submit plain server-rendered forms with requests, using FormFiller's field rules and
+    SuccessChecker's success texts. Anything that looks JS-driven is left to FormFlow."""
+
+    # vendors whose forms only submit through their own JavaScript
+    JS_VENDOR_HINTS = ["elementor-form", "nf-form", "hs-form", "hbspt", "wpforms-form", "mktoform",
+                       "jotform", "typeform", "formidable"]
+    MULTISTEP_HINTS = re.compile(r"\b(step|gform_page|wpforms-page|form-page|wizard)\b", re.I)
+    # whole id/class tokens (a wrapper's "overflow-hidden" or "hidden-xs" hides nothing), plus an hp- prefix
+    HONEYPOT_TOKENS = {"hidden", "honeypot", "sr-only", "visually-hidden", "screen-reader-text"}
+    TEXT_TYPES = ["", "text", "email", "tel", "number", "url", "search"]
+    SKIP_TYPES = ["file", "password", "image", "reset", "button"]
+    # checkboxes ticked besides required ones: privacy/terms acceptance, never newsletter opt-ins
+    CONSENT_HINTS = ["consent", "agree", "accept", "privacy", "terms", "gdpr", "datenschutz", "dsgvo"]
+
+    def __init__(self, dataset, session=None, timeout=(4, 15)):
+        self.dataset = dataset
+        self.session = session or get_session()
+        self.timeout = timeout
+        # FormFiller's mapping rules never touch the driver when only asked for values
+        self.filler = FormFiller(None, dataset)
+
+    # ---------- Form discovery ----------
+    @staticmethod
+    def _controls(form):
+        return form.find_all(["input", "textarea", "select", "button"])
+
+    def _looks_like_contact_form(self, form):
+        text = form.get_text(" ", strip=True).lower()
+        if any(h in text for h in ContactPageFinder.NEWSLETTER_HINTS):
+            return False
+        if form.find("textarea"):
+            return True
+        inputs = [i for i in form.find_all("input") if (i.get("type") or "").lower() in self.TEXT_TYPES]
+        return len(inputs) >= 2
+
+    def find_form(self, soup):
+        for form in soup.find_all("form"):
+            if self._looks_like_contact_form(form):
+                return form
+        return None
+
+    def js_dependency(self, form, html):
+        """Why this form needs a real browser, or None if a plain POST should work."""
+        captcha = captcha_marker(html)
+        if captcha:
+            return captcha
+        attrs = " ".join([form.get("id") or ""] + list(form.get("class") or [])).lower()
+        vendor = next((v for v in self.JS_VENDOR_HINTS if v in attrs), None)
+        if vendor:
+            return f"{vendor} form"
+        action = (form.get("action") or "").strip()
+        if action.lower().startswith("javascript:") or form.get("onsubmit"):
+            return "scripted submit"
+        if not action and any(a in form.attrs for a in ("data-ajax", "data-endpoint", "data-action")):
+            return "ajax-only form"
+        if (form.get("method") or "get").lower() != "post":
+            return "non-POST form"
+        for el in form.find_all(["fieldset", "div", "section"]):
+            marker = " ".join([el.get("id") or ""] + list(el.get("class") or []))
+            if self.MULTISTEP_HINTS.search(marker) and "display:none" in (el.get("style") or "").replace(" ", ""):
+                return "multi-step form"
+        if not form.find(["input", "button"], attrs={"type": re.compile("^(submit|image)$", re.I)}) and \
+                not any((b.get("type") or "submit").lower() == "submit" for b in form.find_all("button")):
+            return "no submit button"
+        if any(not c.get("name") and (c.get("type") or "").lower() not in ("submit", "button", "hidden")
+               for c in form.find_all(["input", "textarea", "select"])):
+            return "unnamed fields"
+        return None
+
+    # ---------- Payload ----------
+    def _hidden_by_markup(self, el, form):
+        """Honeypots are hidden with CSS; without a renderer, trust inline hints only."""
+        node = el
+        while node is not None and node is not form:
+            style = (node.get("style") or "").replace(" ", "").lower()
+            tokens = [t.lower() for t in [node.get("id") or ""] + list(node.get("class") or []) if t]
+            if "display:none" in style or "visibility:hidden" in style or node.has_attr("hidden") \
+                    or node.get("aria-hidden") == "true" \
+                    or any(t in self.HONEYPOT_TOKENS or t.startswith("hp-") for t in tokens):
+                return True
+            node = node.parent
+        return (el.get("tabindex") == "-1") and (el.get("autocomplete") == "off")
+
+    @staticmethod
+    def _label_text(el, form):
+        parts = [el.get("name") or "", el.get("id") or "", el.get("aria-label") or ""]
+        label = el.find_parent("label")
+        if label is None and el.get("id"):
+            label = form.find("label", attrs={"for": el["id"]})
+        if label is not None:
+            parts.append(label.get_text(" ", strip=True))
+        return " ".join(parts).lower()
+
+    def _tick(self, el, form):
+        """Checkboxes a careful human would tick: pre-checked, required, or a consent box."""
+        if el.has_attr("checked") or self._required(el):
+            return True
+        text = self._label_text(el, form)
+        if any(h in text for h in ContactPageFinder.NEWSLETTER_HINTS + ["marketing", "offers"]):
+            return False
+        return any(h in text for h in self.CONSENT_HINTS)
+
+    @staticmethod
+    def _required(el):
+        return el.has_attr("required") or el.get("aria-required") == "true"
+
+    def missing_fields(self, form, payload):
+        """Names of the message or required fields payload leaves empty (all taken for honeypots)."""
+        values = {}
+        for name, value in payload:
+            values[name] = values.get(name) or str(value).strip()
+        missing = []
+        textareas = [t.get("name") for t in form.find_all("textarea") if t.get("name")]
+        if textareas and not any(values.get(n) for n in textareas):
+            missing.append(textareas[0])
+        for el in form.find_all(["input", "textarea", "select"]):
+            name = el.get("name")
+            ftype = (el.get("type") or "").lower()
+            if name and self._required(el) and ftype not in ("hidden", "checkbox", "radio") \
+                    and not values.get(name) and name not in missing:
+                missing.append(name)
+        return missing
+
+    def _select_value(self, sel):
+        options = [o for o in sel.find_all("option") if o.get_text(strip=True)
+                   and "select" not in o.get_text().lower() and "choose" not in o.get_text().lower()]
+        if not options:
+            return None
+        choice = self.dataset.get("looking_for")
+        match = [o for o in options if choice and o.get_text(strip=True).lower() == choice.lower()]
+        opt = match[0] if match else random.choice(options)
+        return opt.get("value", opt.get_text(strip=True))
+
+    def build_payload(self, form):
+        """[(name, value)] in document order, hidden/nonce fields passed through untouched."""
+        payload, radios = [], set()
+        for el in self._controls(form):
+            name = el.get("name")
+            if not name or el.has_attr("disabled"):
+                continue
+            if el.name == "select":
+                value = self._select_value(el)
+                if value is not None:
+                    payload.append((name, value))
+                continue
+            if el.name == "textarea":
+                if not self._hidden_by_markup(el, form):
+                    payload.append((name, self.filler._message("Hello, this is a test message.")))
+                continue
+
+            ftype = (el.get("type") or ("submit" if el.name == "button" else "")).lower()
+            if ftype == "hidden":
+                payload.append((name, el.get("value", "")))
+            elif ftype == "submit":
+                continue  # only the clicked button is sent, appended below
+            elif ftype == "checkbox":
+                if self._tick(el, form):
+                    payload.append((name, el.get("value", "on")))
+            elif ftype == "radio":
+                if name not in radios:
+                    radios.add(name)
+                    payload.append((name, el.get("value", "on")))
+            elif ftype in self.SKIP_TYPES:
+                continue
+            elif self._hidden_by_markup(el, form):
+                payload.append((name, el.get("value", "")))
+            else:
+                attr = " ".join([ftype, el.get("placeholder") or "", name, el.get("id") or ""]).lower()
+                payload.append((name, self.filler._choose_value(None, ftype, attr)))
+        button = form.find(["input", "button"], attrs={"type": re.compile("^submit$", re.I)}) or form.find("button")
+        if button is not None and button.get("name"):
+            payload.append((button["name"], button.get("value", "")))
+        return payload
+
+    # ---------- Verdict ----------
+    def _confirmed(self, resp, body, before_html, contact_url):
+        if "json" in resp.headers.get("content-type", ""):
+            try:
+                data = json.loads(body)
+            except ValueError:
+                data = {}
+            if isinstance(data, dict):
+                if data.get("success") is True or str(data.get("status", "")).lower() in ("mail_sent", "success", "ok"):
+                    return True, "json ack"
+                body = json.dumps(data)
+        low = body.lower()
+        for t in SuccessChecker.SUCCESS_TEXTS:
+            if t in low and t not in before_html:
+                return True, f"text '{t}'"
+        cur = resp.url.lower()
+        if cur.rstrip("/") != contact_url.lower().rstrip("/") and any(
+                k in cur for k in ["thank", "success", "submitted", "complete", "confirmation"]):
+            return True, "success redirect"
+        return False, "no success text"
+
+    @staticmethod
+    def _never_sent(exc):
+        """True when the POST provably never reached the server (no connection was made)."""
+        if isinstance(exc, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(exc, requests.exceptions.ConnectionError) and \
+                not isinstance(exc, (requests.exceptions.ReadTimeout, requests.exceptions.SSLError)):
+            reason = getattr(exc.args[0], "reason", exc.args[0]) if exc.args else None
+            return isinstance(reason, urllib3.exceptions.NewConnectionError)
+        return False
+
+    # ---------- Entry ----------
+    def submit(self, contact_url):
+        """Fetch contact_url, submit its form over HTTP if it can be; raises PitchError if the message failed."""
+        started = time.perf_counter()
+        result = self._submit(contact_url)
+        result.elapsed = time.perf_counter() - started
+        logger.debug(f"[http_submit] {contact_url}: {result.outcome} {result.reason} ({result.elapsed:.2f}s)")
+        return result
+
+    def _submit(self, contact_url):
+        try:
+            page = self.session.get(contact_url, timeout=self.timeout)
+        except Exception as e:
+            return HttpSubmitResult(contact_url, NEEDS_BROWSER, f"fetch failed: {e.__class__.__name__}")
+        html = page.text
+        form = self.find_form(BeautifulSoup(html, "html.parser"))
+        if form is None:
+            return HttpSubmitResult(contact_url, NEEDS_BROWSER, "no server-rendered form")
+        reason = self.js_dependency(form, html)
+        if reason:
+            return HttpSubmitResult(contact_url, NEEDS_BROWSER, reason)
+
+        payload = self.build_payload(form)  # may block on (and raise for) the streaming pitch
+        missing = self.missing_fields(form, payload)
+        if missing:
+            # everything looked like a honeypot: posting blanks would only waste the site
+            return HttpSubmitResult(contact_url, NEEDS_BROWSER, f"empty required fields: {', '.join(missing[:3])}")
+        action = urljoin(page.url, form.get("action") or page.url)
+        origin = urlsplit(page.url)
+        headers = {"Referer": page.url, "Origin": f"{origin.scheme}://{origin.netloc}"}
+        try:
+            if "multipart" in (form.get("enctype") or "").lower():
+                resp = self.session.post(action, files=[(k, (None, str(v))) for k, v in payload],
+                                         headers=headers, timeout=self.timeout)
+            else:
+                resp = self.session.post(action, data=payload, headers=headers, timeout=self.timeout)
+        except Exception as e:
+            if self._never_sent(e):
+                return HttpSubmitResult(contact_url, NEEDS_BROWSER, f"post failed: {e.__class__.__name__}")
+            # read timeout, reset after sending: the message may be in; a browser retry could send it twice
+            return HttpSubmitResult(contact_url, UNCONFIRMED, f"post failed: {e.__class__.__name__}")
+        if 400 <= resp.status_code < 500:
+            # WAF block, stale nonce/CSRF token, JS-only validation: refused, the browser may still get through
+            return HttpSubmitResult(contact_url, NEEDS_BROWSER, f"post rejected: HTTP {resp.status_code}")
+        if resp.status_code >= 500:
+            return HttpSubmitResult(contact_url, UNCONFIRMED, f"HTTP {resp.status_code}")
+        confirmed, why = self._confirmed(resp, resp.text, html.lower(), contact_url)
+        return HttpSubmitResult(contact_url, CONFIRMED if confirmed else UNCONFIRMED, why)
+
+
+def try_http_submit(contact_url, dataset):
+    """Browserless attempt for a triaged contact page; result.handled is False when FormFlow should run."""
+    return HttpFormSubmitter(dataset).submit(contact_url)
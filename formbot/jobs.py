@@ -0,0 +1,225 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger("formbot")
+
+LAGGED = object()  # delivered to a subscriber that fell too far behind; it should reconnect
+
+
+def format_sse(seq, kind, data):
+    """One SSE frame; kind None is the default 'message' event the dashboard listens to."""
+    head = f"id: {seq}\n" if seq else ""
+    if kind:
+        head += f"event: {kind}\n"
+    payload = data if isinstance(data, str) else json.dumps(data)
+    return f"{head}data: {payload}\n\n"
+
+
+def coalesce(item, get_nowait):
+    """Merge queued token deltas for the same URL into item. Returns (item, carry): carry is the
+    first queued event that could not be merged (or None)."""
+    seq, kind, data = item
+    if kind is not None or not isinstance(data, dict) or data.get("stage") != "pitch":
+        return item, None
+    data = dict(data)
+    while True:
+        try:
+            nxt = get_nowait()
+        except (queue.Empty, IndexError):
+            return (seq, kind, data), None
+        if nxt is not LAGGED and nxt[1] is None and nxt[2].get("stage") == "pitch" and nxt[2]["url"] == data["url"]:
+            seq, data["delta"] = nxt[0], data["delta"] + nxt[2]["delta"]
+        else:
+            return (seq, kind, data), nxt
+
+
+class Subscription:
+    """A consumer of one job's events: an asyncio.Queue on its event loop, or a thread-safe
+    queue.Queue when loop is None. Items are (seq, kind, data) or LAGGED."""
+
+    def __init__(self, job, loop=None, max_backlog=5000):
+        self.job = job
+        self.loop = loop
+        self.max_backlog = max_backlog
+        self.queue = asyncio.Queue() if loop is not None else queue.Queue()
+        self.lagging = False
+
+    def _put(self, item):
+        """Runs on the subscriber's own loop (or any thread for queue.Queue)."""
+        if self.lagging:
+            return
+        if self.queue.qsize() >= self.max_backlog:
+            self.lagging = True  # Job.publish drops it; the consumer unsubscribes on LAGGED
+            self.queue.put_nowait(LAGGED)
+            return
+        self.queue.put_nowait(item)
+
+    def get(self, timeout=None):
+        """Thread subscribers: next item, raising queue.Empty after timeout."""
+        return self.queue.get(timeout=timeout)
+
+    async def aget(self):
+        return await self.queue.get()
+
+    def get_nowait(self):
+        try:
+            return self.queue.get_nowait()
+        except Exception:
+            raise queue.Empty
+
+
+class Job:
+    """One /fill batch: an append-only event log plus live subscribers. Workers publish from
+    any thread; each event is delivered once per subscriber's event loop, so thousands of
+    idle SSE streams cost a queue each and no thread."""
+
+    def __init__(self, job_id, urls, history_limit=50000, cancel_when_idle=False):
+        self.id = job_id
+        self.urls = list(urls)
+        self.created = time.time()
+        self.finished = None
+        self.history_limit = history_limit
+        # /fill jobs stop (pitch and browser work cancelled) once the last viewer disconnects
+        self.cancel_when_idle = cancel_when_idle
+        self.results = {}
+        self.stats = None
+        self.cancel_cb = None
+        self.cancelled = False
+        self._events = []
+        self._seq = itertools.count(1)
+        self._subs = set()
+        self._had_subscriber = False
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    # ---------- Publishing ----------
+    def publish(self, data, kind=None):
+        with self._lock:
+            item = (next(self._seq), kind, data)
+            self._events.append(item)
+            if len(self._events) > self.history_limit:
+                del self._events[: len(self._events) - self.history_limit]
+            if kind is None and isinstance(data, dict) and data.get("stage") == "result":
+                self.results[data.get("url")] = data.get("status")
+            # delivered under the lock so every subscriber sees events in sequence order
+            self._subs = {sub for sub in self._subs if not sub.lagging}
+            by_loop = {}
+            for sub in self._subs:
+                if sub.loop is None:
+                    sub._put(item)
+                else:
+                    by_loop.setdefault(sub.loop, []).append(sub)
+            for loop, subs in by_loop.items():
+                try:
+                    loop.call_soon_threadsafe(_fanout, subs, item)
+                except RuntimeError:  # loop closed
+                    self._subs.difference_update(subs)
+
+    def emit(self, url, stage, **data):
+        """FormFlow/pipeline progress callback signature."""
+        self.publish(dict(url=url, stage=stage, **data))
+
+    def finish(self, stats=None):
+        self.stats = stats
+        if stats is not None:
+            self.publish(stats, kind="stats")
+        self.finished = time.time()
+        self.publish("All URLs processed", kind="done")
+
+    def cancel(self):
+        if self.cancelled or self.done:
+            return
+        self.cancelled = True
+        if self.cancel_cb:
+            try:
+                self.cancel_cb()
+            except Exception as e:
+                logger.debug(f"[jobs] Cancelling {self.id} failed: {e}")
+
+    # ---------- Subscribing ----------
+    def subscribe(self, after=0, loop=None):
+        """New subscription replaying events with seq > after (Last-Event-ID); call on loop's thread."""
+        sub = Subscription(self, loop)
+        with self._lock:
+            for item in self._events:
+                if item[0] > after:
+                    sub.queue.put_nowait(item)
+            self._subs.add(sub)
+            self._had_subscriber = True
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs.discard(sub)
+            idle = self._had_subscriber and not self._subs
+        if idle and self.cancel_when_idle and not self.done:
+            logger.info(f"🛑 Last viewer left job {self.id}; cancelling")
+            self.cancel()
+
+    @property
+    def subscribers(self):
+        return len(self._subs)
+
+    def to_dict(self):
+        return {"job": self.id, "urls": len(self.urls), "created": self.created, "done": self.done,
+                "cancelled": self.cancelled, "finished": self.finished, "subscribers": self.subscribers,
+                "events": len(self._events), "results": dict(self.results), "stats": self.stats}
+
+
+def _fanout(subs, item):
+    for sub in subs:
+        sub._put(item)
+
+
+class JobManager:
+    """Registry of running and recently finished jobs (kept for JOB_TTL seconds)."""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("JOB_TTL", "3600"))
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, urls, cancel_when_idle=False):
+        job = Job(uuid.uuid4().hex[:12], urls, cancel_when_idle=cancel_when_idle)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.done and not job.subscribers and now - job.finished > self.ttl:
+                del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {"jobs": len(jobs), "running": sum(not j.done for j in jobs),
+                "subscribers": sum(j.subscribers for j in jobs)}
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -0,0 +1,183 @@
+import atexit
+import logging
+import math
+import re
+import struct
+import threading
+import zlib
+from array import array
+from collections import Counter
+
+from formbot.state import atomic_write, state_path
+
+logger = logging.getLogger("formbot")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each even every few for from further get got
+had has have having he her here hers him his how i if in into is it its itself just let like may me more
+most much must my no nor not now of off on once only or other our ours out over own per please same she
+should so some such than that the their theirs them then there these they this those through to too under
+until up upon us very via was we were what when where which while who whom why will with within without
+would you your yours yourself home page menu contact click read learn call today welcome site website
+copyright rights reserved privacy policy terms cookies cookie info email phone new best top one two three
+since owned offer offers offering provide provides providing include includes including many well year
+years always able across around based still yet however though although whether etc make makes made need
+needs help helps want way know see use using used get gets take takes give gives come find keep day days
+serve serves serving local friendly fair quality great
+""".split())
+
+_TOKEN = re.compile(r"[a-z][a-z0-9'\-]{1,30}")
+# phrases never cross sentence, clause or list boundaries ("... claims. Personal ..." is not a phrase)
+_BREAK = re.compile(r"[.!?;:,()\[\]{}|/\\\"•·–—\n\r\t]+|\s-+\s")
+_MAGIC = b"FBKW"
+
+
+def tokenize(text):
+    return [t.strip("'-") for t in _TOKEN.findall((text or "").lower())]
+
+
+def segments(text):
+    """Token lists of text's sentence/clause/list-item pieces."""
+    return [tokens for tokens in (tokenize(part) for part in _BREAK.split(text or "")) if tokens]
+
+
+def text_ngrams(text, max_n=3):
+    """candidate_ngrams of every segment of text, never spanning two of them."""
+    return [gram for tokens in segments(text) for gram in candidate_ngrams(tokens, max_n)]
+
+
+def candidate_ngrams(tokens, max_n=3):
+    """1–3 word phrases of one segment that neither start nor end with a stopword."""
+    out = []
+    for n in range(1, max_n + 1):
+        for i in range(len(tokens) - n + 1):
+            gram = tokens[i:i + n]
+            if gram[0] in STOPWORDS or gram[-1] in STOPWORDS or len(gram[-1]) < 3:
+                continue
+            if n > 1 and len(set(gram)) < n:
+                continue  # "law law", "review review"...
+            out.append(" ".join(gram))
+    return out
+
+
+class BackgroundCorpus:
+    """Document frequencies of phrases across previously fetched sites, in a fixed-size hashed table.
+
+    The table is an array of 2**bits uint32 counters indexed by crc32(phrase), so memory and
+    disk size are constant (1 MiB at bits=18, much less once zlib-compressed) however many
+    sites are added.
+    """
+
+    def __init__(self, path=None, bits=18, autosave_every=50):
+        self.path = path
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.df = array("I", bytes(4 << bits))
+        self.n_docs = 0
+        self.autosave_every = autosave_every
+        self._dirty = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, phrase):
+        return zlib.crc32(phrase.encode()) & self.mask
+
+    def add_document(self, text):
+        buckets = {self._bucket(p) for p in text_ngrams(text, max_n=3)}
+        if not buckets:
+            return
+        with self._lock:
+            df = self.df
+            for b in buckets:
+                df[b] += 1
+            self.n_docs += 1
+            self._dirty += 1
+            save = self.path and self._dirty >= self.autosave_every
+        if save:
+            self.save()
+
+    def idf(self, phrase):
+        return math.log((1 + self.n_docs) / (1 + self.df[self._bucket(phrase)])) + 1.0
+
+    # ---------- Persistence ----------
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            header = struct.pack("<4sBBI", _MAGIC, 1, self.bits, self.n_docs)
+            payload = header + zlib.compress(self.df.tobytes(), 6)
+            self._dirty = 0
+        atomic_write(path, payload)
+        logger.debug(f"[keywords] Saved background corpus ({self.n_docs} docs) to {path}")
+
+    @classmethod
+    def load(cls, path, bits=18, autosave_every=50):
+        corpus = cls(path=path, bits=bits, autosave_every=autosave_every)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            return corpus
+        try:
+            magic, version, file_bits, n_docs = struct.unpack_from("<4sBBI", data)
+            if magic != _MAGIC or version != 1:
+                raise ValueError("not a formbot keyword corpus")
+            corpus = cls(path=path, bits=file_bits, autosave_every=autosave_every)
+            corpus.df = array("I", zlib.decompress(data[struct.calcsize("<4sBBI"):]))
+            corpus.n_docs = n_docs
+        except Exception as e:
+            logger.warning(f"[keywords] Ignoring unreadable corpus {path}: {e}")
+        return corpus
+
+
+class LocalKeywordExtractor:
+    """TF-IDF phrase scoring against a BackgroundCorpus, biased toward the pitched service."""
+
+    def __init__(self, corpus=None, service_boost=2.0, phrase_boost=1.35):
+        self.corpus = corpus or BackgroundCorpus()
+        self.service_boost = service_boost
+        self.phrase_boost = phrase_boost
+
+    def extract(self, text, service="", top_k=10):
+        counts = Counter(text_ngrams(text))
+        if not counts:
+            return []
+        service_terms = {t for t in tokenize(service) if t not in STOPWORDS}
+        peak = max(counts.values())
+
+        scored = []
+        for phrase, count in counts.items():
+            words = phrase.split(" ")
+            if len(words) > 1 and count < 2:
+                continue  # one-off multi-word phrases are mostly noise
+            score = (0.5 + 0.5 * count / peak) * self.corpus.idf(phrase)
+            score *= self.phrase_boost ** (len(words) - 1)
+            if service_terms and service_terms & set(words):
+                score *= self.service_boost
+            scored.append((score, phrase))
+        scored.sort(reverse=True)
+
+        picked = []
+        for _, phrase in scored:
+            # skip phrases already covered by (or covering) a better-scored pick
+            if any(phrase in p or p in phrase for p in picked):
+                continue
+            picked.append(phrase)
+            if len(picked) >= top_k:
+                break
+        return picked
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_corpus():
+    """Process-wide corpus persisted at <state dir>/keyword_corpus.bin, saved again at exit."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BackgroundCorpus.load(state_path("keyword_corpus.bin"))
+            atexit.register(_shared.save)
+        return _shared
@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from formbot.pitch_service import PitchError, PitchService
+
+logger = logging.getLogger("formbot")
+
+_lock = threading.Lock()
+_client = None
+_pitch_service = None
+
+
+def openai_settings():
+    """api_key/base_url shared by every client; OPENAI_BASE_URL may point at bench/openai_stub.py."""
+    base_url = os.getenv("OPENAI_BASE_URL") or None
+    api_key = os.getenv("OPENAI_API_KEY") or ("local-stub" if base_url else None)
+    return {"api_key": api_key, "base_url": base_url}
+
+
+def get_client():
+    """Shared synchronous OpenAI client (health checks and one-off calls)."""
+    global _client
+    with _lock:
+        if _client is None:
+            from openai import OpenAI  # the SDK is slow to import; only load it when a client is needed
+            _client = OpenAI(**openai_settings())
+        return _client
+
+
+def get_pitch_service():
+    """Shared async PitchService; retries/backoff are handled there, so the SDK's own retries are off."""
+    global _pitch_service
+    with _lock:
+        if _pitch_service is None:
+            from openai import AsyncOpenAI
+            _pitch_service = PitchService(
+                AsyncOpenAI(**openai_settings(), max_retries=0, timeout=45),
+                model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
+                rpm=int(os.getenv("OPENAI_RPM", "500")),
+                tpm=int(os.getenv("OPENAI_TPM", "200000")),
+                max_in_flight=int(os.getenv("PITCH_MAX_IN_FLIGHT", "16")),
+                deadline=float(os.getenv("PITCH_DEADLINE", "60")),
+                hedge_after=float(os.getenv("PITCH_HEDGE_AFTER", "8")),
+            )
+        return _pitch_service
+
+
+def parse_structured(text, required=("pitch",)):
+    """Parse a JSON-mode completion; raises PitchError if it is not an object with the required keys."""
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise PitchError(f"Malformed structured response: {e}")
+    if not isinstance(data, dict) or any(not data.get(k) for k in required):
+        raise PitchError(f"Structured response missing {', '.join(required)}")
+    return data
+
+
+class KeywordCache:
+    """Thread-safe LRU of SEO keywords per registrable domain, with a TTL."""
+
+    def __init__(self, max_entries=5000, ttl=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, domain):
+        with self._lock:
+            entry = self._data.get(domain)
+            if entry and time.time() - entry[0] < self.ttl:
+                self._data.move_to_end(domain)
+                self.hits += 1
+                return entry[1]
+            self._data.pop(domain, None)
+            self.misses += 1
+            return None
+
+    def put(self, domain, keywords):
+        with self._lock:
+            self._data[domain] = (time.time(), list(keywords))
+            self._data.move_to_end(domain)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
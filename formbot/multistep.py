@@ -0,0 +1,124 @@
+import logging
+import os
+import time
+
+from formbot.page_lib import get_page_lib, page_call
+from formbot.pitch_service import PitchError
+
+logger = logging.getLogger("formbot")
+
+# One round trip: every visible, fillable form control with what FormFiller needs to map it.
+# The returned WebElements keep their reference id for as long as the node lives, which is
+# what identifies a control as "already filled" across steps.
+CONTROLS_SCRIPT = r"""
+const SKIP = ['hidden', 'file', 'password', 'submit', 'button', 'image', 'reset'];
+const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+    && getComputedStyle(el).visibility !== 'hidden';
+return [...document.querySelectorAll('form input, form textarea, form select')].filter(el => {
+  const t = (el.getAttribute('type') || '').toLowerCase();
+  return !SKIP.includes(t) && !el.disabled && !el.readOnly && visible(el);
+}).map(el => [el, el.tagName.toLowerCase(), (el.getAttribute('type') || '').toLowerCase(),
+              el.getAttribute('name') || '', el.id || '', el.getAttribute('placeholder') || '', !!el.checked]);
+"""
+
+
+get_page_lib().register("controls", CONTROLS_SCRIPT)
+
+
+def max_form_steps():
+    return max(1, int(os.getenv("FORMBOT_MAX_FORM_STEPS", "4") or 4))
+
+
+class MultiStepEngine:
+    """Drives wizard-style forms after the first submit: each step fills only the controls
+    that were not visible (and filled) before, then clicks next/submit, up to max_steps."""
+
+    def __init__(self, driver, filler, submitter, max_steps=None, reveal_wait=3.0, on_step=None):
+        self.driver = driver
+        self.filler = filler
+        self.submitter = submitter
+        self.max_steps = max_steps or max_form_steps()
+        self.reveal_wait = reveal_wait
+        self.on_step = on_step
+        self.filled = set()
+        self.radio_groups = set()
+        self.steps = []
+
+    # ---------- Controls ----------
+    def controls(self):
+        try:
+            return page_call(self.driver, "controls") or []
+        except Exception as e:
+            logger.debug(f"[multistep] Control scan failed: {e}")
+            return []
+
+    def mark_filled(self):
+        """Baseline after the first fill: everything visible now counts as done."""
+        for el, tag, ftype, name, *_ in self.controls():
+            self.filled.add(el.id)
+            if ftype == "radio":
+                self.radio_groups.add(name)
+
+    def delta(self):
+        """Controls revealed since the last step, one per radio group."""
+        fresh, groups = [], set()
+        for row in self.controls():
+            el, tag, ftype, name = row[:4]
+            if el.id in self.filled:
+                continue
+            if ftype == "radio" and (name in self.radio_groups or name in groups):
+                self.filled.add(el.id)
+                continue
+            if ftype == "radio":
+                groups.add(name)
+            fresh.append(row)
+        return fresh
+
+    def revealed(self, wait=0.0):
+        """Whether the last click uncovered new fields (polled for up to wait seconds)."""
+        end = time.monotonic() + wait
+        while True:
+            if self.delta():
+                return True
+            if time.monotonic() >= end:
+                return False
+            time.sleep(0.3)
+
+    def _fill(self, rows):
+        # message-like fields last so a still-streaming pitch only blocks the final one
+        rows = sorted(rows, key=lambda r: r[1] == "textarea" or self.filler._choose_key(" ".join(r[2:6])) == "message")
+        for el, tag, ftype, name, id_attr, placeholder, checked in rows:
+            self.filled.add(el.id)
+            if ftype == "radio":
+                self.radio_groups.add(name)
+            attr = " ".join([ftype, placeholder, name, id_attr]).lower()
+            try:
+                self.filler.fill_control(el, tag, ftype, attr, checked)
+            except PitchError:
+                raise
+            except Exception as e:
+                logger.debug(f"[multistep] Could not fill {name or id_attr}: {e}")
+
+    # ---------- Steps ----------
+    def run(self, checker):
+        """Fill and advance step by step; True once checker sees a confirmation."""
+        idle = 0
+        for step in range(1, self.max_steps + 1):
+            started = time.perf_counter()
+            fresh = self.delta()
+            self._fill(fresh)
+            idle = 0 if fresh else idle + 1
+            advanced = self.submitter.advance() if idle < 2 else False
+            revealed = advanced and self.revealed(self.reveal_wait)
+            confirmed = advanced and not revealed and checker.run()
+            record = {"step": step, "fields": len(fresh), "advanced": advanced, "revealed": revealed,
+                      "confirmed": confirmed, "seconds": round(time.perf_counter() - started, 3)}
+            self.steps.append(record)
+            logger.debug(f"[multistep] Step {step}: {record}")
+            if self.on_step:
+                self.on_step(record)
+            if confirmed:
+                return True
+            if not advanced:
+                break  # nothing new to fill and nothing left to click
+        return False
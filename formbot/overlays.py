@@ -0,0 +1,197 @@
+import json
+import logging
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+
+from formbot.domains import registrable_domain
+from formbot.page_lib import get_page_lib, page_call
+from formbot.state import atomic_write, state_path
+
+logger = logging.getLogger("formbot")
+
+# One round trip: try the remembered consent handler first, then the known CMP buttons, then
+# accept/agree/allow text outside of forms (a form counts only inside a consent container).
+# Same-origin iframes and open shadow roots are searched in-page; cross-origin consent iframes
+# are only reported (by index) so Python can switch into them.
+# Banners are removed only when nothing was clicked (and no consent iframe is left to try);
+# chat widgets are always removed.
+DISMISS_SCRIPT = r"""
+const preferred = arguments[0], forceRemove = arguments[1];
+const HANDLERS = [
+  ["onetrust", "#onetrust-accept-btn-handler"],
+  ["cookiebot", "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll, #CybotCookiebotDialogBodyButtonAccept"],
+  ["didomi", "#didomi-notice-agree-button"],
+  ["usercentrics", "#usercentrics-root >>> [data-testid='uc-accept-all-button']"],
+  ["quantcast", ".qc-cmp2-summary-buttons button[mode='primary']"],
+  ["osano", ".osano-cm-accept-all, .osano-cm-accept"],
+  ["cookieyes", ".cky-btn-accept"],
+  ["complianz", ".cmplz-accept"],
+  ["cookieconsent", ".cc-allow, .cc-dismiss"],
+  ["text-button", "button, [role='button'], input[type='button'], input[type='submit']"],
+  ["text-link", "a"],
+];
+const WORDS = /\b(accept|agree|allow)/;
+const OVERLAYS = "#onetrust-banner-sdk, #onetrust-policy-text, .cookie, [id*='cookie'], [class*='cookie'], " +
+  ".cc-window, .cc-banner, .osano-cm-window, .consent, .gdpr, .cm-root, .sp-privacy-manager";
+const CHATS = "iframe[src*='intercom'], iframe[src*='drift'], iframe[src*='hubspot'], iframe[src*='tawk'], " +
+  "iframe[src*='livechat'], iframe[id*='launcher'], .chat-widget, .launcher__button, .chatbot, .chat-container";
+const CONSENT_SRC = /consent|cookie|privacy|onetrust|sp_message|cmp/;
+
+const docs = [document];
+for (const fr of document.querySelectorAll("iframe")) {
+  try { if (fr.contentDocument && fr.contentDocument.body) docs.push(fr.contentDocument); } catch (e) {}
+}
+const visible = (el) => {
+  const r = el.getBoundingClientRect();
+  return r.width > 0 && r.height > 0 && !el.disabled &&
+    (el.ownerDocument.defaultView.getComputedStyle(el).visibility !== "hidden");
+};
+const query = (root, sel) => {
+  const [host, inner] = sel.split(" >>> ");
+  if (!inner) return Array.from(root.querySelectorAll(sel));
+  const h = root.querySelector(host);
+  return h && h.shadowRoot ? Array.from(h.shadowRoot.querySelectorAll(inner)) : [];
+};
+const tryHandler = (name, sel) => {
+  for (const doc of docs) {
+    for (const el of query(doc, sel)) {
+      if (!visible(el)) continue;
+      if (name.startsWith("text-")) {
+        const t = (el.innerText || el.value || "").trim().toLowerCase();
+        if (!t || t.length > 60 || !WORDS.test(t)) continue;
+        // never a form's own "I agree / Send" button or terms link: that would submit it empty
+        const form = el.closest("form");
+        if (form && !form.closest(OVERLAYS)) continue;
+      }
+      try { el.click(); return true; } catch (e) {}
+    }
+  }
+  return false;
+};
+
+let handler = null;
+const ordered = HANDLERS.filter((h) => h[0] === preferred).concat(HANDLERS.filter((h) => h[0] !== preferred));
+if (!forceRemove) {
+  for (const [name, sel] of ordered) {
+    if (tryHandler(name, sel)) { handler = name; break; }
+  }
+}
+
+const frames = [];
+if (!handler && !forceRemove) {
+  Array.from(document.querySelectorAll("iframe")).forEach((fr, i) => {
+    let sameOrigin = false;
+    try { sameOrigin = !!fr.contentDocument; } catch (e) {}
+    if (!sameOrigin && CONSENT_SRC.test((fr.src || "").toLowerCase()) && visible(fr)) frames.push(i);
+  });
+}
+
+let removed = 0;
+const remove = (sel) => document.querySelectorAll(sel).forEach((el) => {
+  if (el === document.body || el === document.documentElement) return;
+  el.remove(); removed++;
+});
+if (!handler && !frames.length) remove(OVERLAYS);
+remove(CHATS);
+return {handler: handler, frames: frames.slice(0, 4), removed: removed};
+"""
+get_page_lib().register("dismiss_overlays", DISMISS_SCRIPT)
+
+FRAME_BUTTONS = ("//button[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'accept') "
+                 "or contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'agree') "
+                 "or contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'allow')]")
+
+
+class ConsentMemory:
+    """Which consent handler worked last time, per registrable domain (persisted as JSON)."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {}
+        if path:
+            try:
+                with open(path) as fh:
+                    self._data = json.load(fh)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"[overlays] Ignoring unreadable consent memory {path}: {e}")
+
+    def get(self, url):
+        entry = self._data.get(registrable_domain(url))
+        return entry["handler"] if entry else None
+
+    def put(self, url, handler):
+        domain = registrable_domain(url)
+        with self._lock:
+            entry = self._data.get(domain)
+            if entry and entry["handler"] == handler:
+                return
+            self._data[domain] = {"handler": handler, "ts": int(time.time())}
+            payload = json.dumps(self._data, indent=1, sort_keys=True).encode()
+        if self.path:
+            try:
+                atomic_write(self.path, payload)
+            except Exception as e:
+                logger.debug(f"[overlays] Could not save consent memory: {e}")
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_consent_memory():
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = ConsentMemory(state_path("consent_handlers.json"))
+        return _memory
+
+
+def _click_in_frames(driver, indexes):
+    """Cross-origin consent iframes can't be scripted from the page; switch into them instead."""
+    frames = driver.find_elements(By.TAG_NAME, "iframe")
+    for i in indexes:
+        if i >= len(frames):
+            continue
+        try:
+            driver.switch_to.frame(frames[i])
+            for el in driver.find_elements(By.XPATH, FRAME_BUTTONS):
+                if el.is_displayed() and el.is_enabled():
+                    el.click()
+                    return True
+        except Exception:
+            continue
+        finally:
+            try:
+                driver.switch_to.default_content()
+            except Exception:
+                pass
+    return False
+
+
+def dismiss_overlays(driver, url=None, memory=None):
+    """Accept cookie banners and remove chat/overlay blockers; returns the consent handler that worked."""
+    memory = memory or get_consent_memory()
+    url = url or driver.current_url
+    preferred = memory.get(url)
+    try:
+        result = page_call(driver, "dismiss_overlays", preferred, False) or {}
+        handler = result.get("handler")
+        if not handler and result.get("frames"):
+            if _click_in_frames(driver, result["frames"]):
+                handler = "frame"
+            else:
+                page_call(driver, "dismiss_overlays", None, True)
+    except Exception as e:
+        logger.debug(f"[overlays] Dismiss script failed: {e}")
+        return None
+
+    if handler:
+        logger.debug(f"[overlays] Consent accepted via {handler}{' (remembered)' if handler == preferred else ''}")
+        memory.put(url, handler)
+        time.sleep(0.2)
+    return handler
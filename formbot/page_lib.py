@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import threading
+
+logger = logging.getLogger("formbot")
+
+GLOBAL = "__formbot"
+MISSING = "__formbot_lib_missing__"
+
+
+class PageLibrary:
+    """formbot's in-page helpers (snapshot walker, overlay dismisser, form capture/replay...)
+    installed once per document. Scripts are registered by name at import time; the whole set
+    is added to each browser with Page.addScriptToEvaluateOnNewDocument, so a call ships a
+    ~150 byte stub instead of the full source. A document without the current version (CDP
+    unavailable, cross-origin frame, registered mid-document) gets it on its first call."""
+
+    def __init__(self):
+        self._scripts = {}
+        self._source = None
+        self._version = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.installs = 0
+        self.fallbacks = 0
+        self.sent = 0
+        self.saved = 0
+
+    def register(self, name, script):
+        """Script bodies use `arguments` and `return` exactly as with execute_script."""
+        with self._lock:
+            if self._scripts.get(name) != script:
+                self._scripts[name] = script
+                self._source = self._version = None
+        return name
+
+    def _build(self):
+        with self._lock:
+            if self._source is None:
+                body = ",\n".join(f"{json.dumps(name)}: function () {{\n{script}\n}}"
+                                  for name, script in sorted(self._scripts.items()))
+                self._version = hashlib.sha1(body.encode()).hexdigest()[:10]
+                self._source = (f"(() => {{ if (window.{GLOBAL} && window.{GLOBAL}.v === "
+                                f"{json.dumps(self._version)}) return;\n"
+                                f"window.{GLOBAL} = {{v: {json.dumps(self._version)}, f: {{\n{body}\n}}}}; }})();")
+            return self._source, self._version
+
+    @property
+    def version(self):
+        return self._build()[1]
+
+    @property
+    def source(self):
+        return self._build()[0]
+
+    def stub(self, name):
+        """The per-call payload: version check, then the registered function."""
+        version = self.version
+        return (f"const l = window.{GLOBAL}; return l && l.v === {json.dumps(version)} ? "
+                f"l.f[{json.dumps(name)}].apply(null, arguments) : {json.dumps(MISSING)};")
+
+    def full(self, name):
+        """Installs the library in the current document and runs name (fallback payload)."""
+        return f"{self.source}\nreturn window.{GLOBAL}.f[{json.dumps(name)}].apply(null, arguments);"
+
+    # ---------- Browser wiring ----------
+    def install(self, driver):
+        """Register the library for every new document of driver's page (once per version)."""
+        source, version = self._build()
+        if getattr(driver, "_formbot_lib", None) == version:
+            return True
+        try:
+            old = getattr(driver, "_formbot_lib_id", None)
+            if old:
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": old})
+            result = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+            driver._formbot_lib_id = (result or {}).get("identifier")
+            ok = True
+        except Exception as e:
+            logger.debug(f"[page_lib] New-document script unavailable ({e}); installing per document")
+            ok = False
+        driver._formbot_lib = version  # tried for this version: don't retry CDP on every call
+        self.installs += ok
+        return ok
+
+    def call(self, driver, name, *args):
+        """execute_script(registered script, *args) through the installed library."""
+        self.install(driver)
+        self.calls += 1
+        stub = self.stub(name)
+        result = driver.execute_script(stub, *args)
+        if isinstance(result, str) and result == MISSING:
+            self.fallbacks += 1
+            full = self.full(name)
+            self.sent += len(stub) + len(full)
+            return driver.execute_script(full, *args)
+        self.sent += len(stub)
+        self.saved += len(self._scripts[name]) - len(stub)
+        return result
+
+    def stats(self):
+        return {"version": self.version, "scripts": len(self._scripts), "source_bytes": len(self.source),
+                "calls": self.calls, "cdp_installs": self.installs, "fallbacks": self.fallbacks,
+                "script_bytes_sent": self.sent, "script_bytes_saved": self.saved}
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_page_lib():
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = PageLibrary()
+        return _library
+
+
+def page_call(driver, name, *args):
+    return get_page_lib().call(driver, name, *args)
@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger("formbot")
+
+
+class PitchError(Exception):
+    """Raised when no usable pitch could be produced; callers must never submit a form with it."""
+
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `per_minute` tokens per minute."""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        """Wait until `amount` tokens are available, then take them (FIFO via the lock)."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+def _status_code(exc):
+    code = getattr(exc, "status_code", None)
+    if code is None and getattr(exc, "response", None) is not None:
+        code = getattr(exc.response, "status_code", None)
+    return code
+
+
+def _retry_after(exc):
+    try:
+        value = exc.response.headers.get("retry-after")
+        return float(value) if value else None
+    except Exception:
+        return None
+
+
+def classify_error(exc):
+    """Return (retryable, message) for an exception raised by the OpenAI client."""
+    msg = str(exc)
+    if "insufficient_quota" in msg:
+        return False, "Quota exhausted. Please add billing or credits."
+    if "invalid_api_key" in msg or _status_code(exc) in (401, 403):
+        return False, "Invalid API key."
+    code = _status_code(exc)
+    if code == 429 or (code is not None and code >= 500):
+        return True, f"HTTP {code}: {msg}"
+    if code is not None:
+        return False, f"HTTP {code}: {msg}"
+    name = type(exc).__name__
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)) or name in ("APITimeoutError", "APIConnectionError"):
+        return True, f"{name}: {msg}"
+    return False, f"{name}: {msg}"
+
+
+class _LostRace(Exception):
+    """A hedged streaming attempt that produced tokens after another attempt had claimed the output."""
+
+
+class _Race:
+    """Shared state for one hedged call: the first attempt to stream a token owns the output."""
+
+    def __init__(self, on_token=None):
+        self.on_token = on_token
+        self.owner = None
+        self.first_token = asyncio.Event()
+        self.forwarded = False
+
+
+class PitchService:
+    """Rate-limit-aware async chat-completions client for pitch generation.
+
+    Every call passes through a requests-per-minute and a tokens-per-minute bucket,
+    is retried with exponential backoff on 429/5xx/timeouts, is bounded by a per-call
+    deadline, and gets a hedged duplicate request when the first attempt is slow.
+    Sync callers use submit()/generate(), which run on a private event loop thread.
+    """
+
+    def __init__(self, client, model="gpt-4.1-mini", rpm=500, tpm=200_000, max_in_flight=16,
+                 max_retries=4, deadline=60.0, hedge_after=8.0, backoff_base=0.5, backoff_cap=20.0,
+                 max_tokens=400):
+        self.client = client
+        self.model = model
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_tokens = max_tokens
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+
+        self._requests = None
+        self._tokens = None
+        self._slots = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+                       "failures": 0, "throttled_seconds": 0.0}
+
+    # ---------- Stats ----------
+    def _bump(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def estimate_tokens(text):
+        return max(1, len(text) // 4)
+
+    # ---------- Core ----------
+    def _init_limits(self):
+        if self._slots is None:
+            self._requests = TokenBucket(self.rpm)
+            self._tokens = TokenBucket(self.tpm)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+    async def _request(self, kwargs, est_tokens, started, race):
+        """One HTTP request, after taking its share of both rate-limit buckets and an in-flight slot."""
+        waited = await self._requests.acquire(1)
+        waited += await self._tokens.acquire(est_tokens)
+        if waited:
+            self._bump("throttled_seconds", waited)
+        async with self._slots:
+            self._bump("requests")
+            started.set()
+            resp = await self.client.chat.completions.create(**kwargs)
+            if kwargs.get("stream"):
+                return await self._consume_stream(resp, race)
+        return (resp.choices[0].message.content or "").strip()
+
+    async def _consume_stream(self, stream, race):
+        """Collect a streamed completion; only the attempt that produced the first token forwards it."""
+        me, parts = object(), []
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if not delta:
+                    continue
+                if race.owner is None:
+                    race.owner = me
+                    race.first_token.set()
+                if race.owner is not me:
+                    raise _LostRace()
+                parts.append(delta)
+                if race.on_token:
+                    race.forwarded = True
+                    race.on_token(delta)
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                try:
+                    await close()
+                except Exception:
+                    pass
+        return "".join(parts).strip()
+
+    async def _hedged(self, kwargs, est_tokens, race):
+        """Race a duplicate request against the first one if it hasn't answered within hedge_after.
+
+        The hedge clock starts once the primary is actually in flight, so time spent
+        queued behind the rate limiter never triggers a duplicate. When streaming, a
+        primary that has already produced its first token is never hedged.
+        """
+        started = asyncio.Event()
+        primary = asyncio.ensure_future(self._request(kwargs, est_tokens, started, race))
+        pending = {primary}
+        error = None
+        try:
+            if self.hedge_after:
+                waiter = asyncio.ensure_future(started.wait())
+                await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                watch = {primary}
+                if kwargs.get("stream"):
+                    token_waiter = asyncio.ensure_future(race.first_token.wait())
+                    watch.add(token_waiter)
+                done, _ = await asyncio.wait(watch, timeout=self.hedge_after, return_when=asyncio.FIRST_COMPLETED)
+                if kwargs.get("stream"):
+                    token_waiter.cancel()
+                if not done:
+                    self._bump("hedges")
+                    pending.add(asyncio.ensure_future(self._request(kwargs, est_tokens, asyncio.Event(), race)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._bump("hedge_wins")
+                        return task.result()
+                    if not isinstance(task.exception(), _LostRace):
+                        error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _with_retries(self, kwargs, est_tokens, on_token=None, on_reset=None):
+        attempt = 0
+        while True:
+            race = _Race(on_token)
+            try:
+                text = await self._hedged(kwargs, est_tokens, race)
+                if not text:
+                    raise PitchError("Empty completion")
+                return text
+            except PitchError:
+                raise
+            except Exception as e:
+                retryable, msg = classify_error(e)
+                if not retryable or attempt >= self.max_retries:
+                    raise PitchError(msg, permanent=not retryable) from e
+                delay = _retry_after(e) or min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+                delay *= 0.8 + random.random() * 0.4
+                attempt += 1
+                self._bump("retries")
+                logger.warning(f"[pitch] {msg} — retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                if race.forwarded and on_reset:
+                    on_reset()
+                await asyncio.sleep(delay)
+
+    async def agenerate(self, prompt, temperature=0.6, on_token=None, on_reset=None, **extra):
+        """Generate a completion for `prompt`; raises PitchError instead of returning error text.
+
+        With on_token the completion is streamed and each text delta is passed to it as it
+        arrives; on_reset is called if a partially streamed attempt fails and is retried.
+        """
+        self._init_limits()
+        self._bump("calls")
+        kwargs = dict(model=self.model, messages=[{"role": "user", "content": prompt}],
+                      temperature=temperature, max_tokens=self.max_tokens, **extra)
+        if on_token:
+            kwargs["stream"] = True
+        est_tokens = self.estimate_tokens(prompt) + self.max_tokens
+        try:
+            return await asyncio.wait_for(self._with_retries(kwargs, est_tokens, on_token, on_reset),
+                                          timeout=self.deadline)
+        except asyncio.TimeoutError as e:
+            self._bump("failures")
+            raise PitchError(f"Deadline of {self.deadline:.0f}s exceeded") from e
+        except PitchError:
+            self._bump("failures")
+            raise
+
+    # ---------- Sync bridge ----------
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="pitch-service", daemon=True).start()
+        return self._loop
+
+    def run(self, coro):
+        """Schedule any coroutine on the service loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def submit(self, prompt, **kwargs):
+        return self.run(self.agenerate(prompt, **kwargs))
+
+    def submit_many(self, prompts, **kwargs):
+        """Batched dispatch: all prompts are queued at once and paced by the rate-limit buckets."""
+        return [self.submit(p, **kwargs) for p in prompts]
+
+    def generate(self, prompt, **kwargs):
+        return self.submit(prompt, **kwargs).result()
@@ -0,0 +1,74 @@
+"""Startup preflight: resolve Chrome + chromedriver and time the first driver.
+
+    python -m formbot.preflight            # uses/refreshes ~/.formbot/chromedriver.json
+    python -m formbot.preflight --offline  # never touch the network (air-gapped workers)
+    python -m formbot.preflight --refresh  # ignore the manifest and resolve again
+
+Run it once on deploy so later launches only read the manifest.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from formbot.chromedriver import get_resolution, offline_mode
+
+logger = logging.getLogger("formbot")
+
+
+def preflight(offline=False, refresh=False, headless=True, launch=True):
+    """{resolve_s, launch_s, time_to_first_driver_s, source, chrome_version, driver_path}; raises on failure."""
+    if offline:
+        os.environ["FORMBOT_OFFLINE"] = "1"
+    resolution = get_resolution()
+    started = time.perf_counter()
+    # offline=False must not override FORMBOT_OFFLINE=1; None lets the resolver read the environment
+    entry = resolution.resolve(refresh=refresh, offline=offline or None)
+    report = {"resolve_s": round(time.perf_counter() - started, 3), "source": resolution.source,
+              "chrome_binary": entry.get("chrome_binary"), "chrome_version": entry.get("chrome_version"),
+              "driver_path": entry["driver_path"], "offline": bool(offline) or offline_mode()}
+    if launch:
+        from formbot.driver_manager import DriverManager
+        launched = time.perf_counter()
+        driver = DriverManager.get_driver(headless=headless, tabs=False)
+        try:
+            driver.get("about:blank")
+            report["browser_version"] = driver.capabilities.get("browserVersion")
+        finally:
+            report["launch_s"] = round(time.perf_counter() - launched, 3)
+            DriverManager.cleanup(driver)
+        report["time_to_first_driver_s"] = round(report["resolve_s"] + report["launch_s"], 3)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve chromedriver and report time-to-first-driver")
+    parser.add_argument("--offline", action="store_true", help="never download a driver")
+    parser.add_argument("--refresh", action="store_true", help="ignore the cached manifest")
+    parser.add_argument("--no-launch", action="store_true", help="only resolve, do not start Chrome")
+    parser.add_argument("--headful", action="store_true", help="start a visible Chrome")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    try:
+        report = preflight(offline=args.offline, refresh=args.refresh, headless=not args.headful,
+                           launch=not args.no_launch)
+    except Exception as e:
+        print(f"❌ Preflight failed: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"✅ chromedriver {report['driver_path']} (Chrome {report['chrome_version']}, via {report['source']})")
+        print(f"   resolve           {report['resolve_s']:.3f}s")
+        if "launch_s" in report:
+            print(f"   launch            {report['launch_s']:.3f}s")
+            print(f"   first driver      {report['time_to_first_driver_s']:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
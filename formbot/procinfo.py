@@ -0,0 +1,127 @@
+import os
+import signal
+
+try:
+    import psutil
+except ImportError:  # optional; /proc is enough on Linux
+    psutil = None
+
+
+def _proc_children():
+    """ppid → [pid] from /proc (Linux fallback when psutil is missing)."""
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as fh:
+                stat = fh.read()
+            # comm may contain spaces/parens; fields resume after the last ')'
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def _proc_rss(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def descendants(pid):
+    """All descendant pids of pid (not including pid)."""
+    if psutil is not None:
+        try:
+            return [p.pid for p in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+    if not os.path.isdir("/proc"):
+        return []
+    tree, out, stack = _proc_children(), [], [pid]
+    while stack:
+        for child in tree.get(stack.pop(), []):
+            out.append(child)
+            stack.append(child)
+    return out
+
+
+def rss_bytes(pid):
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return 0
+    return _proc_rss(pid)
+
+
+def tree_rss(pid, include_self=True):
+    """Resident memory of a process and all its descendants, in bytes (0 if unavailable)."""
+    pids = descendants(pid) + ([pid] if include_self else [])
+    return sum(rss_bytes(p) for p in pids)
+
+
+def driver_pid(driver):
+    """chromedriver's pid; Chrome and its renderers are its descendants."""
+    try:
+        return driver.service.process.pid
+    except Exception:
+        return None
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cpu_seconds(pid):
+    """user+system CPU time consumed by pid so far."""
+    if psutil is not None:
+        try:
+            t = psutil.Process(pid).cpu_times()
+            return t.user + t.system
+        except psutil.Error:
+            return 0.0
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            fields = fh.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def tree_cpu_seconds(pid):
+    return sum(cpu_seconds(p) for p in descendants(pid) + [pid])
+
+
+def cmdline(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as fh:
+            return fh.read().replace(b"\0", b" ").decode("utf-8", "replace")
+    except OSError:
+        return ""
+
+
+def all_pids():
+    if psutil is not None:
+        return psutil.pids()
+    return [int(n) for n in os.listdir("/proc") if n.isdigit()] if os.path.isdir("/proc") else []
+
+
+def kill_tree(pid, sig=signal.SIGKILL):
+    """Kill pid and every descendant (children first collected, so reparenting can't hide them)."""
+    victims = descendants(pid) + [pid]
+    for p in victims:
+        try:
+            os.kill(p, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+    return victims
@@ -0,0 +1,212 @@
+import heapq
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+from formbot.domains import normalize_url
+from formbot.state import atomic_write, state_path
+
+logger = logging.getLogger("formbot")
+
+SUCCESS = "success"
+TRANSIENT = "transient"    # retry on a fresh browser
+PERMANENT = "permanent"    # remembered, never retried
+UNKNOWN = "unknown"        # reported as is (e.g. submitted without confirmation: retrying could double-send)
+
+# Exception class names (anywhere in the MRO) that say nothing about the site itself
+TRANSIENT_ERRORS = {
+    "TimeoutException", "StaleElementReferenceException", "InvalidSessionIdException",
+    "NoSuchWindowException", "SessionNotCreatedException",
+    # chromedriver/Chrome gone mid-session
+    "MaxRetryError", "ProtocolError", "NewConnectionError", "RemoteDisconnected", "ConnectionError",
+    "ConnectionResetError", "ConnectionRefusedError", "TimeoutError",
+}
+TRANSIENT_MESSAGES = (
+    "chrome not reachable", "disconnected", "session deleted", "tab crashed", "target window already closed",
+    "timed out receiving message from renderer", "net::err_connection_reset", "net::err_connection_closed",
+    "net::err_timed_out", "net::err_network_changed", "net::err_empty_response",
+)
+PERMANENT_MESSAGES = ("net::err_name_not_resolved", "net::err_cert_", "net::err_ssl_")
+PERMANENT_STATUSES = {"captcha/anti-bot detected": "captcha", "no contact form found": "no_form"}
+
+# The session itself is gone: the next attempt needs another Chrome, not just another tab
+BROWSER_LOST_ERRORS = {"InvalidSessionIdException", "MaxRetryError", "ProtocolError", "NewConnectionError",
+                       "RemoteDisconnected", "ConnectionRefusedError"}
+BROWSER_LOST_MESSAGES = ("chrome not reachable", "session deleted", "tab crashed", "disconnected")
+
+
+def browser_lost(error):
+    names = {cls.__name__ for cls in type(error).__mro__}
+    return bool(names & BROWSER_LOST_ERRORS) or any(m in str(error).lower() for m in BROWSER_LOST_MESSAGES)
+
+
+def classify(status, error=None, submitted=False):
+    """(verdict, reason) for one FormFlow attempt from its status string and the exception it hit."""
+    text = str(status or "")
+    if "[✓]" in text and "no contact form found" not in text.lower():
+        return SUCCESS, ""
+    lowered = text.lower()
+    for marker, reason in PERMANENT_STATUSES.items():
+        if marker in lowered:
+            return PERMANENT, reason
+    if error is None:
+        return UNKNOWN, "unconfirmed" if submitted else ""
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if "PitchError" in names:
+        # our side of the LLM API (quota, key, outage), not the site's: never remembered, and a
+        # retry would reuse the same failed pitch
+        return UNKNOWN, "not_pitched"
+    message = str(error).lower()
+    if any(m in message for m in PERMANENT_MESSAGES):
+        return PERMANENT, "unreachable"
+    if submitted:
+        return UNKNOWN, "after_submit"  # the form may already have gone out
+    if names & TRANSIENT_ERRORS or any(m in message for m in TRANSIENT_MESSAGES):
+        return TRANSIENT, type(error).__name__
+    return UNKNOWN, type(error).__name__
+
+
+class VerdictMemory:
+    """Permanent verdicts per URL (persisted as JSON), so a captcha or formless site is not
+    reopened in every batch. Entries expire after ttl seconds; a later success clears them."""
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path
+        self.ttl = ttl if ttl is not None else float(os.getenv("FORMBOT_VERDICT_TTL_DAYS", "14") or 14) * 86400
+        self._lock = threading.Lock()
+        self._data = {}
+        if path:
+            try:
+                with open(path) as fh:
+                    self._data = json.load(fh)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"[retry] Ignoring unreadable verdict memory {path}: {e}")
+
+    @staticmethod
+    def _key(url):
+        return normalize_url(url).rstrip("/").lower()
+
+    def _save(self):
+        with self._lock:
+            payload = json.dumps(self._data, indent=1, sort_keys=True).encode()
+        if self.path:
+            try:
+                atomic_write(self.path, payload)
+            except Exception as e:
+                logger.debug(f"[retry] Could not save verdict memory: {e}")
+
+    def get(self, url):
+        """The remembered {verdict, reason, status, at} for url, or None."""
+        with self._lock:
+            entry = self._data.get(self._key(url))
+        if entry and time.time() - entry["at"] > self.ttl:
+            self.forget(url)
+            return None
+        return entry
+
+    def record(self, url, verdict, reason, status):
+        if verdict == PERMANENT:
+            with self._lock:
+                self._data[self._key(url)] = {"verdict": verdict, "reason": reason, "status": str(status),
+                                              "at": int(time.time())}
+            self._save()
+        elif verdict == SUCCESS:
+            self.forget(url)
+
+    def forget(self, url):
+        with self._lock:
+            found = self._data.pop(self._key(url), None)
+        if found:
+            self._save()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RetryScheduler:
+    """Orders one batch's browser attempts. Iterating yields (url, attempt); a URL handed back
+    through retry() is queued again after an exponential backoff with jitter, while the other
+    URLs keep going, up to max_attempts per URL."""
+
+    def __init__(self, urls, max_attempts=None, base_delay=None, max_delay=None, cancelled=None):
+        self.max_attempts = max_attempts or max(1, int(os.getenv("FORMBOT_MAX_ATTEMPTS", "3") or 3))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("FORMBOT_RETRY_DELAY", "2") or 2)
+        self.max_delay = max_delay if max_delay is not None else 60.0
+        self.cancelled = cancelled
+        self.attempts = {}
+        self.reasons = {}
+        self.final = {}
+        self._fresh = list(urls)
+        self._delayed = []  # heap of (due, seq, url)
+        self._seq = 0
+
+    def __iter__(self):
+        while True:
+            if self.cancelled is not None and self.cancelled.is_set():
+                return
+            if self._delayed and (not self._fresh or self._delayed[0][0] <= time.monotonic()):
+                due, _seq, url = heapq.heappop(self._delayed)
+                wait = due - time.monotonic()
+                if wait > 0:
+                    # nothing else to run: sleep until the retry is due (wakes early on cancel)
+                    if self.cancelled is not None:
+                        if self.cancelled.wait(wait):
+                            return
+                    else:
+                        time.sleep(wait)
+            elif self._fresh:
+                url = self._fresh.pop(0)
+            else:
+                return
+            self.attempts[url] = self.attempts.get(url, 0) + 1
+            yield url, self.attempts[url]
+
+    def backoff(self, attempt):
+        return min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    def retry(self, url, verdict, reason):
+        """Queue url again if verdict is transient and it has attempts left; returns the delay or None."""
+        if verdict != TRANSIENT or self.attempts.get(url, 0) >= self.max_attempts:
+            return None
+        delay = self.backoff(self.attempts[url])
+        self.reasons.setdefault(url, []).append(reason)
+        self._seq += 1
+        heapq.heappush(self._delayed, (time.monotonic() + delay, self._seq, url))
+        logger.info(f"🔁 Retrying {url} in {delay:.1f}s after {reason} "
+                    f"(attempt {self.attempts[url]}/{self.max_attempts})")
+        return delay
+
+    def done(self, url, verdict):
+        self.final[url] = verdict
+
+    def stats(self):
+        retried = [u for u in self.final if self.attempts.get(u, 1) > 1]
+        by_reason = {}
+        for reasons in self.reasons.values():
+            for reason in reasons:
+                by_reason[reason] = by_reason.get(reason, 0) + 1
+        return {
+            "max_attempts": self.max_attempts,
+            "retried_urls": len(retried),
+            "retries": sum(self.attempts[u] - 1 for u in self.attempts),
+            "recovered": sum(self.final[u] == SUCCESS for u in retried),
+            "exhausted": sum(self.final[u] == TRANSIENT for u in retried),
+            "by_reason": by_reason,
+        }
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_verdict_memory():
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = VerdictMemory(state_path("flow_verdicts.json"))
+        return _memory
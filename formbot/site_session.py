@@ -0,0 +1,121 @@
+import logging
+import os
+
+from formbot.domains import group_by_domain, hostname, registrable_domain
+from formbot.driver_manager import DriverManager
+from formbot.supervisor import get_supervisor
+
+logger = logging.getLogger("formbot")
+
+
+def domain_sessions_enabled():
+    """FORMBOT_DOMAIN_SESSIONS=0 gives every /fill URL its own browser again."""
+    return os.getenv("FORMBOT_DOMAIN_SESSIONS", "1").lower() not in ("0", "false", "no")
+
+
+def site_key(url):
+    """Registrable domain whose URLs share a session; IP and localhost URLs (dev servers, the
+    bench fixtures) each get their own, as different sites often live on one such host."""
+    host = hostname(url)
+    if host == "localhost" or host.replace(".", "").isdigit() or ":" in host:
+        return url
+    return registrable_domain(url)
+
+
+class SiteSession:
+    """One warm browser shared by consecutive FormFlow runs on one registrable domain. The driver
+    (and with it the site's cookies: consent choices, dismissed chat widgets) and the admission
+    lease stay open between URLs, and the contact page found for the first URL is reused by the
+    next ones, so they skip the homepage load, overlay pass and ContactPageFinder."""
+
+    def __init__(self, domain, contact_url=None):
+        self.domain = domain
+        self.driver = None
+        self.lease = None
+        self.contact_url = contact_url
+        self.runs = 0
+        self.warm_runs = 0
+        self.contact_reuses = 0
+
+    def _reusable(self):
+        tab = getattr(self.driver, "_tab", None)
+        if tab is not None:
+            return not tab.closed and not tab.host.draining
+        return not get_supervisor().should_recycle(self.driver)
+
+    def take_driver(self):
+        """The warm driver if it can serve one more URL, else None (launch a new one and keep() it)."""
+        self.runs += 1
+        if self.driver is None:
+            return None
+        if not self._reusable():
+            logger.debug(f"[site_session] {self.domain}: browser due for recycling, relaunching")
+            self.discard()
+            return None
+        tab = getattr(self.driver, "_tab", None)
+        get_supervisor().job(tab.host.driver if tab is not None else self.driver)
+        self.warm_runs += 1
+        return self.driver
+
+    def keep(self, driver):
+        self.driver = driver
+
+    def discard(self):
+        """Drop the browser (crashed, recycled or the group is over); the lease stays."""
+        driver, self.driver = self.driver, None
+        if driver is not None:
+            try:
+                DriverManager.cleanup(driver)
+            except Exception as e:
+                logger.debug(f"[site_session] Cleanup failed for {self.domain}: {e}")
+
+    def close(self):
+        self.discard()
+        if self.lease is not None:
+            self.lease.release()
+            self.lease = None
+
+
+class SiteSessions:
+    """The SiteSession of the domain a batch is working on; moving to another domain closes the
+    previous one. Contact pages stay known for the whole batch, so a URL retried after its
+    group is over still skips discovery (on a fresh browser)."""
+
+    def __init__(self):
+        self.current = None
+        self.contacts = {}
+        self.sessions = 0
+        self.runs = 0
+        self.warm_runs = 0
+        self.contact_reuses = 0
+
+    @staticmethod
+    def order(urls):
+        """urls with each site's URLs next to each other (sites in first-seen order)."""
+        return [url for group in group_by_domain(urls, key=site_key).values() for url in group]
+
+    def for_url(self, url):
+        domain = site_key(url)
+        if self.current is not None and self.current.domain != domain:
+            self._finish()
+        if self.current is None:
+            self.current = SiteSession(domain, self.contacts.get(domain))
+            self.sessions += 1
+        return self.current
+
+    def _finish(self):
+        session, self.current = self.current, None
+        if session.contact_url:
+            self.contacts[session.domain] = session.contact_url
+        self.runs += session.runs
+        self.warm_runs += session.warm_runs
+        self.contact_reuses += session.contact_reuses
+        session.close()
+
+    def close(self):
+        if self.current is not None:
+            self._finish()
+
+    def stats(self):
+        return {"sessions": self.sessions, "browser_runs": self.runs, "warm_runs": self.warm_runs,
+                "contact_reuses": self.contact_reuses, "domains_with_contact": len(self.contacts)}
@@ -0,0 +1,168 @@
+import logging
+
+from formbot.page_lib import get_page_lib, page_call
+
+logger = logging.getLogger("formbot")
+
+FORM_CONTAINERS = ("form, #contact-form, .wpcf7-form, .elementor-form, .wpforms-form, "
+                   ".nf-form-layout, form.hs-form, .gform_wrapper, .hbspt-form form")
+
+# One call per browsing context: the document, every open shadow root in it and every
+# same-origin iframe below it (up to maxDepth), with visible text, form summaries and the
+# visible text of elements matching `selectors`. Text is read once per document (body.innerText)
+# and from text nodes inside shadow roots, never innerText per node. Cross-origin iframes can't
+# be read from here; they come back as `opaque` with the iframe element (or the element of the
+# same-origin iframe that contains them) for Python to switch into.
+SNAPSHOT_SCRIPT = r"""
+const [maxDepth, selectors, containers, maxText] = arguments;
+const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+const TEXTY = ['text', 'email', 'tel', 'number', 'search', ''];
+const clean = s => (s || '').replace(/\s+/g, ' ').trim().toLowerCase();
+const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+const frames = [], opaque = [];
+
+function shadowRoots(doc) {
+  const out = [], stack = [doc];
+  while (stack.length) {
+    const root = stack.pop();
+    for (const el of root.querySelectorAll('*')) {
+      if (el.shadowRoot) { out.push(el.shadowRoot); stack.push(el.shadowRoot); }
+    }
+  }
+  return out;
+}
+function nodeText(root) {
+  const parts = [], walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+  let n;
+  while ((n = walker.nextNode())) {
+    const p = n.parentElement;
+    if (p && !SKIP.has(p.tagName)) parts.push(n.nodeValue);
+  }
+  return clean(parts.join(' '));
+}
+function summarize(form, inShadow) {
+  const inputs = [...form.querySelectorAll('input')];
+  const cls = form.getAttribute('class') || '';
+  return {
+    tag: form.tagName.toLowerCase(), id: form.id || '', cls: cls, action: form.getAttribute('action') || '',
+    inputs: inputs.length, textareas: form.querySelectorAll('textarea').length,
+    text_inputs: inputs.filter(i => TEXTY.includes((i.getAttribute('type') || '').toLowerCase()) && visible(i)).length,
+    text: clean(form.innerText || form.textContent).slice(0, 500), shadow: inShadow, hubspot: cls.includes('hbspt-form'),
+  };
+}
+function walk(doc, depth, path, via) {
+  const roots = [doc].concat(shadowRoots(doc));
+  const seen = new Set(), forms = [], matches = [], iframes = [];
+  roots.forEach((root, i) => {
+    for (const f of root.querySelectorAll(containers)) {
+      if (!seen.has(f)) { seen.add(f); forms.push(summarize(f, i > 0)); }
+    }
+    for (const sel of selectors) {
+      for (const el of root.querySelectorAll(sel)) {
+        if (visible(el)) matches.push({selector: sel, text: clean(el.innerText).slice(0, 300)});
+      }
+    }
+    iframes.push(...root.querySelectorAll('iframe'));
+  });
+  let loc = '';
+  try { loc = doc.location ? doc.location.href : ''; } catch (e) {}
+  frames.push({
+    path: path, depth: depth, url: loc,
+    text: clean(doc.body ? doc.body.innerText : '').slice(0, maxText),
+    shadow_text: roots.slice(1).map(nodeText).join(' ').slice(0, maxText),
+    forms: forms, matches: matches, hubspot_shell: !!doc.querySelector('.hbspt-form'),
+    iframes: iframes.length,
+  });
+  iframes.forEach((fr, i) => {
+    let child = null;
+    try { child = fr.contentDocument; } catch (e) {}
+    if (depth >= maxDepth) return;
+    if (child && child.documentElement) {
+      walk(child, depth + 1, path.concat([i]), via || fr);
+    } else {
+      opaque.push({path: path.concat([i]), element: via ? null : fr, via: via});
+    }
+  });
+}
+walk(document, 0, [], null);
+return {frames: frames, opaque: opaque};
+"""
+get_page_lib().register("snapshot", SNAPSHOT_SCRIPT)
+
+
+class PageSnapshot:
+    """Every frame of a page as plain dicts: path (iframe indices from the top), depth, url,
+    text, shadow_text, forms, matches, hubspot_shell."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    @property
+    def main(self):
+        return self.frames[0] if self.frames else {"url": "", "text": "", "shadow_text": "", "forms": [],
+                                                   "matches": [], "hubspot_shell": False, "depth": 0}
+
+    @property
+    def iframes(self):
+        return [f for f in self.frames if f["depth"] > 0]
+
+    def forms(self):
+        """(frame, form summary) for every form in every frame and shadow root."""
+        return [(frame, form) for frame in self.frames for form in frame["forms"]]
+
+    def find_text(self, texts, frames=None, shadow=False):
+        """First (frame, text) whose visible (or shadow-root) text contains one of texts."""
+        for frame in self.frames if frames is None else frames:
+            haystack = frame["shadow_text"] if shadow else frame["text"]
+            for t in texts:
+                if t in haystack:
+                    return frame, t
+        return None
+
+
+def _walk(driver, path, depth, max_depth, selectors, max_text, out, opaque_only=False):
+    """Snapshot the current browsing context into out, then switch into its cross-origin frames."""
+    try:
+        data = page_call(driver, "snapshot", max_depth - depth, list(selectors), FORM_CONTAINERS, max_text)
+    except Exception as e:
+        logger.debug(f"[snapshot] Walker failed at frame {path}: {e}")
+        return
+    if not opaque_only:
+        for frame in data["frames"]:
+            frame["path"] = path + frame["path"]
+            frame["depth"] += depth
+            out.append(frame)
+
+    # one switch per context: frames directly in this document, or the same-origin iframe
+    # whose subtree holds the cross-origin ones (re-walked for those only)
+    targets, vias = [], {}
+    for entry in data["opaque"]:
+        if entry.get("element") is not None:
+            targets.append((path + entry["path"], entry["element"], False))
+        elif entry.get("via") is not None:
+            vias.setdefault(entry["path"][0], entry["via"])
+    targets += [(path + [idx], element, True) for idx, element in vias.items()]
+
+    for frame_path, element, only_opaque in targets:
+        try:
+            driver.switch_to.frame(element)
+        except Exception as e:
+            logger.debug(f"[snapshot] Could not enter frame {frame_path}: {e}")
+            continue
+        try:
+            _walk(driver, frame_path, depth + 1, max_depth, selectors, max_text, out, only_opaque)
+        finally:
+            try:
+                driver.switch_to.parent_frame()
+            except Exception as e:
+                logger.debug(f"[snapshot] Lost frame position at {frame_path}: {e}")
+                driver.switch_to.default_content()
+                return
+
+
+def take_snapshot(driver, max_depth=3, selectors=(), max_text=20000):
+    """PageSnapshot of the current page: one script call, plus one switch/script/parent round trip
+    per cross-origin iframe. Call from the top-level context; it is restored afterwards."""
+    frames = []
+    _walk(driver, [], 0, max_depth, selectors, max_text, frames)
+    return PageSnapshot(frames)
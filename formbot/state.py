@@ -0,0 +1,31 @@
+import os
+import tempfile
+from pathlib import Path
+
+
+def state_dir():
+    """Directory for formbot's small on-disk stores (FORMBOT_STATE_DIR, default ~/.formbot)."""
+    path = Path(os.getenv("FORMBOT_STATE_DIR") or Path.home() / ".formbot")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def state_path(name):
+    return state_dir() / name
+
+
+def atomic_write(path, data):
+    """Write bytes to path via a temp file + rename so readers never see a partial file.
+    The temp file is unique per call, so threads saving the same store never share it."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
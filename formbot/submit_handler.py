@@ -4,16 +4,28 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 import time
+from formbot.form_signatures import POS_ATTR
 
 
 class SubmitHandler:
     def __init__(self, driver, timeout=12):
         self.driver = driver
         self.timeout = timeout
+        self.clicked_pos = None  # position of the clicked control in the signed form, if any
 
     # ---------- Helpers ----------
     def safe_click(self, el):
         """Try multiple click methods safely"""
+        try:
+            pos = el.get_attribute(POS_ATTR)
+        except Exception:
+            pos = None
+        if not self._click(el):
+            return False
+        self.clicked_pos = pos  # only a control that was actually clicked may be remembered
+        return True
+
+    def _click(self, el):
         try:
             WebDriverWait(self.driver, self.timeout).until(EC.element_to_be_clickable(el))
             el.click()
@@ -156,11 +168,8 @@ class SubmitHandler:
             return False
 
     # ---------- Runner ----------
-    def run(self):
-        """Try all known strategies to click a submit button"""
-        self.wait_for_any_button()  # helps on late-loading UIs
-
-        strategies = [
+    def _strategies(self):
+        return [
             self.try_wp_cf7,
             self.try_elementor,
             self.try_wp_other_forms,
@@ -170,7 +179,16 @@ class SubmitHandler:
             self.press_enter_fallback,
         ]
 
-        for strategy in strategies:
+    def advance(self):
+        """Click the first next/submit control found, without waiting for a confirmation."""
+        return any(strategy() for strategy in self._strategies())
+
+    def run(self):
+        """Try all known strategies to click a submit button"""
+        self.clicked_pos = None  # a failed earlier click (e.g. a replayed plan's button) doesn't count
+        self.wait_for_any_button()  # helps on late-loading UIs
+
+        for strategy in self._strategies():
             if strategy():
                 # wait for success confirmation if possible
                 if self.wait_for_confirmation():
@@ -1,5 +1,5 @@
-from selenium.webdriver.common.by import By
 import logging, time
+from formbot.snapshot import take_snapshot
 
 logger = logging.getLogger("formbot")
 
@@ -35,55 +35,21 @@ class SuccessChecker:
         self.had_form = had_form
         self.before_html = before_html.lower() if before_html else ""
 
-    def _check_iframes_recursive(self, context=None, depth=0, max_depth=3):
-        """Recursively check all iframes (HubSpot, Elementor, etc.)"""
-        try:
-            if depth > max_depth:
-                return False
-            frames = (context or self.driver).find_elements(By.TAG_NAME, "iframe")
-            for idx, fr in enumerate(frames):
-                try:
-                    self.driver.switch_to.frame(fr)
-                    html = self.driver.page_source.lower()
-                    if any(t in html for t in self.SUCCESS_TEXTS):
-                        logger.debug(f"[SuccessChecker] ✅ Success text found in iframe #{idx} depth={depth}")
-                        self.driver.switch_to.default_content()
-                        return True
-                    # Recurse deeper (nested iframes)
-                    if self._check_iframes_recursive(self.driver, depth + 1):
-                        self.driver.switch_to.default_content()
-                        return True
-                    self.driver.switch_to.default_content()
-                except Exception as e:
-                    self.driver.switch_to.default_content()
-                    logger.debug(f"[SuccessChecker] ⚠️ Failed iframe #{idx} depth={depth}: {e}")
-        except Exception as e:
-            logger.debug(f"[SuccessChecker] ⚠️ Iframe enumeration error: {e}")
+    def _snapshot(self):
+        """Every frame and shadow root in one call (formbot/snapshot.py)."""
+        return take_snapshot(self.driver, max_depth=3, selectors=self.SUCCESS_SELECTORS)
+
+    def _check_containers(self, snapshot):
+        """CSS-based success containers in any frame or shadow root."""
+        for frame in snapshot.frames:
+            for match in frame["matches"]:
+                txt = match["text"]
+                if any(k in txt for k in self.SUCCESS_TEXTS) or len(txt) > 5:
+                    logger.debug(f"[SuccessChecker] ✅ Found success element {match['selector']} "
+                                 f"in frame {frame['path']}: '{txt[:60]}'")
+                    return True
         return False
 
-    def _check_shadow_dom(self):
-        """Scan shadow roots (Elementor/HubSpot often use this)."""
-        try:
-            script = """
-            const texts = arguments[0];
-            function deepSearch(node) {
-                if (!node) return false;
-                if (node.shadowRoot) {
-                    if (deepSearch(node.shadowRoot)) return true;
-                }
-                for (const child of node.children || []) {
-                    const txt = (child.innerText || '').toLowerCase();
-                    if (texts.some(t => txt.includes(t))) return true;
-                    if (deepSearch(child)) return true;
-                }
-                return false;
-            }
-            return deepSearch(document.body);
-            """
-            return self.driver.execute_script(script, self.SUCCESS_TEXTS)
-        except Exception:
-            return False
-
     def run(self, max_wait=15):
         if not self.had_form:
             logger.debug("[SuccessChecker] No form detected, skipping success check")
@@ -92,38 +58,34 @@ class SuccessChecker:
         end = time.time() + max_wait
         while time.time() < end:
             try:
-                page = self.driver.page_source.lower()
+                snapshot = self._snapshot()
+                if not snapshot.frames:
+                    time.sleep(0.8)  # mid-navigation (e.g. a redirect after submit)
+                    continue
 
                 # 1️⃣ Direct text
                 for t in self.SUCCESS_TEXTS:
-                    if t in page and t not in self.before_html:
+                    if t in snapshot.main["text"] and t not in self.before_html:
                         logger.debug(f"[SuccessChecker] ✅ Found success text: '{t}'")
                         return True
 
                 # 2️⃣ CSS-based containers
-                for sel in self.SUCCESS_SELECTORS:
-                    try:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, sel)
-                        for el in elements:
-                            if el.is_displayed():
-                                txt = (el.text or "").lower()
-                                if any(k in txt for k in self.SUCCESS_TEXTS) or len(txt) > 5:
-                                    logger.debug(f"[SuccessChecker] ✅ Found success element {sel}: '{txt[:60]}'")
-                                    return True
-                    except Exception:
-                        continue
+                if self._check_containers(snapshot):
+                    return True
 
                 # 3️⃣ Nested iframes
-                if self._check_iframes_recursive():
+                found = snapshot.find_text(self.SUCCESS_TEXTS, frames=snapshot.iframes)
+                if found:
+                    logger.debug(f"[SuccessChecker] ✅ Success text '{found[1]}' in iframe {found[0]['path']}")
                     return True
 
                 # 4️⃣ Shadow DOM
-                if self._check_shadow_dom():
+                if snapshot.find_text(self.SUCCESS_TEXTS, shadow=True):
                     logger.debug("[SuccessChecker] ✅ Found success inside shadow DOM")
                     return True
 
                 # 5️⃣ URL redirect
-                cur = self.driver.current_url.lower()
+                cur = snapshot.main["url"].lower()
                 if cur != self.initial_url.lower() and any(
                     k in cur for k in ["thank", "success", "submitted", "complete", "confirmation"]
                 ):
@@ -0,0 +1,251 @@
+import atexit
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from formbot.procinfo import (all_pids, cmdline, descendants, driver_pid, kill_tree, pid_alive,
+                              tree_cpu_seconds, tree_rss)
+
+logger = logging.getLogger("formbot")
+
+# Added to every Chrome we launch so orphans can be found even after chromedriver is gone
+OWNER_FLAG = "--formbot-owner="
+PROFILE_PREFIX = "chrome_profile_"
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return float(default)
+
+
+class _Tracked:
+    __slots__ = ("driver", "pid", "profile", "launched", "jobs", "rss", "cpu_pct", "_cpu", "_cpu_at",
+                 "recycle_reason")
+
+    def __init__(self, driver, pid, profile):
+        self.driver = driver
+        self.pid = pid
+        self.profile = profile
+        self.launched = time.time()
+        self.jobs = 0
+        self.rss = 0
+        self.cpu_pct = 0.0
+        self._cpu = None
+        self._cpu_at = None
+        self.recycle_reason = None
+
+
+class BrowserSupervisor:
+    """Tracks every Chrome/chromedriver tree we start: RSS and CPU per driver, recycling
+    past a memory or job budget, orphan reaping and immediate temp-profile cleanup."""
+
+    def __init__(self, max_rss_mb=None, kill_rss_mb=None, max_jobs=None, interval=None):
+        self.max_rss = (max_rss_mb if max_rss_mb is not None else
+                        _env_float("FORMBOT_MAX_BROWSER_RSS_MB", "1200")) * 2 ** 20
+        self.kill_rss = (kill_rss_mb if kill_rss_mb is not None else
+                         _env_float("FORMBOT_KILL_BROWSER_RSS_MB", "3000")) * 2 ** 20
+        self.max_jobs = int(max_jobs if max_jobs is not None else _env_float("FORMBOT_MAX_BROWSER_JOBS", "50"))
+        self.interval = interval if interval is not None else _env_float("FORMBOT_SUPERVISOR_INTERVAL", "5")
+        self._tracked = {}
+        self._profiles = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.counters = {"launched": 0, "closed": 0, "recycled": 0, "killed_over_rss": 0,
+                         "orphans_killed": 0, "profiles_reclaimed": 0}
+        atexit.register(self._reclaim_all_profiles)
+
+    # ---------- Registration ----------
+    def new_profile_dir(self):
+        """Temp profile named after our pid, so a later run can tell whether its owner is gone."""
+        path = tempfile.mkdtemp(prefix=f"{PROFILE_PREFIX}{os.getpid()}_")
+        with self._lock:
+            self._profiles.add(path)
+        return path
+
+    def register(self, driver, profile=None):
+        tracked = _Tracked(driver, driver_pid(driver), profile)
+        with self._lock:
+            self._tracked[id(driver)] = tracked
+            self.counters["launched"] += 1
+        self._ensure_monitor()
+        return tracked
+
+    def job(self, driver):
+        """Count one URL served by driver; past max_jobs it is marked for recycling."""
+        with self._lock:
+            t = self._tracked.get(id(driver))
+            if t is None:
+                return
+            t.jobs += 1
+            if self.max_jobs and t.jobs >= self.max_jobs and not t.recycle_reason:
+                t.recycle_reason = f"served {t.jobs} jobs"
+
+    def should_recycle(self, driver):
+        t = self._tracked.get(id(driver))
+        return bool(t and t.recycle_reason)
+
+    def unregister(self, driver):
+        """Forget a driver after quit(); reclaims its profile now and kills its tree if still running."""
+        with self._lock:
+            t = self._tracked.pop(id(driver), None)
+            if t is not None:
+                self.counters["closed"] += 1
+                if t.recycle_reason:
+                    self.counters["recycled"] += 1
+        if t is None:
+            return
+        if t.pid and pid_alive(t.pid) and self._is_chromedriver(t.pid):
+            # quit() failed, or returned while chromedriver lingered; a reused pid is left alone, and
+            # Chrome trees whose chromedriver already exited are the orphan reaper's job
+            kill_tree(t.pid)
+        self.reclaim_profile(t.profile)
+
+    @staticmethod
+    def _is_chromedriver(pid):
+        return "chromedriver" in os.path.basename(cmdline(pid).split(" ", 1)[0]).lower()
+
+    def reclaim_profile(self, path):
+        if not path:
+            return
+        shutil.rmtree(path, ignore_errors=True)
+        with self._lock:
+            if path in self._profiles:
+                self._profiles.discard(path)
+                self.counters["profiles_reclaimed"] += 1
+
+    def _reclaim_all_profiles(self):
+        for path in list(self._profiles):
+            self.reclaim_profile(path)
+
+    # ---------- Monitoring ----------
+    def _ensure_monitor(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="browser-supervisor", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+                self.reap_orphans()
+            except Exception as e:
+                logger.debug(f"[supervisor] Sampling failed: {e}")
+
+    def sample(self):
+        """Refresh RSS/CPU per driver, flag recycling and kill trees over the hard limit."""
+        with self._lock:
+            tracked = list(self._tracked.values())
+        now = time.monotonic()
+        for t in tracked:
+            if not t.pid:
+                continue
+            t.rss = tree_rss(t.pid)
+            cpu = tree_cpu_seconds(t.pid)
+            if t._cpu is not None and now > t._cpu_at:
+                t.cpu_pct = round(100.0 * max(0.0, cpu - t._cpu) / (now - t._cpu_at), 1)
+            t._cpu, t._cpu_at = cpu, now
+            if self.max_rss and t.rss > self.max_rss and not t.recycle_reason:
+                t.recycle_reason = f"rss {t.rss / 2 ** 20:.0f} MB"
+                logger.info(f"♻️ Browser pid {t.pid} marked for recycling ({t.recycle_reason})")
+            if self.kill_rss and t.rss > self.kill_rss:
+                logger.warning(f"💥 Browser pid {t.pid} at {t.rss / 2 ** 20:.0f} MB, killing")
+                with self._lock:
+                    self.counters["killed_over_rss"] += 1
+                kill_tree(t.pid)
+
+    def reap_orphans(self, grace=30):
+        """Kill Chrome trees we launched whose chromedriver is no longer tracked (crashed flows,
+        earlier runs), and remove temp profiles left behind by dead owners."""
+        me = os.getpid()
+        with self._lock:
+            live = {t.pid for t in self._tracked.values() if t.pid}
+        owned = set()
+        for pid in live:
+            owned.update(descendants(pid))
+        killed = 0
+        for pid in all_pids():
+            if pid in owned or pid in live or pid == me:
+                continue
+            cmd = cmdline(pid)
+            if OWNER_FLAG not in cmd or "--type=" in cmd:
+                continue  # only browser processes; renderers die with them
+            if "chrom" not in os.path.basename(cmd.split(" ", 1)[0]).lower():
+                continue  # e.g. a shell that merely mentions the flag
+            owner = cmd.split(OWNER_FLAG, 1)[1].split(" ", 1)[0]
+            if owner == str(me) and self._age(pid) < grace:
+                continue  # may be a launch still registering
+            if owner != str(me) and owner.isdigit() and pid_alive(int(owner)):
+                continue  # another live formbot process owns it
+            kill_tree(pid)
+            killed += 1
+        if killed:
+            logger.warning(f"🧹 Killed {killed} orphaned Chrome tree(s)")
+            with self._lock:
+                self.counters["orphans_killed"] += killed
+        self._reap_stale_profiles()
+        return killed
+
+    @staticmethod
+    def _age(pid):
+        try:
+            return time.time() - os.stat(f"/proc/{pid}").st_mtime
+        except OSError:
+            return 0.0
+
+    def _reap_stale_profiles(self):
+        for path in glob.glob(os.path.join(tempfile.gettempdir(), PROFILE_PREFIX + "*")):
+            owner = os.path.basename(path)[len(PROFILE_PREFIX):].split("_", 1)[0]
+            if owner.isdigit() and int(owner) != os.getpid() and not pid_alive(int(owner)):
+                shutil.rmtree(path, ignore_errors=True)
+                with self._lock:
+                    self.counters["profiles_reclaimed"] += 1
+
+    # ---------- Stats ----------
+    def stats(self):
+        with self._lock:
+            tracked = list(self._tracked.values())
+            counters = dict(self.counters)
+            profiles = len(self._profiles)
+        now = time.time()
+        drivers = [{
+            "pid": t.pid,
+            "kind": "shared" if getattr(t.driver, "_tab_host", False) else "per-url",
+            "rss_mb": round(t.rss / 2 ** 20, 1),
+            "cpu_pct": t.cpu_pct,
+            "jobs": t.jobs,
+            "age_s": round(now - t.launched, 1),
+            "recycle": t.recycle_reason,
+        } for t in tracked]
+        return {
+            "drivers": drivers,
+            "live": len(drivers),
+            "rss_mb": round(sum(d["rss_mb"] for d in drivers), 1),
+            "temp_profiles": profiles,
+            "limits": {"max_rss_mb": round(self.max_rss / 2 ** 20), "kill_rss_mb": round(self.kill_rss / 2 ** 20),
+                       "max_jobs": self.max_jobs},
+            **counters,
+        }
+
+    def shutdown(self):
+        self._stop.set()
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def get_supervisor():
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = BrowserSupervisor()
+        return _supervisor
@@ -0,0 +1,410 @@
+import atexit
+import copy
+import logging
+import os
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchElementException, TimeoutException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+
+from formbot.driver_manager import DriverManager
+from formbot.procinfo import driver_pid, tree_rss
+from formbot.supervisor import get_supervisor
+from formbot.tracing import CommandTracer, tracing_enabled
+
+logger = logging.getLogger("formbot")
+
+FIND_COMMANDS = {
+    Command.FIND_ELEMENT, Command.FIND_ELEMENTS, Command.FIND_CHILD_ELEMENT, Command.FIND_CHILD_ELEMENTS,
+    Command.FIND_ELEMENT_FROM_SHADOW_ROOT, Command.FIND_ELEMENTS_FROM_SHADOW_ROOT,
+}
+SINGLE_FIND = {Command.FIND_ELEMENT, Command.FIND_CHILD_ELEMENT, Command.FIND_ELEMENT_FROM_SHADOW_ROOT}
+CDP = "executeCdpCommand"
+
+
+class _FairLock:
+    """FIFO lock so one chatty tab cannot starve the others."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._next = 0
+        self._serving = 0
+
+    def acquire(self):
+        with self._cond:
+            ticket = self._next
+            self._next += 1
+            while ticket != self._serving:
+                self._cond.wait()
+
+    def release(self):
+        with self._cond:
+            self._serving += 1
+            self._cond.notify_all()
+
+
+def _tab_execute(self, command, params=None):
+    """WebDriver.execute for a tab-scoped driver: every command takes a turn on the shared session."""
+    tab = self._tab
+    host = tab.host
+    if command == Command.SET_TIMEOUTS:
+        # implicit/page-load waits are emulated per tab so they never hold the shared session
+        params = dict(params or {})
+        if "implicit" in params:
+            tab.implicit_wait = params.pop("implicit") / 1000.0
+        if "pageLoad" in params:
+            tab.page_load_timeout = params.pop("pageLoad") / 1000.0
+        if not params:
+            return {"value": None}
+    if command in (Command.QUIT, Command.CLOSE):
+        tab.close()
+        return {"value": None}
+    if command == Command.GET:
+        return host.navigate(tab, self, params["url"])
+    if command in FIND_COMMANDS and tab.implicit_wait > 0:
+        return host.find(tab, self, command, params)
+    return host.run(tab, self, command, params)
+
+
+class _TabExecutor:
+    """A tab's own handle on the shared RemoteConnection, so its CommandTracer wraps only that
+    tab's commands. It calls the connection's unwrapped execute: the host's tracer (if any)
+    then records only the host's own commands."""
+
+    def __init__(self, executor):
+        self._executor = executor
+
+    def execute(self, command, params):
+        return type(self._executor).execute(self._executor, command, params)
+
+    def __getattr__(self, name):
+        return getattr(self._executor, name)
+
+
+class Tab:
+    """One URL's slice of a shared Chrome: its window handle, frame path and local timeouts."""
+
+    def __init__(self, host, handle, context_id=None):
+        self.host = host
+        self.handle = handle
+        self.context_id = context_id
+        self.frames = []
+        self.implicit_wait = 2.0
+        self.page_load_timeout = 60.0
+        self.url = "about:blank"
+        self.commands = 0
+        self.closed = False
+        self.driver = host.tab_driver(self)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            tracer = getattr(self.driver, "_tracer", None)
+            if tracer:
+                try:
+                    tracer.flush()  # DriverManager.cleanup never reaches its own flush for a tab
+                except Exception as e:
+                    logger.warning(f"[driver] Trace flush failed: {e}")
+            self.host.close_tab(self)
+
+
+class BrowserHost:
+    """One Chrome process serving several tabs; WebDriver commands from each tab are
+    serialized on the session, switching window (and replaying frames) only when needed."""
+
+    def __init__(self, headless=True, isolation="context", trace=None, on_tab_closed=None):
+        self.driver = DriverManager.launch(headless, page_load_strategy="none")
+        self.driver._tab_host = True
+        self._base_execute = type(self.driver).execute
+        self._base_execute(self.driver, Command.SET_TIMEOUTS, {"implicit": 0})
+        self.trace = trace if trace is not None else tracing_enabled()
+        if self.trace:
+            CommandTracer().attach(self.driver)
+        self.isolation = isolation
+        self.on_tab_closed = on_tab_closed
+        self.home = self._base_execute(self.driver, Command.W3C_GET_CURRENT_WINDOW_HANDLE)["value"]
+        self.current = self.home
+        self.tabs = {}
+        self.reserved = 0
+        self.dead = False
+        self.launched = time.time()
+        self.commands = 0
+        self.switches = 0
+        self.turn_wait = 0.0
+        self._lock = _FairLock()
+
+    # ---------- Scheduling ----------
+    def _raw(self, command, params=None, driver=None):
+        return self._base_execute(driver or self.driver, command, params)
+
+    def _activate(self, tab):
+        self._raw(Command.SWITCH_TO_WINDOW, {"handle": tab.handle})
+        self.current = tab.handle
+        self.switches += 1
+        try:
+            for params in tab.frames:
+                self._raw(Command.SWITCH_TO_FRAME, dict(params))
+        except Exception as e:
+            logger.debug(f"[tabs] Frame path lost for {tab.url}: {e}")
+            tab.frames = []
+            self._raw(Command.SWITCH_TO_FRAME, {"id": None})
+
+    @contextmanager
+    def turn(self, tab=None):
+        """Exclusive use of the session, focused on tab (if given)."""
+        started = time.perf_counter()
+        self._lock.acquire()
+        self.turn_wait += time.perf_counter() - started
+        try:
+            if tab is not None and self.current != tab.handle:
+                self._activate(tab)
+            yield
+        except InvalidSessionIdException:
+            self.dead = True
+            raise
+        finally:
+            self._lock.release()
+
+    def run(self, tab, driver, command, params):
+        with self.turn(tab):
+            response = self._raw(command, params, driver)
+            self.commands += 1
+            tab.commands += 1
+            if command == Command.SWITCH_TO_FRAME:
+                target = (params or {}).get("id")
+                tab.frames = [] if target is None else tab.frames + [dict(params)]
+            elif command == Command.SWITCH_TO_PARENT_FRAME:
+                tab.frames = tab.frames[:-1]
+            return response
+
+    def find(self, tab, driver, command, params):
+        """Implicit wait without holding the session: retry between other tabs' turns."""
+        deadline = time.monotonic() + tab.implicit_wait
+        while True:
+            try:
+                response = self.run(tab, driver, command, params)
+                if command in SINGLE_FIND or response.get("value") or time.monotonic() >= deadline:
+                    return response
+            except NoSuchElementException:
+                if time.monotonic() >= deadline:
+                    raise
+            time.sleep(0.2)
+
+    def navigate(self, tab, driver, url):
+        """GET returns at once under the 'none' load strategy; wait for the new document between turns."""
+        with self.turn(tab):
+            try:
+                self._raw(Command.W3C_EXECUTE_SCRIPT, {"script": "window.__formbotNav = 1;", "args": []}, driver)
+            except Exception:
+                pass
+            response = self._raw(Command.GET, {"url": url}, driver)
+            tab.frames = []
+            tab.url = url
+            self.commands += 2
+        deadline = time.monotonic() + tab.page_load_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.1)
+            with self.turn(tab):
+                try:
+                    state = self._raw(Command.W3C_EXECUTE_SCRIPT, {
+                        "script": "return window.__formbotNav ? 'old' : document.readyState;", "args": []
+                    }, driver)["value"]
+                except Exception:
+                    state = None  # mid-navigation
+                self.commands += 1
+            if state == "complete":
+                return response
+        raise TimeoutException(f"Timed out loading {url} after {tab.page_load_timeout:.0f}s")
+
+    # ---------- Tabs ----------
+    def tab_driver(self, tab):
+        """A WebDriver sharing this session whose commands (and its elements') are tab-scoped."""
+        driver = copy.copy(self.driver)
+        driver._tab = tab
+        driver._switch_to = SwitchTo(driver)
+        driver.execute = types.MethodType(_tab_execute, driver)
+        driver.quit = types.MethodType(lambda d: d._tab.close(), driver)
+        driver._tmp_profile = None
+        driver._formbot_lib = driver._formbot_lib_id = None  # each tab registers its own page library
+        driver._tracer = None
+        if self.trace:
+            # per-URL round trips: concurrent tabs must not share (and reset) one tracer
+            driver.command_executor = _TabExecutor(self.driver.command_executor)
+            CommandTracer().attach(driver)
+        return driver
+
+    def _new_context_tab(self):
+        ctx = self._raw(CDP, {"cmd": "Target.createBrowserContext", "params": {}})["value"]["browserContextId"]
+        try:
+            handle = self._raw(CDP, {"cmd": "Target.createTarget",
+                                     "params": {"url": "about:blank", "browserContextId": ctx}})["value"]["targetId"]
+            for _ in range(10):
+                if handle in self._raw(Command.W3C_GET_WINDOW_HANDLES)["value"]:
+                    return handle, ctx
+                time.sleep(0.05)
+            raise RuntimeError("context tab not visible to chromedriver")
+        except Exception:
+            self._raw(CDP, {"cmd": "Target.disposeBrowserContext", "params": {"browserContextId": ctx}})
+            raise
+
+    def open_tab(self):
+        with self.turn():
+            handle, ctx = None, None
+            if self.isolation == "context":
+                try:
+                    handle, ctx = self._new_context_tab()
+                except Exception as e:
+                    logger.warning(f"[tabs] Browser contexts unavailable ({e}); using plain tabs")
+                    self.isolation = "tab"
+            if handle is None:
+                handle = self._raw(Command.NEW_WINDOW, {"type": "tab"})["value"]["handle"]
+        tab = Tab(self, handle, ctx)
+        self.tabs[handle] = tab
+        get_supervisor().job(self.driver)
+        return tab
+
+    def close_tab(self, tab):
+        try:
+            with self.turn():
+                try:
+                    if tab.context_id:
+                        self._raw(CDP, {"cmd": "Target.closeTarget", "params": {"targetId": tab.handle}})
+                        self._raw(CDP, {"cmd": "Target.disposeBrowserContext",
+                                        "params": {"browserContextId": tab.context_id}})
+                    else:
+                        self._raw(Command.SWITCH_TO_WINDOW, {"handle": tab.handle})
+                        self._raw(Command.CLOSE)
+                finally:
+                    self._raw(Command.SWITCH_TO_WINDOW, {"handle": self.home})
+                    self.current = self.home
+        except Exception as e:
+            logger.debug(f"[tabs] Closing tab for {tab.url} failed: {e}")
+        finally:
+            self.tabs.pop(tab.handle, None)
+            if self.on_tab_closed:
+                self.on_tab_closed(self)
+
+    # ---------- Stats ----------
+    def rss(self):
+        pid = driver_pid(self.driver)
+        return tree_rss(pid) if pid else 0
+
+    @property
+    def draining(self):
+        """Over the supervisor's RSS/job budget: finish current tabs, take no new ones."""
+        return self.dead or get_supervisor().should_recycle(self.driver)
+
+    def quit(self):
+        DriverManager.cleanup(self.driver)
+
+
+class TabScheduler:
+    """Pool of shared Chrome instances, each serving up to tabs_per_browser URLs at once."""
+
+    def __init__(self, tabs_per_browser=4, max_browsers=0, headless=True, isolation="context"):
+        self.tabs_per_browser = tabs_per_browser
+        self.max_browsers = max_browsers  # 0 = unbounded
+        self.headless = headless
+        self.isolation = isolation
+        self.hosts = []
+        self._launching = 0
+        self._cond = threading.Condition()
+
+    def _free_host(self):
+        live = [h for h in self.hosts if not h.draining and len(h.tabs) + h.reserved < self.tabs_per_browser]
+        return min(live, key=lambda h: len(h.tabs) + h.reserved, default=None)
+
+    def _tab_closed(self, host):
+        with self._cond:
+            if host.draining and not host.tabs and not host.reserved and host in self.hosts:
+                self.hosts.remove(host)
+                threading.Thread(target=host.quit, daemon=True).start()
+            self._cond.notify_all()
+
+    def open_tab(self, trace=None):
+        """Tab-scoped WebDriver for one URL; release it with DriverManager.cleanup(driver)."""
+        with self._cond:
+            while True:
+                host = self._free_host()
+                if host is not None:
+                    host.reserved += 1
+                    break
+                live = len([h for h in self.hosts if not h.draining])
+                if not self._launching and (not self.max_browsers or live < self.max_browsers):
+                    self._launching += 1
+                    break
+                self._cond.wait()
+
+        if host is None:
+            try:
+                host = BrowserHost(self.headless, self.isolation, trace=trace, on_tab_closed=self._tab_closed)
+            finally:
+                with self._cond:
+                    self._launching -= 1
+                    self._cond.notify_all()
+            with self._cond:
+                self.hosts.append(host)
+                host.reserved += 1
+            logger.debug(f"[tabs] Launched shared Chrome #{len(self.hosts)}")
+
+        try:
+            return host.open_tab().driver
+        finally:
+            with self._cond:
+                host.reserved -= 1
+                self._cond.notify_all()
+
+    def stats(self):
+        """Density report: browser RSS split across the URLs it is currently serving."""
+        browsers, active = [], []
+        with self._cond:
+            hosts = list(self.hosts)
+        for idx, host in enumerate(hosts):
+            rss = host.rss()
+            tabs = list(host.tabs.values())
+            share = rss / len(tabs) if tabs else 0
+            browsers.append({"browser": idx, "tabs": len(tabs), "rss_mb": round(rss / 2 ** 20, 1),
+                             "commands": host.commands, "switches": host.switches,
+                             "turn_wait_s": round(host.turn_wait, 2), "dead": host.dead,
+                             "draining": host.draining})
+            active += [{"url": t.url, "browser": idx, "rss_share_mb": round(share / 2 ** 20, 1),
+                        "commands": t.commands} for t in tabs]
+        total = sum(b["rss_mb"] for b in browsers)
+        return {"mode": "tabs", "tabs_per_browser": self.tabs_per_browser, "browsers": browsers,
+                "active_urls": len(active), "rss_mb": round(total, 1),
+                "rss_per_url_mb": round(total / len(active), 1) if active else 0.0, "active": active}
+
+    def shutdown(self):
+        with self._cond:
+            hosts, self.hosts = list(self.hosts), []
+        for host in hosts:
+            host.quit()
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_tab_scheduler(headless=True):
+    """Shared scheduler per headless flag, configured from FORMBOT_TABS_PER_BROWSER,
+    FORMBOT_MAX_BROWSERS and FORMBOT_TAB_ISOLATION (context | tab)."""
+    with _schedulers_lock:
+        if headless not in _schedulers:
+            sched = TabScheduler(
+                tabs_per_browser=max(1, int(os.getenv("FORMBOT_TABS_PER_BROWSER", "4") or 4)),
+                max_browsers=int(os.getenv("FORMBOT_MAX_BROWSERS", "0") or 0),
+                headless=headless,
+                isolation=os.getenv("FORMBOT_TAB_ISOLATION", "context"),
+            )
+            atexit.register(sched.shutdown)
+            _schedulers[headless] = sched
+        return _schedulers[headless]
+
+
+def active_schedulers():
+    with _schedulers_lock:
+        return list(_schedulers.values())
@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+logger = logging.getLogger("formbot")
+
+TRACE_ENV = "FORMBOT_TRACE"
+TRACE_DIR_ENV = "FORMBOT_TRACE_DIR"
+
+
+def tracing_enabled():
+    return os.getenv(TRACE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class CommandTracer:
+    """Opt-in recorder for every WebDriver command a single driver sends to chromedriver."""
+
+    # Only frames from our own code are kept when building caller stacks
+    CALLER_MODULES = ("formbot", "app", "aiseo", "bench", "__main__")
+    SKIP_MODULES = ("formbot.tracing",)
+
+    def __init__(self, url=None, max_stack=10):
+        self.url = url
+        self.max_stack = max_stack
+        self.records = []
+        self._lock = threading.Lock()
+
+    # ---------- Wiring ----------
+    def attach(self, driver):
+        """Wrap driver.command_executor.execute so each round trip is recorded."""
+        executor = driver.command_executor
+        original = executor.execute
+
+        def traced_execute(command, params):
+            stack = self._caller_stack()
+            sent = self._size(params)
+            start = time.perf_counter()
+            response, ok = None, False
+            try:
+                response = original(command, params)
+                ok = True
+                return response
+            finally:
+                elapsed = time.perf_counter() - start
+                received = self._size(response.get("value")) if isinstance(response, dict) else 0
+                with self._lock:
+                    self.records.append({
+                        "command": command,
+                        "stack": stack,
+                        "caller": stack[-1] if stack else "<unknown>",
+                        "duration": elapsed,
+                        "sent": sent,
+                        "received": received,
+                        "ok": ok,
+                    })
+
+        executor.execute = traced_execute
+        driver._tracer = self
+        return driver
+
+    def _caller_stack(self):
+        frames = []
+        f = sys._getframe(2)
+        while f is not None:
+            mod = f.f_globals.get("__name__", "")
+            if mod not in self.SKIP_MODULES and any(
+                mod == p or mod.startswith(p + ".") for p in self.CALLER_MODULES
+            ):
+                code = f.f_code
+                frames.append(f"{mod}:{getattr(code, 'co_qualname', code.co_name)}")
+            f = f.f_back
+        frames.reverse()
+        return tuple(frames[-self.max_stack:])
+
+    @staticmethod
+    def _size(payload):
+        if payload is None:
+            return 0
+        try:
+            return len(json.dumps(payload, default=str))
+        except Exception:
+            return 0
+
+    # ---------- Summaries ----------
+    def by_caller(self):
+        """Aggregate commands, time and bytes per calling function."""
+        out = defaultdict(lambda: {"commands": 0, "time": 0.0, "bytes": 0, "by_command": Counter()})
+        with self._lock:
+            records = list(self.records)
+        for r in records:
+            row = out[r["caller"]]
+            row["commands"] += 1
+            row["time"] += r["duration"]
+            row["bytes"] += r["sent"] + r["received"]
+            row["by_command"][r["command"]] += 1
+        return dict(out)
+
+    def totals(self):
+        with self._lock:
+            records = list(self.records)
+        return {
+            "commands": len(records),
+            "time": sum(r["duration"] for r in records),
+            "bytes": sum(r["sent"] + r["received"] for r in records),
+        }
+
+    def folded(self, weight="count"):
+        """Collapsed stacks (flamegraph.pl / speedscope format), weighted by count or microseconds."""
+        counts = Counter()
+        with self._lock:
+            records = list(self.records)
+        for r in records:
+            key = ";".join(r["stack"] + (r["command"],))
+            counts[key] += 1 if weight == "count" else int(r["duration"] * 1_000_000)
+        return "\n".join(f"{k} {v}" for k, v in sorted(counts.items()))
+
+    def report(self, top=15):
+        totals = self.totals()
+        lines = [
+            f"[trace] {self.url or '<no url>'}: {totals['commands']} WebDriver commands, "
+            f"{totals['time']:.2f}s, {totals['bytes'] / 1024:.1f} KiB"
+        ]
+        rows = sorted(self.by_caller().items(), key=lambda kv: kv[1]["commands"], reverse=True)
+        for caller, row in rows[:top]:
+            common = ", ".join(f"{c}×{n}" for c, n in row["by_command"].most_common(3))
+            lines.append(
+                f"  {row['commands']:>6}  {row['time']:>7.2f}s  {row['bytes'] / 1024:>8.1f} KiB  {caller}  ({common})"
+            )
+        return "\n".join(lines)
+
+    def reset(self, url=None):
+        """Start a new per-URL trace on the same driver (warm domain sessions reuse it)."""
+        with self._lock:
+            self.records = []
+        self.url = url
+
+    def flush(self):
+        """Log the per-URL summary and write folded stacks when FORMBOT_TRACE_DIR is set."""
+        if not self.records:
+            return
+        logger.info(self.report())
+        trace_dir = os.getenv(TRACE_DIR_ENV)
+        if not trace_dir:
+            return
+        try:
+            os.makedirs(trace_dir, exist_ok=True)
+            slug = re.sub(r"[^a-zA-Z0-9._-]+", "_", self.url or "driver").strip("_")[:80]
+            base = os.path.join(trace_dir, f"{slug}_{int(time.time())}")
+            with open(base + ".folded", "w") as fh:
+                fh.write(self.folded())
+            with open(base + ".time.folded", "w") as fh:
+                fh.write(self.folded(weight="time"))
+            logger.debug(f"[trace] Wrote folded stacks to {base}.folded")
+        except Exception as e:
+            logger.warning(f"[trace] Could not write trace files: {e}")
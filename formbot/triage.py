@@ -0,0 +1,245 @@
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+
+import requests
+import urllib3
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from formbot.contact_page_finder import ContactPageFinder
+from formbot.domains import hostname, normalize_url, registrable_domain
+
+logger = logging.getLogger("formbot")
+
+VIABLE, DEAD, PARKED, CHALLENGE, CAPTCHA = "viable", "dead", "parked", "challenge", "captcha"
+
+# same signals FormFlow's _has_captcha looks for, but in raw HTML
+CAPTCHA_MARKERS = [
+    ("recaptcha", re.compile(r"class=[\"'][^\"']*\bg-recaptcha\b|google\.com/recaptcha/|recaptcha/api\.js")),
+    ("hcaptcha", re.compile(r"class=[\"'][^\"']*\bh-captcha\b|hcaptcha\.com/1/api\.js")),
+    ("turnstile", re.compile(r"class=[\"'][^\"']*\bcf-turnstile\b|challenges\.cloudflare\.com/turnstile")),
+]
+
+
+def captcha_marker(html):
+    """Name of the first captcha vendor referenced in raw HTML, or None."""
+    for name, pattern in CAPTCHA_MARKERS:
+        if pattern.search(html or ""):
+            return name
+    return None
+
+
+class TriageResult:
+    """Outcome of the pre-browser HTTP check for one URL."""
+
+    def __init__(self, url, verdict=VIABLE, reason="", final_url=None, contact_url=None, html=None, elapsed=0.0):
+        self.url = url
+        self.verdict = verdict
+        self.reason = reason
+        self.final_url = final_url or url
+        self.contact_url = contact_url
+        self.html = html  # homepage HTML, reused for the pitch context
+        self.elapsed = elapsed
+
+    @property
+    def viable(self):
+        return self.verdict == VIABLE
+
+    @property
+    def status(self):
+        """FormFlow-style status line for URLs that never reach the browser."""
+        if self.verdict == DEAD:
+            return f"[X] Unreachable {self.url}: {self.reason}"
+        if self.verdict == PARKED:
+            return f"[X] Parked domain {self.url} ({self.reason})"
+        if self.verdict == CHALLENGE:
+            return f"[X] Cloudflare challenge on {self.final_url}"
+        if self.verdict == CAPTCHA:
+            return f"[X] Captcha/Anti-bot detected on {self.contact_url or self.final_url} ({self.reason})"
+        return f"[✓] Viable {self.url}"
+
+    def to_dict(self):
+        return {"verdict": self.verdict, "reason": self.reason, "final_url": self.final_url,
+                "contact_url": self.contact_url, "elapsed": round(self.elapsed, 3)}
+
+
+class HttpTriage:
+    """Cheap requests-based screening so captcha-gated, parked and dead sites never cost a browser."""
+
+    PARKED_MARKERS = [
+        "this domain is for sale", "domain is for sale", "buy this domain", "this domain may be for sale",
+        "domain is parked", "parked free", "parkingcrew", "sedoparking", "bodis.com", "above.com/marketing",
+        "hugedomains.com", "afternic.com", "dan.com/buy-domain", "godaddy.com/domainsearch",
+        "domain has expired", "this domain name has expired", "related searches",
+    ]
+    PARKING_HOSTS = ["sedo.com", "dan.com", "afternic.com", "hugedomains.com", "bodis.com", "parkingcrew.net",
+                     "above.com", "undeveloped.com", "sav.com"]
+    CHALLENGE_MARKERS = ["challenge-platform", "cf-chl-", "cf_chl_opt", "just a moment...",
+                         "attention required! | cloudflare", "checking your browser before accessing"]
+    FORM_MARKERS = re.compile(r"<form\b|hbspt\.forms|wpcf7|gform_wrapper|wpforms|nf-form|elementor-form", re.I)
+    # the only network failures that mean the site is really gone (see _network_reason)
+    DEAD_REASONS = ("dns failure", "connection refused")
+
+    MAX_BYTES = 512 * 1024
+
+    def __init__(self, session=None, timeout=(4, 8), max_contact_pages=3):
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.max_contact_pages = max_contact_pages
+
+    # ---------- HTTP ----------
+    def fetch(self, url):
+        """(response, text) for url on the pooled session, capped at MAX_BYTES; raises requests errors."""
+        resp = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True)
+        try:
+            body = b""
+            for chunk in resp.iter_content(64 * 1024):
+                body += chunk
+                if len(body) >= self.MAX_BYTES:
+                    break
+        finally:
+            resp.close()
+        return resp, body.decode(resp.encoding or "utf-8", errors="replace")
+
+    @staticmethod
+    def _network_reason(exc):
+        text = str(exc).lower()
+        if isinstance(exc, requests.exceptions.SSLError):
+            return "tls error"
+        if isinstance(exc, requests.exceptions.ProxyError):
+            return "proxy error"
+        if any(k in text for k in ("name or service not known", "nodename nor servname", "getaddrinfo failed",
+                                   "name resolution", "no address associated", "nxdomain")):
+            return "dns failure"
+        if isinstance(exc, requests.exceptions.ConnectTimeout):
+            return "connect timeout"
+        if "refused" in text:
+            return "connection refused"
+        return "connection failed"
+
+    # ---------- Classifiers ----------
+    def _is_challenge(self, resp, html):
+        if resp.headers.get("cf-mitigated", "").lower() == "challenge":
+            return True
+        if resp.status_code in (403, 429, 503) and "cloudflare" in resp.headers.get("server", "").lower():
+            low = html[:20000].lower()
+            return any(m in low for m in self.CHALLENGE_MARKERS)
+        return False
+
+    def _parked_reason(self, resp, html):
+        final = hostname(resp.url)
+        for host in self.PARKING_HOSTS:
+            if final == host or final.endswith("." + host):
+                return f"redirects to {host}"
+        low = html[:50000].lower()
+        hits = [m for m in self.PARKED_MARKERS if m in low]
+        # "related searches" alone is common on real sites; require a second marker for it
+        if hits and (hits != ["related searches"]):
+            return hits[0]
+        return None
+
+    def _contact_candidates(self, base_url, html):
+        """Same-site links that ContactPageFinder would follow, then its first common paths."""
+        soup = BeautifulSoup(html, "html.parser")
+        site = registrable_domain(base_url)
+        out = []
+        for a in soup.find_all("a", href=True):
+            href = a["href"].strip()
+            text = a.get_text(" ", strip=True).lower()
+            if href.startswith(("mailto:", "tel:", "javascript:", "#")):
+                continue
+            target = urljoin(base_url, href)
+            if registrable_domain(target) != site:
+                continue
+            if any(k in text for k in ContactPageFinder.CONTACT_KEYWORDS) or \
+                    any(k in urlparse(target).path.lower() for k in ContactPageFinder.CONTACT_KEYWORDS):
+                out.append(target)
+        out += [urljoin(base_url, p) for p in ContactPageFinder.COMMON_PATHS[:3]]
+        seen, unique = set(), []
+        for u in out:
+            key = u.split("#")[0].rstrip("/")
+            if key not in seen and key != base_url.rstrip("/"):
+                seen.add(key)
+                unique.append(u)
+        return unique
+
+    # ---------- Entry ----------
+    def check(self, url):
+        url = normalize_url(url)
+        started = time.perf_counter()
+        result = self._check(url)
+        result.elapsed = time.perf_counter() - started
+        logger.debug(f"[triage] {url}: {result.verdict} {result.reason} ({result.elapsed:.2f}s)")
+        return result
+
+    def _check(self, url):
+        try:
+            resp, html = self.fetch(url)
+        except (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout) as e:
+            reason = self._network_reason(e)
+            if reason in self.DEAD_REASONS:
+                return TriageResult(url, DEAD, reason)
+            # TLS chain, proxy, reset or timeout trouble: Chrome often loads these fine
+            return TriageResult(url, VIABLE, f"homepage fetch failed: {reason}")
+        except Exception as e:
+            # slow or odd responses are left for the browser to judge
+            return TriageResult(url, VIABLE, f"homepage fetch failed: {e.__class__.__name__}")
+
+        if self._is_challenge(resp, html):
+            return TriageResult(url, CHALLENGE, f"HTTP {resp.status_code}", final_url=resp.url)
+        parked = self._parked_reason(resp, html)
+        if parked:
+            return TriageResult(url, PARKED, parked, final_url=resp.url)
+        homepage = html if resp.ok else None
+
+        for candidate in self._contact_candidates(resp.url, html)[: self.max_contact_pages]:
+            try:
+                page, page_html = self.fetch(candidate)
+            except Exception:
+                continue
+            if self._is_challenge(page, page_html):
+                return TriageResult(url, CHALLENGE, f"HTTP {page.status_code}", final_url=page.url, html=homepage)
+            if not page.ok or not self.FORM_MARKERS.search(page_html):
+                continue
+            captcha = captcha_marker(page_html)
+            if captcha:
+                return TriageResult(url, CAPTCHA, captcha, final_url=resp.url, contact_url=page.url, html=homepage)
+            return TriageResult(url, VIABLE, "contact form found", final_url=resp.url,
+                                contact_url=page.url, html=homepage)
+        return TriageResult(url, VIABLE, "", final_url=resp.url, html=homepage)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_maxsize=32):
+    """Process-wide pooled session shared by every triage check (keep-alive across contact paths)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=64, pool_maxsize=pool_maxsize, max_retries=0)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers.update({"User-Agent": "Mozilla/5.0"})
+            proxy = os.getenv("FORMBOT_PROXY")
+            if proxy:
+                # the record/replay proxy terminates TLS with its own self-signed certificate
+                _session.proxies = {"http": proxy, "https": proxy}
+                _session.verify = False
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        return _session
+
+
+def triage_url(url):
+    """Never raises: anything unexpected is reported as viable so the browser gets a chance."""
+    try:
+        return HttpTriage().check(url)
+    except Exception as e:
+        logger.debug(f"[triage] {url}: check crashed ({e}), treating as viable")
+        return TriageResult(normalize_url(url), VIABLE, f"triage error: {e}")
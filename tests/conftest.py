@@ -0,0 +1,52 @@
+"""Offline stand-ins shared by the behavior tests (no Chrome, no network)."""
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+
+class FakeResponse:
+    def __init__(self, url, status=200, body="", headers=None):
+        self.url = url
+        self.status_code = status
+        self.text = body
+        self.headers = CaseInsensitiveDict(headers or {"Content-Type": "text/html"})
+        self.encoding = "utf-8"
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def iter_content(self, size):
+        yield self.text.encode()
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Serves {url: (status, body[, headers])} or an exception to raise; unknown URLs are 404s.
+    Requests are recorded in self.calls as (method, url, data)."""
+
+    def __init__(self, routes=None, post=None):
+        self.routes = routes or {}
+        self.post_response = post
+        self.calls = []
+
+    def _answer(self, url, route):
+        if isinstance(route, Exception):
+            raise route
+        if route is None:
+            return FakeResponse(url, 404, "not found")
+        return FakeResponse(url, *route)
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url, None))
+        return self._answer(url, self.routes.get(url))
+
+    def post(self, url, data=None, files=None, **kwargs):
+        self.calls.append(("POST", url, data if data is not None else files))
+        return self._answer(url, self.post_response)
+
+
+@pytest.fixture
+def fake_session():
+    return FakeSession
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from formbot.admission import Admission, AdmissionTimeout, Overloaded
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_waiting_callers_are_served_round_robin():
+    admission = Admission(max_browsers=1, max_pending=100, wait_timeout=5)
+    held = admission.acquire("setup")
+    order, lock = [], threading.Lock()
+
+    def worker(caller):
+        lease = admission.acquire(caller)
+        with lock:
+            order.append(caller)
+        lease.release()
+
+    threads = []
+    for caller in ["big", "big", "big", "small"]:  # the small batch arrives last
+        t = threading.Thread(target=worker, args=(caller,))
+        t.start()
+        threads.append(t)
+        _wait_for(lambda n=len(threads): admission.stats()["waiting"] == n)
+    held.release()
+    for t in threads:
+        t.join(5)
+    assert order == ["big", "small", "big", "big"]
+    assert admission.stats()["browsers_in_use"] == 0
+
+
+def test_acquire_times_out_and_leaves_the_queue():
+    admission = Admission(max_browsers=1, max_pending=10, wait_timeout=5)
+    lease = admission.acquire("a")
+    with pytest.raises(AdmissionTimeout):
+        admission.acquire("b", timeout=0.05)
+    stats = admission.stats()
+    assert stats["timeouts"] == 1 and stats["waiting"] == 0
+    lease.release()
+    lease.release()  # idempotent
+    assert admission.stats()["browsers_in_use"] == 0
+
+
+def test_pending_queue_overflow_is_rejected_with_retry_after():
+    admission = Admission(max_browsers=2, max_pending=5)
+    ticket = admission.admit("a", 4)
+    with pytest.raises(Overloaded) as exc:
+        admission.admit("b", 3)
+    assert exc.value.retry_after >= 1
+    ticket.done(2)
+    admission.admit("b", 3)
+    assert admission.stats()["pending_by_caller"] == {"a": 2, "b": 3}
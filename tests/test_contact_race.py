@@ -0,0 +1,104 @@
+from formbot.contact_race import ContactRace, static_contact_form
+from formbot.triage import HttpTriage
+
+SITE = "https://acme.example"
+CONTACT_FORM = '<form method="post"><input name="email"><textarea name="msg"></textarea></form>'
+
+
+class _Site:
+    """An HTTP view of the site: {path: (status, html)}, everything else 404."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    def get(self, url, **kwargs):
+        self.fetched.append(url)
+        status, html = self.pages.get(url[len(SITE):] or "/", (404, "not found"))
+        return _Page(url, status, html)
+
+
+class _Page:
+    encoding = "utf-8"
+    headers = {}
+
+    def __init__(self, url, status, html):
+        self.url, self.status_code, self.html = url, status, html
+        self.ok = status < 400
+
+    def iter_content(self, size):
+        yield self.html.encode()
+
+    def close(self):
+        pass
+
+
+class _Browser:
+    def __init__(self):
+        self.current_url = SITE
+        self.loaded = []
+
+    def get(self, url):
+        self.loaded.append(url)
+        self.current_url = url
+
+
+class _Finder:
+    """ContactPageFinder's surface the race uses; forms only 'render' on the pages in js_forms."""
+    CONTACT_KEYWORDS = ("contact",)
+    NEWSLETTER_HINTS = ("newsletter",)
+    COMMON_PATHS = ("/contact",)
+    max_runtime, timeout, debug = 6, 1, False
+
+    def __init__(self, js_forms=()):
+        self.driver = _Browser()
+        self.js_forms = js_forms
+        self.cancelled = None
+
+    def log(self, msg):
+        pass
+
+    def _popup_or_iframe_form(self):
+        return False
+
+    def _link_candidates(self, base_url):
+        return []
+
+    def _page_has_contact_form(self, max_wait=None):
+        return self.driver.current_url[len(SITE):] in self.js_forms
+
+
+def _race(finder, pages):
+    race = ContactRace(finder, SITE, probe_tabs=0, http_probes=1)
+    race._triage = HttpTriage(session=_Site(pages))
+    return race, race._triage.session
+
+
+def test_static_contact_form():
+    assert static_contact_form(CONTACT_FORM, ("newsletter",))
+    assert static_contact_form('<form><input type="text"><input type="email"></form>', ("newsletter",))
+    assert not static_contact_form('<form>Join our newsletter <textarea></textarea></form>', ("newsletter",))
+    assert not static_contact_form('<form><input type="search"></form>', ("newsletter",))
+
+
+def test_sitemap_hint_confirmed_over_http():
+    sitemap = f"<urlset><url><loc>{SITE}/about</loc></url><url><loc>{SITE}/get-in-touch-contact</loc></url></urlset>"
+    race, site = _race(_Finder(), {"/sitemap.xml": (200, sitemap), "/get-in-touch-contact": (200, CONTACT_FORM)})
+    assert race.run() == f"{SITE}/get-in-touch-contact"
+    assert race.winner["prober"] == "http" and race.winner["source"] == "sitemap"
+    assert f"{SITE}/about" not in site.fetched  # only contact-looking sitemap entries are probed
+
+
+def test_script_rendered_form_is_found_by_the_browser():
+    finder = _Finder(js_forms=("/contact",))
+    race, site = _race(finder, {"/contact": (200, "<div id='app'></div>")})
+    assert race.run() == f"{SITE}/contact"
+    assert race.winner["prober"] == "main"
+    assert f"{SITE}/contact" in site.fetched and finder.driver.loaded == [f"{SITE}/contact"]
+    assert finder.cancelled is None
+
+
+def test_no_contact_page_anywhere():
+    race, _site = _race(_Finder(), {})
+    assert race.run() is None
+    assert race.stats()["dead"] == 1  # the 404 common path
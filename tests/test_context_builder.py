@@ -0,0 +1,51 @@
+from formbot.context_builder import ContextBuilder, estimate_tokens
+
+PAGE = """<html><head><title>Acme Plumbing</title>
+<meta name="description" content="Emergency plumbers in Springfield."></head>
+<body class="home page right-sidebar"><div id="page" class="site has-sidebar">
+<div class="cookie-banner"><p>We use cookies to improve your experience on this site.</p></div>
+<nav><a href="/">Home</a></nav>
+<div class="content">
+<h1>Acme Plumbing Services</h1>
+<p>We fix leaks, install boilers and handle emergency plumbing across Springfield since 1990.</p>
+<p>Sign up for a yearly maintenance plan and we service your boiler every autumn, checking the pressure,
+valves and flues so that winter never catches your family without heat or hot water again.</p>
+</div>
+<div class="widget-sidebar"><p>Recent posts from our plumbing tips blog for homeowners</p></div>
+<div class="social-share"><p>Share this page with your friends and family</p></div>
+<p>Copyright 2024 Acme Plumbing. All rights reserved.</p>
+</div></body></html>"""
+
+
+def test_body_class_hints_do_not_strip_the_page():
+    context, stats = ContextBuilder(500).build(PAGE)
+    assert "Acme Plumbing Services" in context
+    assert "emergency plumbing across Springfield" in context
+    assert stats["context_tokens"] > 30
+
+
+def test_chrome_blocks_are_stripped_by_whole_class_tokens():
+    context, _ = ContextBuilder(500).build(PAGE)
+    assert "We use cookies" not in context
+    assert "Recent posts" not in context
+    assert "Share this page" not in context
+    assert "All rights reserved" not in context
+
+
+def test_boilerplate_words_only_drop_banner_sized_blocks():
+    context, _ = ContextBuilder(500).build(PAGE)
+    assert "Sign up for a yearly maintenance plan" in context
+
+
+def test_substring_of_a_hint_is_not_a_match():
+    html = '<body><div class="commenu-list"><p>Our four course tasting commenu changes every single week</p></div></body>'
+    context, _ = ContextBuilder(500).build(html)
+    assert "tasting commenu" in context
+
+
+def test_context_stays_within_budget():
+    html = "<body><main>" + "".join(f"<p>Paragraph {i} about roofing repairs and gutter cleaning work.</p>"
+                                    for i in range(200)) + "</main></body>"
+    context, stats = ContextBuilder(120).build(html)
+    assert estimate_tokens(context) <= 125
+    assert stats["saved_pct"] > 50
@@ -0,0 +1,22 @@
+import pytest
+
+from formbot.domains import group_by_domain, registrable_domain
+
+
+@pytest.mark.parametrize("url, domain", [
+    ("https://www.example.com/contact", "example.com"),
+    ("shop.example.co.uk", "example.co.uk"),
+    ("https://a.b.example.com.au/x?y=1", "example.com.au"),
+    ("http://example.org.", "example.org"),
+    ("http://127.0.0.1:8000/", "127.0.0.1"),
+    ("http://localhost:5000", "localhost"),
+    ("", ""),
+])
+def test_registrable_domain(url, domain):
+    assert registrable_domain(url) == domain
+
+
+def test_group_by_domain_keeps_first_seen_order():
+    urls = ["https://a.com/1", "https://b.org", "https://www.a.com/2", "https://shop.b.org/x"]
+    assert group_by_domain(urls) == {"a.com": ["https://a.com/1", "https://www.a.com/2"],
+                                     "b.org": ["https://b.org", "https://shop.b.org/x"]}
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+import requests
+
+from bench.fixture_server import FIXTURES_DIR, FixtureServer, load_manifest
+from bench.flow_bench import classify_status, percentile
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FixtureServer() as srv:
+        yield srv
+
+
+def _post(server, site, ajax=False):
+    headers = {"X-Requested-With": "XMLHttpRequest"} if ajax else {}
+    return requests.post(f"{server.base_url}/post/{site}", data={"email": "a@b.example", "message": "hi"},
+                         headers=headers, allow_redirects=False, timeout=5)
+
+
+def test_every_manifest_site_has_pages():
+    for site in load_manifest():
+        assert os.path.isfile(os.path.join(FIXTURES_DIR, site["site"], "index.html")), site["site"]
+
+
+def test_serves_static_pages(server):
+    resp = requests.get(server.url_for("cf7") + "contact/", timeout=5)
+    assert resp.status_code == 200 and "<form" in resp.text
+
+
+def test_classic_post_gets_the_confirmation_container(server):
+    resp = _post(server, "cf7")
+    assert resp.status_code == 200
+    assert 'class="wpcf7-response-output"' in resp.text and "It has been sent" in resp.text
+
+
+def test_ajax_post_gets_json(server):
+    assert _post(server, "elementor", ajax=True).json() == {"message": "The form was sent successfully."}
+    assert _post(server, "thankyou", ajax=True).json() == {"redirect": "/thankyou/thank-you/"}
+
+
+def test_post_to_a_site_with_a_thank_you_page_redirects(server):
+    resp = _post(server, "thankyou")
+    assert resp.status_code == 303 and resp.headers["Location"] == "/thankyou/thank-you/"
+
+
+def test_posts_are_counted_and_unknown_sites_rejected(server):
+    before = server.submission_counts().get("ninja", 0)
+    _post(server, "ninja")
+    assert server.submission_counts()["ninja"] == before + 1
+    assert _post(server, "nosuchsite").status_code == 404
+    assert "nosuchsite" not in server.submission_counts()
+
+
+@pytest.mark.parametrize("status, outcome", [
+    ("\x1b[32m[✓] form submitted and confirmed on http://x/contact\x1b[0m", "confirmed"),
+    ("[✓] Email sent (no contact form found for http://x)", "no_form"),
+    ("[X] Captcha/Anti-bot detected on http://x/contact", "captcha"),
+    ("[X] Parked domain http://x (for sale)", "parked"),
+    ("[Error] TimeoutException", "error"),
+    ("[X] Submitted (attempted) but no confirmation", "unconfirmed"),
+])
+def test_classify_status(status, outcome):
+    assert classify_status(status) == outcome
+
+
+def test_percentile():
+    assert percentile([], 95) == 0.0
+    assert percentile([3, 1, 2, 4], 50) in (2, 3) and percentile([3, 1, 2, 4], 95) == 4
@@ -0,0 +1,114 @@
+import pytest
+import requests
+import urllib3
+from bs4 import BeautifulSoup
+
+from formbot.http_submit import CONFIRMED, NEEDS_BROWSER, UNCONFIRMED, HttpFormSubmitter
+
+DATASET = {"name": "Jane Doe", "email": "jane@example.com", "phone": "5551234", "message": "Hello from Jane"}
+CONTACT = "https://acme.example/contact"
+FORM = """<html><body><form method="post" action="/send">
+<input type="hidden" name="_wpnonce" value="abc123">
+<input name="your-name" placeholder="Name">
+<input type="email" name="your-email">
+<div style="display:none"><input name="website_hp" value=""></div>
+<textarea name="your-message"></textarea>
+<label><input type="checkbox" name="privacy" value="yes"> I agree to the privacy policy</label>
+<label><input type="checkbox" name="optin" value="yes"> Email me marketing news and offers</label>
+<input type="checkbox" name="terms" value="1" required>
+<input type="checkbox" name="services[]" value="seo">
+<select name="topic"><option>Please select</option><option value="sales">Sales</option></select>
+<button type="submit" name="send" value="1">Send</button>
+</form></body></html>"""
+
+
+def _submitter(session=None):
+    return HttpFormSubmitter(DATASET, session=session or object())
+
+
+def test_build_payload():
+    payload = _submitter().build_payload(BeautifulSoup(FORM, "html.parser").form)
+    assert payload == [
+        ("_wpnonce", "abc123"), ("your-name", "Jane Doe"), ("your-email", "jane@example.com"),
+        ("website_hp", ""), ("your-message", "Hello from Jane"), ("privacy", "yes"), ("terms", "1"),
+        ("topic", "sales"), ("send", "1"),
+    ]
+
+
+def test_newsletter_opt_in_is_never_ticked():
+    names = [name for name, _ in _submitter().build_payload(BeautifulSoup(FORM, "html.parser").form)]
+    assert "optin" not in names and "services[]" not in names
+
+
+@pytest.mark.parametrize("post, outcome", [
+    ((200, "<p>Thank you for your message. It has been sent.</p>"), CONFIRMED),
+    ((200, "<p>Your message could not be processed.</p>"), UNCONFIRMED),
+    ((200, '{"status": "mail_sent"}', {"Content-Type": "application/json"}), CONFIRMED),
+    ((200, '{"redirect": "/contact"}', {"Content-Type": "application/json"}), UNCONFIRMED),
+    ((403, "<p>Forbidden</p>"), NEEDS_BROWSER),
+    ((419, "<p>Page expired</p>"), NEEDS_BROWSER),
+    ((503, "<p>Mailer timed out</p>"), UNCONFIRMED),  # the mail may already be out
+    (requests.exceptions.ConnectionError(urllib3.exceptions.ProtocolError(
+        "Connection aborted.", ConnectionResetError(104, "Connection reset by peer"))), UNCONFIRMED),
+    (requests.exceptions.ReadTimeout("read timed out"), UNCONFIRMED),
+    (requests.exceptions.ConnectTimeout("connect timed out"), NEEDS_BROWSER),
+    (requests.exceptions.ConnectionError(urllib3.exceptions.MaxRetryError(
+        None, "/send", urllib3.exceptions.NewConnectionError(None, "Connection refused"))), NEEDS_BROWSER),
+])
+def test_submit_outcomes(fake_session, post, outcome):
+    session = fake_session({CONTACT: (200, FORM)}, post=post)
+    result = _submitter(session).submit(CONTACT)
+    assert result.outcome == outcome
+    assert result.handled == (outcome != NEEDS_BROWSER)
+    assert session.calls[-1][:2] == ("POST", "https://acme.example/send")
+
+
+@pytest.mark.parametrize("form, reason", [
+    ('<form class="wpcf7-form hs-form" method="post"><textarea name="m"></textarea>'
+     '<button>Send</button></form>', "hs-form form"),
+    ('<form method="get"><textarea name="m"></textarea><button>Send</button></form>', "non-POST form"),
+    ('<form method="post" onsubmit="return send()"><textarea name="m"></textarea></form>', "scripted submit"),
+    ('<form method="post"><textarea></textarea><button>Send</button></form>', "unnamed fields"),
+])
+def test_js_dependent_forms_need_the_browser(fake_session, form, reason):
+    session = fake_session({CONTACT: (200, form)})
+    result = _submitter(session).submit(CONTACT)
+    assert (result.outcome, result.reason) == (NEEDS_BROWSER, reason)
+    assert all(method == "GET" for method, _, _ in session.calls)
+
+
+def test_wrapper_classes_containing_hidden_are_not_honeypots():
+    form = FORM.replace('<input name="your-name"', '<div class="overflow-hidden hidden-xs"><input name="your-name"') \
+        .replace('<textarea name="your-message"></textarea>', '<textarea name="your-message"></textarea></div>')
+    payload = dict(_submitter().build_payload(BeautifulSoup(form, "html.parser").form))
+    assert payload["your-name"] == "Jane Doe" and payload["your-message"] == "Hello from Jane"
+
+
+@pytest.mark.parametrize("wrapper", ['<div class="hp-field">', '<div class="screen-reader-text">', '<div hidden>'])
+def test_form_whose_fields_all_look_hidden_is_left_to_the_browser(fake_session, wrapper):
+    form = ('<form method="post"><input type="hidden" name="n" value="1">' + wrapper +
+            '<input name="your-email" required><textarea name="msg"></textarea></div>'
+            '<button type="submit">Send</button></form>')
+    session = fake_session({CONTACT: (200, form)}, post=(200, "thank you"))
+    result = _submitter(session).submit(CONTACT)
+    assert result.outcome == NEEDS_BROWSER and result.reason.startswith("empty required fields: msg")
+    assert all(method == "GET" for method, _, _ in session.calls)
+
+
+def test_flow_falls_back_to_the_browser_when_the_http_path_crashes(monkeypatch):
+    import formbot.flow as flow_mod
+    from formbot.admission import AdmissionTimeout
+    from formbot.triage import TriageResult
+
+    class NoSlots:
+        def acquire(self, caller):
+            raise AdmissionTimeout("no slot (test)")
+
+    def broken_submit(contact_url, dataset):
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    monkeypatch.setattr(flow_mod, "triage_url", lambda url: TriageResult(url, contact_url=CONTACT))
+    monkeypatch.setattr(flow_mod, "try_http_submit", broken_submit)
+    monkeypatch.setattr(flow_mod, "get_admission", lambda: NoSlots())
+    status = flow_mod.FormFlow("https://acme.example", DATASET).run()
+    assert "Browser capacity busy" in status  # reached the browser path instead of raising
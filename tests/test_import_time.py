@@ -0,0 +1,25 @@
+"""Import-time budget for the entry modules (see bench/import_bench.py).
+
+FORMBOT_IMPORT_BUDGET_MS overrides the budget on slow CI machines.
+"""
+import os
+
+import pytest
+
+from bench.import_bench import measure, measure_median
+
+BUDGET_MS = float(os.getenv("FORMBOT_IMPORT_BUDGET_MS", "500"))
+ENTRY_MODULES = ["app", "aiseo"]
+
+
+@pytest.mark.parametrize("module", ENTRY_MODULES)
+def test_heavy_dependencies_load_lazily(module):
+    assert measure(module)["heavy"] == []
+
+
+@pytest.mark.parametrize("module", ENTRY_MODULES)
+def test_import_time_within_budget(module):
+    result = measure_median(module, repeat=3)
+    assert result["median_ms"] <= BUDGET_MS, (
+        f"import {module} took {result['median_ms']:.0f} ms (budget {BUDGET_MS:.0f} ms); slowest: {result['top'][:5]}"
+    )
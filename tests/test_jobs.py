@@ -0,0 +1,82 @@
+import asyncio
+import queue
+from collections import deque
+
+from formbot.jobs import LAGGED, Job, JobManager, coalesce, format_sse
+
+
+def _drain(sub):
+    items = []
+    while True:
+        try:
+            items.append(sub.get_nowait())
+        except queue.Empty:
+            return items
+
+
+def test_format_sse():
+    assert format_sse(3, None, {"url": "a"}) == 'id: 3\ndata: {"url": "a"}\n\n'
+    assert format_sse(0, "done", "All URLs processed") == "event: done\ndata: All URLs processed\n\n"
+
+
+def test_reconnect_replays_only_missed_events():
+    job = Job("j1", ["https://a.example"])
+    job.emit("https://a.example", "triage")
+    job.emit("https://a.example", "result", status="[✓] confirmed")
+    sub = job.subscribe(after=1)
+    assert [seq for seq, _, _ in _drain(sub)] == [2]
+    job.finish({"ok": 1})
+    assert [kind for _, kind, _ in _drain(sub)] == ["stats", "done"]
+    assert job.results == {"https://a.example": "[✓] confirmed"} and job.done
+
+
+def test_pitch_deltas_for_one_url_are_coalesced():
+    backlog = deque([(2, None, {"url": "a", "stage": "pitch", "delta": "lo "}),
+               (3, None, {"url": "a", "stage": "pitch", "delta": "there"}),
+               (4, None, {"url": "b", "stage": "pitch", "delta": "Hi"}),
+               (5, None, {"url": "a", "stage": "pitch", "delta": "!"})])
+    item, carry = coalesce((1, None, {"url": "a", "stage": "pitch", "delta": "Hel"}), backlog.popleft)
+    assert item == (3, None, {"url": "a", "stage": "pitch", "delta": "Hello there"})
+    assert carry[2]["url"] == "b" and len(backlog) == 1  # order is kept: "!" waits behind b's delta
+
+
+def test_slow_subscriber_is_dropped_with_lagged():
+    job = Job("j2", [])
+    sub = job.subscribe()
+    sub.max_backlog = 3
+    for i in range(5):
+        job.emit("https://a.example", "pitch", delta=str(i))
+    items = _drain(sub)
+    assert items[-1] is LAGGED and len(items) == 4
+    assert job.subscribers == 0
+
+
+def test_async_subscribers_get_events_on_their_loop():
+    async def watch(job):
+        sub = job.subscribe(loop=asyncio.get_running_loop())
+        await asyncio.get_running_loop().run_in_executor(None, job.emit, "https://a.example", "fill")
+        return await asyncio.wait_for(sub.aget(), 1)
+
+    job = Job("j3", [])
+    seq, kind, data = asyncio.run(watch(job))
+    assert seq == 1 and data == {"url": "https://a.example", "stage": "fill"}
+
+
+def test_last_viewer_leaving_cancels_a_fill_job():
+    cancelled = []
+    job = Job("j4", ["https://a.example"], cancel_when_idle=True)
+    job.cancel_cb = lambda: cancelled.append(job.id)
+    first, second = job.subscribe(), job.subscribe()
+    job.unsubscribe(first)
+    assert not job.cancelled
+    job.unsubscribe(second)
+    assert job.cancelled and cancelled == ["j4"]
+
+
+def test_finished_jobs_expire_after_ttl():
+    manager = JobManager(ttl=-1)
+    old = manager.create(["https://a.example"])
+    old.finish()
+    running = manager.create(["https://b.example"])
+    assert manager.get(old.id) is None and manager.get(running.id) is running
+    assert manager.stats() == {"jobs": 1, "running": 1, "subscribers": 0}
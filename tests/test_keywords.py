@@ -0,0 +1,40 @@
+from formbot.keywords import BackgroundCorpus, LocalKeywordExtractor, segments, text_ngrams
+
+TEXT = ("Personal injury law firm. Free case review, car accident claims. Personal injury attorneys "
+        "since 1990. Car accident claims handled by a family owned personal injury law firm.")
+
+
+def test_ngrams_never_cross_sentence_or_list_boundaries():
+    grams = set(text_ngrams("Free case review. Personal injury, car accident claims"))
+    assert "free case review" in grams and "car accident claims" in grams
+    assert "review personal" not in grams
+    assert "injury car" not in grams
+
+
+def test_segments_split_on_punctuation():
+    assert segments("Roof repair | gutters; storm damage (since 1990)") == [
+        ["roof", "repair"], ["gutters"], ["storm", "damage"], ["since"]]
+
+
+def test_generic_words_are_not_keywords():
+    picked = LocalKeywordExtractor().extract(TEXT, "SEO", top_k=12)
+    assert "personal injury law" in picked and "car accident claims" in picked
+    assert not {"since", "owned", "offer"} & set(picked)
+    assert not any("review claims" in p or "firm personal" in p for p in picked)
+
+
+def test_corpus_idf_and_roundtrip(tmp_path):
+    path = tmp_path / "corpus.bin"
+    corpus = BackgroundCorpus(path=path, bits=12, autosave_every=2)
+    corpus.add_document("dental implants and teeth whitening")
+    corpus.add_document("dental implants, veneers")  # second document triggers the autosave
+    assert path.exists()
+    assert corpus.idf("dental implants") < corpus.idf("veneers") < corpus.idf("roof repair")
+    loaded = BackgroundCorpus.load(path)
+    assert loaded.n_docs == 2 and loaded.bits == 12
+    assert loaded.idf("dental implants") == corpus.idf("dental implants")
+
+
+def test_service_terms_are_boosted():
+    text = "Roof repair. Roof repair. Gutter cleaning. Gutter cleaning."
+    assert LocalKeywordExtractor().extract(text, "gutter services", top_k=1) == ["gutter cleaning"]
@@ -0,0 +1,100 @@
+import pytest
+
+import formbot.multistep as multistep
+from formbot.multistep import MultiStepEngine
+from formbot.pitch_service import PitchError
+
+
+class _Control:
+    def __init__(self, ref):
+        self.id = ref
+
+
+def _row(ref, tag="input", ftype="text", name=None):
+    return [_Control(ref), tag, ftype, name or ref, "", "", False]
+
+
+class _Wizard:
+    """A form whose steps each reveal more controls; pages[i] is what is visible after i advances."""
+
+    def __init__(self, pages, confirm_at=None):
+        self.pages, self.confirm_at = pages, confirm_at
+        self.step = 0
+
+    def visible(self):
+        return [row for page in self.pages[:self.step + 1] for row in page]
+
+    def advance(self):
+        if self.step + 1 >= len(self.pages) + 1:
+            return False
+        self.step += 1
+        return True
+
+    def run(self):  # the SuccessChecker
+        return self.confirm_at is not None and self.step >= self.confirm_at
+
+
+class _Filler:
+    def __init__(self, fail_on=None):
+        self.filled, self.fail_on = [], fail_on
+
+    def _choose_key(self, attr):
+        return "message" if "message" in attr else None
+
+    def fill_control(self, el, tag, ftype, attr, checked):
+        if el.id == self.fail_on:
+            raise PitchError("Quota exhausted.", permanent=True)
+        self.filled.append(el.id)
+
+
+def _engine(monkeypatch, wizard, filler=None):
+    monkeypatch.setattr(multistep, "page_call", lambda driver, name: wizard.visible())
+    engine = MultiStepEngine(None, filler or _Filler(), wizard, max_steps=4, reveal_wait=0)
+    engine.mark_filled()
+    return engine
+
+
+def test_only_revealed_controls_are_filled_message_last(monkeypatch):
+    wizard = _Wizard([
+        [_row("name"), _row("email", ftype="email")],
+        [_row("message", tag="textarea"), _row("phone", ftype="tel"),
+         _row("budget-low", ftype="radio", name="budget"), _row("budget-high", ftype="radio", name="budget")],
+        [],
+    ], confirm_at=2)
+    engine = _engine(monkeypatch, wizard)
+    wizard.step = 1  # the first submit revealed step two
+    assert engine.run(wizard)
+    assert engine.filler.filled == ["phone", "budget-low", "message"]
+    assert [(s["fields"], s["advanced"], s["confirmed"]) for s in engine.steps] == [(3, True, True)]
+
+
+def test_radio_group_seen_in_the_first_step_is_not_refilled(monkeypatch):
+    wizard = _Wizard([[_row("plan-a", ftype="radio", name="plan")], [_row("plan-b", ftype="radio", name="plan")]])
+    engine = _engine(monkeypatch, wizard)
+    wizard.step = 1
+    assert engine.delta() == [] and "plan-b" in engine.filled
+
+
+def test_stops_once_nothing_new_appears(monkeypatch):
+    wizard = _Wizard([[_row("name")], [_row("company")], [], [], []])
+    engine = _engine(monkeypatch, wizard)
+    wizard.step = 1
+    assert not engine.run(wizard)
+    assert [s["fields"] for s in engine.steps] == [1, 0, 0]
+    assert [s["advanced"] for s in engine.steps] == [True, True, False]  # two idle steps end the wizard
+
+
+def test_revealed_reports_a_new_step(monkeypatch):
+    wizard = _Wizard([[_row("name")], [_row("company")]])
+    engine = _engine(monkeypatch, wizard)
+    assert not engine.revealed()
+    wizard.step = 1
+    assert engine.revealed()
+
+
+def test_pitch_failure_is_not_swallowed(monkeypatch):
+    wizard = _Wizard([[_row("name")], [_row("message", tag="textarea")]])
+    engine = _engine(monkeypatch, wizard, _Filler(fail_on="message"))
+    wizard.step = 1
+    with pytest.raises(PitchError):
+        engine.run(wizard)
@@ -0,0 +1,69 @@
+import json
+
+import openai
+import pytest
+import requests
+
+from bench.openai_stub import OpenAIStub, StubConfig, parse_latency
+
+PROMPT = [{"role": "user", "content": 'Write a pitch from "Leado" offering "SEO" to this site.'}]
+
+
+def _client(stub):
+    return openai.OpenAI(api_key="local-stub", base_url=stub.base_url, max_retries=0)
+
+
+@pytest.fixture
+def stub():
+    with OpenAIStub(config=StubConfig(latency="fixed:0", token_delay=0)) as srv:
+        yield srv
+
+
+def test_chat_completion_through_the_openai_client(stub):
+    reply = _client(stub).chat.completions.create(model="gpt-4.1-mini", messages=PROMPT)
+    text = reply.choices[0].message.content
+    assert "At Leado, we specialise in SEO" in text and reply.usage.total_tokens > 0
+
+
+def test_json_mode(stub):
+    reply = _client(stub).chat.completions.create(model="gpt-4.1-mini", messages=PROMPT,
+                                                  response_format={"type": "json_object"})
+    body = json.loads(reply.choices[0].message.content)
+    assert len(body["keywords"]) == 8 and "Leado" in body["pitch"]
+
+
+def test_streaming(stub):
+    chunks = _client(stub).chat.completions.create(model="gpt-4.1-mini", messages=PROMPT, stream=True)
+    text = "".join(c.choices[0].delta.content or "" for c in chunks)
+    assert text.startswith("Hi there!") and "the Leado team." in text
+
+
+def test_rpm_limit_answers_429_with_retry_after():
+    config = StubConfig(latency="fixed:0", rpm_limit=1, retry_after=2)
+    with OpenAIStub(config=config) as stub:
+        client = _client(stub)
+        client.chat.completions.create(model="gpt-4.1-mini", messages=PROMPT)
+        with pytest.raises(openai.RateLimitError) as err:
+            client.chat.completions.create(model="gpt-4.1-mini", messages=PROMPT)
+        assert err.value.response.headers["retry-after"] == "2"
+        assert stub.stats.snapshot() == {"requests": 2, "ok": 1, "rate_limited": 1}
+
+
+def test_error_injection():
+    with OpenAIStub(config=StubConfig(latency="fixed:0", error_rate=1.0)) as stub:
+        with pytest.raises(openai.InternalServerError):
+            _client(stub).chat.completions.create(model="gpt-4.1-mini", messages=PROMPT)
+        assert stub.stats.snapshot()["errors"] == 1
+
+
+def test_unknown_route_and_models(stub):
+    assert requests.get(stub.base_url + "/models", timeout=5).json()["data"][0]["id"] == "gpt-4.1-mini"
+    assert requests.post(stub.base_url + "/embeddings", json={}, timeout=5).status_code == 404
+
+
+def test_parse_latency():
+    assert parse_latency("fixed:0.5")() == 0.5
+    assert 0.2 <= parse_latency("uniform:0.2,0.4")() <= 0.4
+    assert parse_latency("normal:0,0.001")() >= 0.0
+    with pytest.raises(ValueError):
+        parse_latency("pareto:1")
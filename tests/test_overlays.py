@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+from selenium.webdriver.common.by import By
+
+import formbot.overlays as overlays
+from formbot.overlays import ConsentMemory, dismiss_overlays
+
+
+class _Script:
+    """Plays the injected dismiss script: one canned result per call, recording its arguments."""
+
+    def __init__(self, *results):
+        self.results, self.calls = list(results), []
+
+    def __call__(self, driver, name, preferred, force_remove):
+        assert name == "dismiss_overlays"
+        self.calls.append((preferred, force_remove))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class _ConsentButton:
+    def __init__(self):
+        self.clicked = False
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.clicked = True
+
+
+class _PageWithConsentFrames:
+    """Cross-origin iframes; only the ones in `buttons` hold an accept button."""
+
+    def __init__(self, frames, buttons):
+        self.frames, self.buttons = frames, buttons
+        self.current_url = "https://shop.acme.co.uk/contact"
+        self.inside = None
+        self.switch_to = SimpleNamespace(frame=self._enter, default_content=lambda: self._enter(None))
+
+    def _enter(self, frame):
+        self.inside = frame
+
+    def find_elements(self, by, value):
+        if by == By.TAG_NAME:
+            return list(self.frames)
+        return self.buttons.get(self.inside, [])
+
+
+def _run(monkeypatch, driver, memory, *results):
+    script = _Script(*results)
+    monkeypatch.setattr(overlays, "page_call", script)
+    monkeypatch.setattr(overlays.time, "sleep", lambda s: None)
+    return dismiss_overlays(driver, memory=memory), script.calls
+
+
+def test_consent_memory_is_per_registrable_domain(tmp_path):
+    path = tmp_path / "consent.json"
+    memory = ConsentMemory(str(path))
+    memory.put("https://www.acme.co.uk/", "onetrust")
+    assert memory.get("https://shop.acme.co.uk/contact") == "onetrust"
+    assert memory.get("https://other.co.uk/") is None
+    assert ConsentMemory(str(path)).get("acme.co.uk") == "onetrust"
+
+
+def test_unreadable_memory_starts_empty(tmp_path):
+    path = tmp_path / "consent.json"
+    path.write_text("{not json")
+    assert ConsentMemory(str(path)).get("acme.co.uk") is None
+
+
+def test_remembered_handler_is_tried_first_and_kept(monkeypatch, tmp_path):
+    memory = ConsentMemory(str(tmp_path / "consent.json"))
+    memory.put("acme.co.uk", "cookiebot")
+    driver = _PageWithConsentFrames([], {})
+    handler, calls = _run(monkeypatch, driver, memory, {"handler": "cookiebot", "frames": [], "removed": 1})
+    assert handler == "cookiebot" and calls == [("cookiebot", False)]
+
+
+def test_cross_origin_consent_frame_is_clicked(monkeypatch):
+    button = _ConsentButton()
+    driver = _PageWithConsentFrames(["ads", "sp_message"], {"sp_message": [button]})
+    memory = ConsentMemory()
+    handler, calls = _run(monkeypatch, driver, memory, {"handler": None, "frames": [0, 1, 7], "removed": 0})
+    assert handler == "frame" and button.clicked and driver.inside is None
+    assert memory.get(driver.current_url) == "frame" and calls == [(None, False)]
+
+
+def test_banner_is_removed_when_no_frame_accepts(monkeypatch):
+    driver = _PageWithConsentFrames(["sp_message"], {})
+    memory = ConsentMemory()
+    handler, calls = _run(monkeypatch, driver, memory, {"handler": None, "frames": [0], "removed": 0},
+                          {"handler": None, "frames": [], "removed": 2})
+    assert handler is None and calls == [(None, False), (None, True)]
+    assert memory.get(driver.current_url) is None
+
+
+def test_script_failure_is_not_fatal(monkeypatch):
+    handler, _ = _run(monkeypatch, _PageWithConsentFrames([], {}), ConsentMemory(),
+                      RuntimeError("javascript error: document unloaded"))
+    assert handler is None
@@ -0,0 +1,83 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from formbot.page_lib import PageLibrary
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run the in-page scripts")
+
+
+class _NodePage:
+    """A page whose documents are simulated in node: each execute_script replays the document's
+    new-document scripts and earlier calls against a fresh `window`, then runs the new call."""
+
+    def __init__(self, cdp=True):
+        self.cdp = cdp
+        self.on_new_document = {}
+        self.document = []
+        self.cdp_calls = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_calls.append(cmd)
+        if not self.cdp:
+            raise RuntimeError("CDP not available")
+        if cmd == "Page.addScriptToEvaluateOnNewDocument":
+            ident = str(len(self.cdp_calls))
+            self.on_new_document[ident] = params["source"]
+            return {"identifier": ident}
+        self.on_new_document.pop(params["identifier"], None)
+
+    def get(self, url):
+        self.document = list(self.on_new_document.values())
+
+    def execute_script(self, script, *args):
+        call = f"(function () {{\n{script}\n}}).apply(null, {json.dumps(list(args))})"
+        program = "const window = {};\n" + ";\n".join(self.document + [f"console.log(JSON.stringify({call}))"])
+        out = subprocess.run(["node", "-e", program], capture_output=True, text=True, timeout=20, check=True)
+        self.document.append(call)
+        return json.loads(out.stdout)
+
+
+def _library():
+    lib = PageLibrary()
+    lib.register("add", "return arguments[0] + arguments[1];")
+    lib.register("count", "window.hits = (window.hits || 0) + 1; return window.hits;")
+    return lib
+
+
+def test_new_documents_get_the_library_once():
+    lib, page = _library(), _NodePage()
+    page.get("https://a.example")
+    assert lib.call(page, "add", 2, 3) == 5  # installed lazily: this document needs the full source
+    page.get("https://a.example/contact")
+    assert lib.call(page, "count") == 1 and lib.call(page, "count") == 2  # same document, state kept
+    assert page.cdp_calls == ["Page.addScriptToEvaluateOnNewDocument"]
+    stats = lib.stats()
+    assert stats["calls"] == 3 and stats["fallbacks"] == 1 and stats["cdp_installs"] == 1
+
+
+def test_without_cdp_each_document_is_installed_on_first_call():
+    lib, page = _library(), _NodePage(cdp=False)
+    page.get("https://a.example")
+    assert lib.call(page, "add", 1, 1) == 2
+    assert lib.call(page, "add", 2, 2) == 4
+    page.get("https://a.example/contact")
+    assert lib.call(page, "add", 3, 3) == 6
+    assert lib.stats()["fallbacks"] == 2 and len(page.cdp_calls) == 1  # CDP not retried per call
+
+
+def test_a_new_script_version_replaces_the_installed_one():
+    lib, page = _library(), _NodePage()
+    page.get("https://a.example")
+    lib.call(page, "add", 1, 2)
+    old = lib.version
+    lib.register("double", "return arguments[0] * 2;")
+    assert lib.version != old
+    assert lib.call(page, "double", 21) == 42  # this document still has the old version: fallback
+    page.get("https://a.example/contact")
+    assert lib.call(page, "double", 4) == 8
+    assert page.cdp_calls == ["Page.addScriptToEvaluateOnNewDocument", "Page.removeScriptToEvaluateOnNewDocument",
+                              "Page.addScriptToEvaluateOnNewDocument"]
+    assert list(page.on_new_document) == [page._formbot_lib_id] and lib.stats()["fallbacks"] == 2
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from formbot.pitch_service import PitchService, TokenBucket, classify_error
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    async def run():
+        bucket = TokenBucket(per_minute=600, capacity=2)  # 10 tokens/s
+        started = time.monotonic()
+        waits = [await bucket.acquire() for _ in range(4)]
+        return waits, time.monotonic() - started
+
+    waits, elapsed = asyncio.run(run())
+    assert waits[:2] == [0.0, 0.0]
+    assert all(w > 0 for w in waits[2:])
+    assert 0.15 <= elapsed < 1.0
+
+
+def test_token_bucket_caps_oversized_requests_at_capacity():
+    async def run():
+        bucket = TokenBucket(per_minute=60, capacity=5)
+        return await bucket.acquire(50)
+
+    assert asyncio.run(run()) == 0.0
+
+
+class _ApiError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def test_classify_error():
+    assert classify_error(_ApiError("slow down", 429))[0] is True
+    assert classify_error(_ApiError("bad gateway", 502))[0] is True
+    assert classify_error(_ApiError("nope", 401)) == (False, "Invalid API key.")
+    assert classify_error(_ApiError("error: insufficient_quota", 429))[0] is False
+    assert classify_error(asyncio.TimeoutError())[0] is True
+
+
+# ---------- Streaming ----------
+class _Stream:
+    """An async chunk stream: words after an optional first-token delay, optionally dying midway."""
+
+    def __init__(self, words, first_delay=0.0, fail_after=None):
+        self.words, self.first_delay, self.fail_after = words, first_delay, fail_after
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        await asyncio.sleep(self.first_delay)
+        for i, word in enumerate(self.words):
+            if i == self.fail_after:
+                raise _ApiError("stream reset", 502)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+            await asyncio.sleep(0)
+
+    async def close(self):
+        self.closed = True
+
+
+class _Completions:
+    def __init__(self, streams):
+        self.streams = list(streams)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        self.calls += 1
+        return self.streams.pop(0)
+
+
+def _service(*streams, **kwargs):
+    completions = _Completions(streams)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return PitchService(client, backoff_base=0.01, **kwargs), completions
+
+
+def test_streamed_tokens_are_forwarded_in_order():
+    service, _ = _service(_Stream(["Hi ", "there", "!"]))
+    tokens = []
+    assert service.generate("pitch", on_token=tokens.append) == "Hi there!"
+    assert tokens == ["Hi ", "there", "!"]
+
+
+def test_a_stream_that_dies_midway_is_reset_and_retried():
+    broken = _Stream(["Hel", "lo"], fail_after=1)
+    service, completions = _service(broken, _Stream(["Hello ", "again"]))
+    tokens, resets = [], []
+    text = service.generate("pitch", on_token=tokens.append, on_reset=lambda: resets.append(len(tokens)))
+    assert text == "Hello again" and completions.calls == 2 and broken.closed
+    assert resets == [1] and tokens == ["Hel", "Hello ", "again"]  # the UI clears the partial "Hel"
+    assert service.stats()["retries"] == 1
+
+
+def test_only_the_first_streaming_attempt_reaches_the_caller():
+    slow, fast = _Stream(["slow ", "primary"], first_delay=0.3), _Stream(["fast ", "hedge"])
+    service, _ = _service(slow, fast, hedge_after=0.05)
+    tokens = []
+    assert service.generate("pitch", on_token=tokens.append) == "fast hedge"
+    assert tokens == ["fast ", "hedge"]
+    assert service.stats()["hedges"] == 1 and service.stats()["hedge_wins"] == 1
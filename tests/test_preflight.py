@@ -0,0 +1,38 @@
+from formbot import preflight as preflight_mod
+
+
+class _Resolution:
+    source = "manifest"
+
+    def __init__(self):
+        self.calls = []
+
+    def resolve(self, refresh=False, offline=None):
+        self.calls.append({"refresh": refresh, "offline": offline})
+        return {"driver_path": "/opt/chromedriver", "chrome_version": "126.0.6478.126"}
+
+
+def _run(monkeypatch, **kwargs):
+    resolution = _Resolution()
+    monkeypatch.setattr(preflight_mod, "get_resolution", lambda: resolution)
+    return preflight_mod.preflight(launch=False, **kwargs), resolution.calls
+
+
+def test_environment_offline_mode_is_honoured(monkeypatch):
+    monkeypatch.setenv("FORMBOT_OFFLINE", "1")
+    report, calls = _run(monkeypatch)
+    assert calls == [{"refresh": False, "offline": None}]  # the resolver reads FORMBOT_OFFLINE itself
+    assert report["offline"] is True and report["driver_path"] == "/opt/chromedriver"
+
+
+def test_offline_flag_forces_offline_resolution(monkeypatch):
+    monkeypatch.setenv("FORMBOT_OFFLINE", "")
+    report, calls = _run(monkeypatch, offline=True, refresh=True)
+    assert calls == [{"refresh": True, "offline": True}]
+    assert report["offline"] is True
+
+
+def test_online_by_default(monkeypatch):
+    monkeypatch.delenv("FORMBOT_OFFLINE", raising=False)
+    report, calls = _run(monkeypatch)
+    assert calls[0]["offline"] is None and report["offline"] is False
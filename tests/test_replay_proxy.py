@@ -0,0 +1,80 @@
+import shutil
+
+import pytest
+import requests
+import urllib3
+
+from bench.corpus import diff_levels
+from bench.replay_proxy import Archive, ReplayIndex, ReplayProxy, load_corpus
+
+HTML = [("Content-Type", "text/html")]
+
+
+def _archive():
+    archive = Archive(meta={"url": "https://acme.example", "outcome": "confirmed"})
+    archive.add("GET", "https://acme.example/", 200, HTML, b"<h1>Acme</h1>", 0.12)
+    archive.add("GET", "http://acme.example/contact?utm=1", 200, HTML, b"<form>v1</form>", 0.05)
+    archive.add("GET", "http://acme.example/contact?utm=1", 200, HTML, b"<form>v2</form>", 0.05)
+    archive.add("POST", "http://acme.example/send", 303, [("Location", "/thanks")], b"", 0.3)
+    archive.add("GET", "https://acme.example/logo", 200, HTML, b"<h1>Acme</h1>", 0.01)
+    return archive
+
+
+def test_archive_round_trip_dedupes_bodies(tmp_path):
+    _archive().save(tmp_path / "acme.zip")
+    (tmp_path / "notes.txt").write_text("ignored")
+    (loaded,) = load_corpus(str(tmp_path))
+    assert len(loaded) == 5 and len(loaded.bodies) == 4
+    assert loaded.meta["outcome"] == "confirmed" and loaded.entries[3]["status"] == 303
+
+
+def test_index_replays_repeats_in_order_and_falls_back_by_path():
+    index = ReplayIndex([_archive()])
+    bodies = [index.lookup("GET", "http://acme.example/contact?utm=1")["body"] for _ in range(3)]
+    assert bodies == [b"<form>v1</form>", b"<form>v2</form>", b"<form>v2</form>"]
+    assert index.lookup("GET", "http://acme.example/contact?utm=2")["body"] == b"<form>v1</form>"
+    assert index.lookup("GET", "http://acme.example/about") is None
+    assert index.lookup("GET", "https://acme.example/send") is None  # only POSTed in the archive
+    assert index.stats() == {"hits": 3, "fuzzy": 1, "misses": 2}
+    index.rewind()
+    assert index.lookup("GET", "http://acme.example/contact?utm=1")["body"] == b"<form>v1</form>"
+
+
+@pytest.fixture(scope="module")
+def proxy(tmp_path_factory):
+    if shutil.which("openssl") is None:
+        pytest.skip("needs openssl for the interception certificate")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("FORMBOT_STATE_DIR", str(tmp_path_factory.mktemp("state")))
+        with ReplayProxy("replay", [_archive()]) as srv:
+            yield srv
+
+
+def test_replays_plain_http_through_the_proxy(proxy):
+    via = {"http": proxy.url}
+    resp = requests.post("http://acme.example/send", data={"m": "hi"}, proxies=via, allow_redirects=False, timeout=5)
+    assert resp.status_code == 303 and resp.headers["Location"] == "/thanks"
+    missing = requests.get("http://acme.example/nowhere", proxies=via, timeout=5)
+    assert missing.status_code == 404 and b"not in archive" in missing.content
+
+
+def test_replays_https_behind_its_own_certificate(proxy):
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    resp = requests.get("https://acme.example/", proxies={"https": proxy.url}, verify=False, timeout=5)
+    assert resp.status_code == 200 and resp.text == "<h1>Acme</h1>"
+
+
+def _level(outcomes, total, stage_p50):
+    return {"concurrency": 2, "stages": {"fill": {"p50": stage_p50}},
+            "results": [{"url": url, "outcome": outcome, "timings": {"total": total}}
+                        for url, outcome in outcomes.items()]}
+
+
+def test_diff_flags_regressions_and_latency_changes():
+    before = _level({"a": "confirmed", "b": "no_form"}, 10.0, 2.0)
+    after = _level({"a": "unconfirmed", "b": "no_form", "c": "confirmed"}, 12.5, 1.5)
+    diff = diff_levels(before, after)
+    assert diff["regressions"] == [{"url": "a", "before": "confirmed", "after": "unconfirmed"}]
+    assert diff["new_urls"] == ["c"]
+    assert diff["stages"]["fill"] == {"before_p50": 2.0, "after_p50": 1.5, "delta": -0.5, "delta_pct": -25.0}
+    assert diff["movers"][0] == {"url": "a", "delta": 2.5}
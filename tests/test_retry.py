@@ -0,0 +1,78 @@
+import time
+
+from formbot.pitch_service import PitchError
+from formbot.retry import PERMANENT, SUCCESS, TRANSIENT, UNKNOWN, RetryScheduler, VerdictMemory, classify
+
+
+class TimeoutException(Exception):
+    """Same name as selenium's, which is all classify() looks at."""
+
+
+def test_classify_statuses():
+    assert classify("[✓] form submitted and confirmed on https://a.com/contact") == (SUCCESS, "")
+    assert classify("[X] Captcha/Anti-bot detected on https://a.com/contact") == (PERMANENT, "captcha")
+    assert classify("[✓] Email sent (no contact form found for https://a.com)") == (PERMANENT, "no_form")
+    assert classify("[X] Submitted (attempted) but no confirmation", submitted=True) == (UNKNOWN, "unconfirmed")
+
+
+def test_classify_errors():
+    assert classify("[Error]", TimeoutException("page load")) == (TRANSIENT, "TimeoutException")
+    assert classify("[Error]", TimeoutException("page load"), submitted=True) == (UNKNOWN, "after_submit")
+    assert classify("[Error]", Exception("unknown error: net::ERR_NAME_NOT_RESOLVED")) == (PERMANENT, "unreachable")
+
+
+def test_failed_pitch_is_never_a_site_verdict():
+    # quota/key failures are raised as permanent PitchErrors: our problem, not the site's
+    for error in (PitchError("Quota exhausted.", permanent=True), PitchError("HTTP 503", permanent=False)):
+        verdict, reason = classify("[X] Skipped https://a.com: pitch generation failed", error)
+        assert (verdict, reason) == (UNKNOWN, "not_pitched")
+
+
+def test_verdict_memory_keeps_permanent_verdicts_only(tmp_path):
+    path = tmp_path / "verdicts.json"
+    memory = VerdictMemory(path)
+    memory.record("a.com", PERMANENT, "captcha", "[X] Captcha")
+    memory.record("b.com", TRANSIENT, "TimeoutException", "[Error]")
+    assert memory.get("https://a.com/")["reason"] == "captcha"
+    assert memory.get("b.com") is None
+    assert VerdictMemory(path).get("a.com")["verdict"] == PERMANENT  # persisted
+    memory.record("a.com", SUCCESS, "", "[✓]")
+    assert memory.get("a.com") is None
+
+
+def test_verdict_memory_expires(tmp_path):
+    memory = VerdictMemory(tmp_path / "verdicts.json", ttl=60)
+    memory.record("a.com", PERMANENT, "no_form", "[✓] Email sent")
+    memory._data[memory._key("a.com")]["at"] = int(time.time()) - 120
+    assert memory.get("a.com") is None
+    assert len(memory) == 0
+
+
+def test_scheduler_retries_transient_until_attempts_run_out():
+    scheduler = RetryScheduler(["a", "b"], max_attempts=2, base_delay=0.05)
+    seen = []
+    for url, attempt in scheduler:
+        seen.append((url, attempt))
+        verdict = TRANSIENT if url == "a" else PERMANENT
+        if scheduler.retry(url, verdict, "TimeoutException") is None:
+            scheduler.done(url, verdict)
+    assert seen == [("a", 1), ("b", 1), ("a", 2)]
+    stats = scheduler.stats()
+    assert stats["retries"] == 1 and stats["exhausted"] == 1
+    assert stats["by_reason"] == {"TimeoutException": 1}
+
+
+def test_scheduler_runs_fresh_urls_while_a_retry_backs_off():
+    scheduler = RetryScheduler(["a", "b", "c"], max_attempts=3, base_delay=0.2)
+    order = []
+    for url, attempt in scheduler:
+        order.append((url, attempt))
+        if url == "a" and attempt == 1:
+            scheduler.retry(url, TRANSIENT, "TimeoutException")
+    assert order == [("a", 1), ("b", 1), ("c", 1), ("a", 2)]
+
+
+def test_backoff_is_capped():
+    scheduler = RetryScheduler([], base_delay=2, max_delay=10)
+    assert 1 <= scheduler.backoff(1) <= 2
+    assert scheduler.backoff(10) <= 10
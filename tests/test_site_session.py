@@ -0,0 +1,75 @@
+import formbot.site_session as site_session
+from formbot.site_session import SiteSessions, site_key
+
+
+class _Supervisor:
+    def __init__(self):
+        self.recycle, self.jobs = set(), []
+
+    def should_recycle(self, driver):
+        return driver in self.recycle
+
+    def job(self, driver):
+        self.jobs.append(driver)
+
+
+class _Lease:
+    def __init__(self):
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+def _sessions(monkeypatch):
+    supervisor, cleaned = _Supervisor(), []
+    monkeypatch.setattr(site_session, "get_supervisor", lambda: supervisor)
+    monkeypatch.setattr(site_session.DriverManager, "cleanup", staticmethod(cleaned.append))
+    return SiteSessions(), supervisor, cleaned
+
+
+def test_site_key():
+    assert site_key("https://www.acme.co.uk/a") == site_key("http://shop.acme.co.uk/b") == "acme.co.uk"
+    assert site_key("http://127.0.0.1:8765/cf7/") != site_key("http://127.0.0.1:8765/wpforms/")
+    assert site_key("http://localhost:5000/x") == "http://localhost:5000/x"
+
+
+def test_order_groups_each_site_in_first_seen_order():
+    urls = ["https://a.com/1", "https://b.com/1", "https://www.a.com/2", "https://c.com/", "https://b.com/2"]
+    assert SiteSessions.order(urls) == ["https://a.com/1", "https://www.a.com/2", "https://b.com/1",
+                                        "https://b.com/2", "https://c.com/"]
+
+
+def test_consecutive_urls_on_one_site_reuse_the_warm_browser(monkeypatch):
+    sessions, supervisor, cleaned = _sessions(monkeypatch)
+    first = sessions.for_url("https://a.com/1")
+    assert first.take_driver() is None  # cold: the flow launches one and keeps it
+    first.keep("chrome-a")
+    first.lease, first.contact_url = _Lease(), "https://a.com/contact"
+    second = sessions.for_url("https://www.a.com/2")
+    assert second is first and second.take_driver() == "chrome-a" and supervisor.jobs == ["chrome-a"]
+
+    lease = first.lease
+    other = sessions.for_url("https://b.com/")
+    assert other is not first and cleaned == ["chrome-a"] and lease.released
+    assert sessions.stats() == {"sessions": 2, "browser_runs": 2, "warm_runs": 1, "contact_reuses": 0,
+                                "domains_with_contact": 1}
+
+
+def test_contact_page_outlives_its_group(monkeypatch):
+    sessions, _, _ = _sessions(monkeypatch)
+    sessions.for_url("https://a.com/1").contact_url = "https://a.com/contact"
+    sessions.for_url("https://b.com/")
+    assert sessions.for_url("https://a.com/retry").contact_url == "https://a.com/contact"
+
+
+def test_browser_due_for_recycling_is_replaced(monkeypatch):
+    sessions, supervisor, cleaned = _sessions(monkeypatch)
+    session = sessions.for_url("https://a.com/1")
+    session.take_driver()
+    session.keep("chrome-a")
+    supervisor.recycle.add("chrome-a")
+    assert session.take_driver() is None and session.driver is None and cleaned == ["chrome-a"]
+    session.keep("chrome-b")
+    sessions.close()
+    assert cleaned == ["chrome-a", "chrome-b"] and sessions.stats()["warm_runs"] == 0
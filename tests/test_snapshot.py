@@ -0,0 +1,68 @@
+import copy
+from types import SimpleNamespace
+
+import formbot.snapshot as snapshot
+from formbot.snapshot import PageSnapshot, take_snapshot
+
+
+def _frame(path, depth, text, forms=()):
+    return {"path": path, "depth": depth, "url": "", "text": text, "shadow_text": "", "forms": list(forms),
+            "matches": [], "hubspot_shell": False}
+
+
+# What the walker script sees in each browsing context. The top document embeds a same-origin
+# iframe (read in-page) holding a cross-origin HubSpot form, and a cross-origin consent frame.
+CONTEXTS = {
+    "top": {"frames": [_frame([], 0, "contact us"), _frame([0], 1, "embedded wrapper")],
+            "opaque": [{"path": [0, 0], "element": None, "via": "wrapper"},
+                       {"path": [1], "element": "consent", "via": None}]},
+    "wrapper": {"frames": [_frame([], 0, "embedded wrapper")],
+                "opaque": [{"path": [0], "element": "hubspot", "via": None}]},
+    "hubspot": {"frames": [_frame([], 0, "send us a message", [{"tag": "form", "textareas": 1}])], "opaque": []},
+    "consent": {"frames": [_frame([], 0, "we value your privacy")], "opaque": []},
+}
+
+
+class _Browser:
+    def __init__(self, broken_parent=False):
+        self.stack, self.broken_parent = [], broken_parent
+        self.switch_to = SimpleNamespace(frame=self.stack.append, parent_frame=self._parent,
+                                         default_content=self.stack.clear)
+
+    def _parent(self):
+        if self.broken_parent:
+            raise RuntimeError("no such frame")
+        self.stack.pop()
+
+    @property
+    def context(self):
+        return self.stack[-1] if self.stack else "top"
+
+
+def _snapshot(monkeypatch, browser):
+    monkeypatch.setattr(snapshot, "page_call", lambda driver, name, *args: copy.deepcopy(CONTEXTS[driver.context]))
+    return take_snapshot(browser)
+
+
+def test_cross_origin_frames_are_entered_once_each(monkeypatch):
+    browser = _Browser()
+    snap = _snapshot(monkeypatch, browser)
+    assert [(f["path"], f["depth"], f["text"]) for f in snap.frames] == [
+        ([], 0, "contact us"), ([0], 1, "embedded wrapper"),
+        ([1], 1, "we value your privacy"), ([0, 0], 2, "send us a message")]
+    assert browser.stack == []  # back in the top-level context
+    (frame, form), = snap.forms()
+    assert frame["path"] == [0, 0] and form["textareas"] == 1
+    assert snap.find_text(["privacy"], frames=snap.iframes)[0]["path"] == [1]
+    assert snap.main["text"] == "contact us"
+
+
+def test_lost_frame_position_falls_back_to_the_top(monkeypatch):
+    browser = _Browser(broken_parent=True)
+    snap = _snapshot(monkeypatch, browser)
+    assert browser.stack == [] and snap.main["text"] == "contact us"
+
+
+def test_empty_snapshot():
+    snap = PageSnapshot([])
+    assert snap.main["forms"] == [] and snap.forms() == [] and snap.find_text(["contact"]) is None
@@ -0,0 +1,60 @@
+from selenium.webdriver.remote.webelement import WebElement
+
+from formbot.form_signatures import POS_ATTR
+from formbot.submit_handler import SubmitHandler
+
+
+class _Button(WebElement):
+    """A submit control (a WebElement, so the clickable wait accepts it) whose native click may fail."""
+
+    def __init__(self, pos, works=True):
+        self.pos, self.works = pos, works
+        self.clicks = 0
+
+    def get_attribute(self, name):
+        return self.pos if name == POS_ATTR else None
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return self.works
+
+    def click(self):
+        if not self.works:
+            raise RuntimeError("element click intercepted")
+        self.clicks += 1
+
+
+class _Page:
+    """A driver on which every scripted or synthesized click fails."""
+
+    def execute_script(self, script, *args):
+        raise RuntimeError("javascript error")
+
+    def execute(self, command, params=None):
+        raise RuntimeError("actions unsupported")
+
+    def find_elements(self, by, selector):
+        return []
+
+
+def test_successful_click_remembers_the_control():
+    handler = SubmitHandler(_Page(), timeout=0.01)
+    assert handler.safe_click(_Button("3"))
+    assert handler.clicked_pos == "3"
+
+
+def test_failed_click_is_not_remembered():
+    handler = SubmitHandler(_Page(), timeout=0.01)
+    assert handler.safe_click(_Button("1"))
+    assert not handler.safe_click(_Button("5", works=False))
+    assert handler.clicked_pos == "1"
+
+
+def test_run_forgets_an_earlier_click(monkeypatch):
+    handler = SubmitHandler(_Page(), timeout=0.01)
+    handler.safe_click(_Button("2"))  # e.g. a replayed plan's button, which didn't submit
+    monkeypatch.setattr(handler, "wait_for_any_button", lambda: False)
+    assert not handler.run()
+    assert handler.clicked_pos is None
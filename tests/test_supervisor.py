@@ -0,0 +1,84 @@
+import formbot.supervisor as sup
+from formbot.supervisor import OWNER_FLAG, BrowserSupervisor
+
+
+class _Process:
+    def __init__(self, pid):
+        self.pid = pid
+
+
+class _Service:
+    def __init__(self, pid):
+        self.process = _Process(pid)
+
+
+class _Driver:
+    def __init__(self, pid):
+        self.service = _Service(pid)
+
+
+def _supervisor(monkeypatch, procs):
+    """A supervisor over a fake process table {pid: cmdline}; returns it and the list of killed pids."""
+    killed = []
+    monkeypatch.setattr(sup, "pid_alive", lambda pid: pid in procs)
+    monkeypatch.setattr(sup, "cmdline", lambda pid: procs.get(pid, ""))
+    monkeypatch.setattr(sup, "kill_tree", killed.append)
+    monkeypatch.setattr(sup, "all_pids", lambda: list(procs))
+    monkeypatch.setattr(sup, "descendants", lambda pid: [])
+    monkeypatch.setattr(BrowserSupervisor, "_ensure_monitor", lambda self: None)
+    return BrowserSupervisor(max_jobs=3), killed
+
+
+def test_unregister_kills_a_lingering_chromedriver(monkeypatch, tmp_path):
+    supervisor, killed = _supervisor(monkeypatch, {4100: "/usr/bin/chromedriver --port=9515"})
+    driver = _Driver(4100)
+    profile = tmp_path / "chrome_profile_1"
+    profile.mkdir()
+    supervisor.register(driver, str(profile))
+    supervisor.unregister(driver)
+    assert killed == [4100]
+    assert not profile.exists()
+    assert supervisor.stats()["closed"] == 1
+
+
+def test_unregister_never_kills_a_reused_pid(monkeypatch):
+    # chromedriver exited after quit() and the kernel handed its pid to something else
+    supervisor, killed = _supervisor(monkeypatch, {4100: "/usr/bin/python3 worker.py"})
+    driver = _Driver(4100)
+    supervisor.register(driver)
+    supervisor.unregister(driver)
+    assert killed == []
+
+
+def test_unregister_of_an_exited_driver_kills_nothing(monkeypatch):
+    supervisor, killed = _supervisor(monkeypatch, {})
+    driver = _Driver(4100)
+    supervisor.register(driver)
+    supervisor.unregister(driver)
+    assert killed == []
+
+
+def test_jobs_past_the_budget_mark_the_driver_for_recycling(monkeypatch):
+    supervisor, _ = _supervisor(monkeypatch, {})
+    driver = _Driver(4100)
+    supervisor.register(driver)
+    for _ in range(2):
+        supervisor.job(driver)
+    assert not supervisor.should_recycle(driver)
+    supervisor.job(driver)
+    assert supervisor.should_recycle(driver)
+
+
+def test_reap_orphans_only_kills_our_browsers_with_a_dead_owner(monkeypatch):
+    procs = {
+        500: f"/opt/google/chrome/chrome {OWNER_FLAG}999999 --headless",           # owner gone: orphan
+        501: f"/opt/google/chrome/chrome --type=renderer {OWNER_FLAG}999999",       # renderer: dies with it
+        502: f"/bin/bash -c 'echo {OWNER_FLAG}999999'",                             # merely mentions the flag
+        503: "/opt/google/chrome/chrome --headless",                                # someone else's Chrome
+        504: f"/opt/google/chrome/chrome {OWNER_FLAG}600",                          # owner 600 still alive
+        600: "/usr/bin/python3 app.py",
+    }
+    supervisor, killed = _supervisor(monkeypatch, procs)
+    monkeypatch.setattr(supervisor, "_reap_stale_profiles", lambda: None)
+    assert supervisor.reap_orphans() == 1
+    assert killed == [500]
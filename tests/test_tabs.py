@@ -0,0 +1,86 @@
+from formbot.tabs import BrowserHost, Tab, _FairLock
+from formbot.tracing import CommandTracer
+
+
+class _Connection:
+    """The one RemoteConnection a shared Chrome's tabs send their commands through."""
+
+    def __init__(self):
+        self.sent = []
+
+    def execute(self, command, params):
+        self.sent.append(command)
+        return {"value": None}
+
+
+class _Chrome:
+    session_id = None
+
+    def __init__(self):
+        self.command_executor = _Connection()
+
+    def execute(self, command, params=None):
+        return self.command_executor.execute(command, params)
+
+
+def _host(trace=True):
+    """A BrowserHost around a fake session (no Chrome launch)."""
+    host = BrowserHost.__new__(BrowserHost)
+    host.driver = _Chrome()
+    host._base_execute = _Chrome.execute
+    host.trace = trace
+    if trace:
+        CommandTracer().attach(host.driver)
+    host.home = host.current = "home"
+    host.tabs, host.reserved, host.dead = {}, 0, False
+    host.commands = host.switches = 0
+    host.turn_wait = 0.0
+    host.on_tab_closed = None
+    host._lock = _FairLock()
+    return host
+
+
+def _commands(driver):
+    return [r["command"] for r in driver._tracer.records]
+
+
+def test_each_tab_traces_only_its_own_commands():
+    host = _host()
+    a, b = Tab(host, "A"), Tab(host, "B")
+    a.driver._tracer.url, b.driver._tracer.url = "https://a.example", "https://b.example"
+    host.run(a, a.driver, "getTitle", {})
+    host.run(b, b.driver, "getPageSource", {})
+    host.run(a, a.driver, "getCurrentUrl", {})
+    assert _commands(a.driver) == ["getTitle", "getCurrentUrl"]
+    assert _commands(b.driver) == ["getPageSource"]
+    assert a.driver._tracer.url == "https://a.example" and b.driver._tracer.url == "https://b.example"
+    # the host's own tracer sees its window switches, not the tabs' commands
+    assert set(_commands(host.driver)) == {"switchToWindow"}
+    assert host.driver.command_executor.sent.count("getTitle") == 1  # sent once, not once per tracer
+
+
+def test_resetting_one_tab_keeps_the_others_counts():
+    host = _host()
+    a, b = Tab(host, "A"), Tab(host, "B")
+    host.run(a, a.driver, "getTitle", {})
+    host.run(b, b.driver, "getTitle", {})
+    a.driver._tracer.reset()
+    assert _commands(a.driver) == [] and _commands(b.driver) == ["getTitle"]
+
+
+def test_closing_a_tab_flushes_its_trace(monkeypatch):
+    host = _host()
+    tab = Tab(host, "A")
+    host.tabs["A"] = tab
+    flushed = []
+    monkeypatch.setattr(tab.driver._tracer, "flush", lambda: flushed.append(tab.driver._tracer))
+    host.run(tab, tab.driver, "getTitle", {})
+    tab.driver.quit()
+    assert flushed == [tab.driver._tracer] and tab.closed and "A" not in host.tabs
+
+
+def test_untraced_host_gives_tabs_no_tracer():
+    host = _host(trace=False)
+    tab = Tab(host, "A")
+    assert tab.driver._tracer is None
+    assert tab.driver.command_executor is host.driver.command_executor
@@ -0,0 +1,82 @@
+import pytest
+
+from formbot.tracing import CommandTracer, tracing_enabled
+
+
+class _Chromedriver:
+    """A RemoteConnection stand-in: answers every command with a fixed value, or fails on one."""
+
+    def __init__(self, value="ok", fail_on=None):
+        self.value, self.fail_on = value, fail_on
+
+    def execute(self, command, params):
+        if command == self.fail_on:
+            raise ConnectionResetError("chromedriver went away")
+        return {"value": self.value}
+
+
+class _Driver:
+    def __init__(self, executor):
+        self.command_executor = executor
+
+
+def _formbot_caller(driver):
+    """A function that looks like it lives in formbot.form_filler to the stack walker."""
+    namespace = {"__name__": "formbot.form_filler"}
+    exec("def fill(driver):\n    return driver.command_executor.execute('findElements', {'using': 'css'})",
+         namespace)
+    return namespace["fill"](driver)
+
+
+def test_records_each_round_trip():
+    driver = CommandTracer(url="https://a.example").attach(_Driver(_Chromedriver(value=[1, 2, 3])))
+    assert driver.command_executor.execute("getTitle", {"x": 1}) == {"value": [1, 2, 3]}
+    (record,) = driver._tracer.records
+    assert record["command"] == "getTitle" and record["ok"]
+    assert record["sent"] == len('{"x": 1}') and record["received"] == len("[1, 2, 3]")
+    assert not any(frame.startswith("formbot.") for frame in record["stack"])
+
+
+def test_failed_command_is_recorded_and_reraised():
+    driver = CommandTracer().attach(_Driver(_Chromedriver(fail_on="get")))
+    with pytest.raises(ConnectionResetError):
+        driver.command_executor.execute("get", {"url": "https://a.example"})
+    assert driver._tracer.records[0]["ok"] is False and driver._tracer.totals()["commands"] == 1
+
+
+def test_commands_are_attributed_to_formbot_callers():
+    tracer = CommandTracer()
+    driver = tracer.attach(_Driver(_Chromedriver()))
+    _formbot_caller(driver)
+    _formbot_caller(driver)
+    driver.command_executor.execute("getTitle", {})
+    rows = tracer.by_caller()
+    assert rows["formbot.form_filler:fill"]["commands"] == 2
+    assert rows["formbot.form_filler:fill"]["by_command"] == {"findElements": 2}
+    assert any(line.endswith("formbot.form_filler:fill;findElements 2") for line in tracer.folded().splitlines())
+
+
+def test_flush_writes_folded_stacks(tmp_path, monkeypatch):
+    monkeypatch.setenv("FORMBOT_TRACE_DIR", str(tmp_path))
+    tracer = CommandTracer(url="https://a.example/contact?x=1")
+    tracer.flush()  # nothing recorded yet: nothing written
+    assert list(tmp_path.iterdir()) == []
+    _formbot_caller(tracer.attach(_Driver(_Chromedriver())))
+    tracer.flush()
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert len(names) == 2 and names[0].startswith("https_a.example_contact_x_1_")
+    assert names[0].endswith(".folded") and names[1].endswith(".time.folded")
+
+
+def test_reset_starts_a_new_url():
+    tracer = CommandTracer(url="https://a.example")
+    driver = tracer.attach(_Driver(_Chromedriver()))
+    driver.command_executor.execute("getTitle", {})
+    tracer.reset("https://a.example/contact")
+    assert tracer.records == [] and tracer.url == "https://a.example/contact"
+
+
+@pytest.mark.parametrize("value, enabled", [("1", True), ("on", True), ("0", False), ("", False)])
+def test_tracing_enabled(monkeypatch, value, enabled):
+    monkeypatch.setenv("FORMBOT_TRACE", value)
+    assert tracing_enabled() is enabled
@@ -0,0 +1,64 @@
+import pytest
+import requests
+
+from formbot.triage import CAPTCHA, CHALLENGE, DEAD, PARKED, VIABLE, HttpTriage, captcha_marker
+
+HOME = "https://acme.example/"
+HOME_HTML = '<html><body><h1>Acme</h1><a href="/contact-us">Contact us</a></body></html>'
+FORM_HTML = '<html><body><form method="post"><input name="name"><textarea name="m"></textarea></form></body></html>'
+
+
+def _check(session, url=HOME):
+    return HttpTriage(session=session).check(url)
+
+
+@pytest.mark.parametrize("error, verdict, reason", [
+    (requests.exceptions.ConnectionError("Failed to resolve 'acme.example' (Name or service not known)"),
+     DEAD, "dns failure"),
+    (requests.exceptions.ConnectionError("[Errno 111] Connection refused"), DEAD, "connection refused"),
+    (requests.exceptions.SSLError("certificate verify failed: unable to get local issuer certificate"),
+     VIABLE, "homepage fetch failed: tls error"),
+    (requests.exceptions.ProxyError("Unable to connect to proxy: Connection refused"),
+     VIABLE, "homepage fetch failed: proxy error"),
+    (requests.exceptions.ConnectionError("Connection aborted: Connection reset by peer"),
+     VIABLE, "homepage fetch failed: connection failed"),
+    (requests.exceptions.ConnectTimeout("connect timed out"), VIABLE, "homepage fetch failed: connect timeout"),
+])
+def test_only_dns_and_refused_connections_are_dead(fake_session, error, verdict, reason):
+    result = _check(fake_session({HOME: error}))
+    assert (result.verdict, result.reason) == (verdict, reason)
+
+
+def test_contact_form_found(fake_session):
+    contact = "https://acme.example/contact-us"
+    result = _check(fake_session({HOME: (200, HOME_HTML), contact: (200, FORM_HTML)}))
+    assert result.verdict == VIABLE and result.contact_url == contact
+    assert result.html == HOME_HTML
+
+
+def test_captcha_on_contact_page(fake_session):
+    gated = FORM_HTML.replace("<textarea", '<div class="g-recaptcha"></div><textarea')
+    result = _check(fake_session({HOME: (200, HOME_HTML), "https://acme.example/contact-us": (200, gated)}))
+    assert (result.verdict, result.reason) == (CAPTCHA, "recaptcha")
+
+
+def test_cloudflare_challenge(fake_session):
+    page = (403, "<title>Just a moment...</title>", {"Server": "cloudflare"})
+    assert _check(fake_session({HOME: page})).verdict == CHALLENGE
+    assert _check(fake_session({HOME: (200, "", {"cf-mitigated": "challenge"})})).verdict == CHALLENGE
+
+
+def test_parked_domain(fake_session):
+    result = _check(fake_session({HOME: (200, "<h1>This domain is for sale!</h1>")}))
+    assert (result.verdict, result.reason) == (PARKED, "this domain is for sale")
+
+
+def test_related_searches_alone_is_not_parked(fake_session):
+    result = _check(fake_session({HOME: (200, "<p>Related searches: roofing, gutters</p>")}))
+    assert result.verdict == VIABLE
+
+
+def test_captcha_marker():
+    assert captcha_marker('<script src="https://js.hcaptcha.com/1/api.js"></script>') == "hcaptcha"
+    assert captcha_marker("<div class='cf-turnstile'></div>") == "turnstile"
+    assert captcha_marker("<p>no captcha here</p>") is None